@@ -38,15 +38,40 @@ from flask import Flask, send_file
 import sys
 import os
 import numpy as np
+import uuid
+import inspect
+import threading
+import functools
+import plotly.io as pio
 matplotlib.use('Agg')  
+try:
+    # Fast serialisation of the figures and other callback responses
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    # Compression of the responses (e.g. figures) sent to the browser
+    import flask_compress
+except ImportError:
+    flask_compress = None
 
 # Internal imports
 from helper_functions import *
 from backend_magic.outlier_isolation_forest import *
+from backend_magic.outlier_detectors import detect_outliers, outlier_scores, choose_outlier_detector
 from backend_magic.duplicate_detection import *
+from backend_magic.near_duplicate_detection import detect_near_duplicates, highlight_near_duplicates, DEFAULT_THRESHOLD
 from backend_magic.missing_value_detection import *
-from classes.vis import Vis
+from backend_magic.imputation_preview import preview_imputation, distribution_summary, PREVIEW_MIN_ROWS
+from backend_magic.machine_view_sampling import machine_view_sample
+from backend_magic.missing_value_patterns import pattern_table, co_missing_table, recommend_missing_value_action
+from classes.vis import Vis, build_vis
 from classes.graph_component import Graph_component
+from classes.session_store import SessionStore
+from classes.cleaning_plan import CleaningPlan
+from classes.job_runner import JobRunner, JobCancelled
+from classes.figure_cache import FigureCache
+from classes.render_pool import RenderPool, RenderQueueFull, RenderTimeout
 # Add locally cloned Lux source code to path, and import Lux from there
 sys.path.insert(0, os.path.abspath('./lux'))
 import lux
@@ -55,38 +80,52 @@ import lux
 ################################################
 ### Global variable and function definitions ###
 
-# Initialise Dash app
-app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP], suppress_callback_exceptions=True)
-
-# Global variables to keep track of progress
-stage = 'data-loading'
-step = 0
-action_log = []
-download_completion = [0, 0]
-# Default colours and display values
-load_colour, miss_colour, dup_colour, out_colour, down_colour = 'red', 'red', 'red', 'red', 'red'
-missing_style, dup_style, out_style, info_style, download_style, down_info_style, completion_style = {'display': 'none'}, {'display': 'none'}, {'display': 'none'}, {'display': 'none'}, {'display': 'none'}, {'display': 'none'}, {'display': 'none'}
-
-# Global variables to store the original uploaded DataFrame, the current state of it, and the previous saved state
-uploaded_df = None
-current_df = None
-previous_df = None
-
-# Global variable to store the name of the file currently being used
-file_name = None
-
-# Global variable to store Vis objects, including the indices corresponding to the figures they are displayed in
-vis_objects = []
-
-# Global variables to store components of the various sections of the pipeline
-dups_count = 0
-missing_count = 0
-outlier_count = 0
-outlier_contamination_history = []
-
-# Display a parallel coordinates plot
-def render_machine_view(vis_objects, df, graph_components):
-    vis1 = Vis(len(vis_objects), df, machine_view=True)
+# Initialise Dash app, compressing its responses if Flask-Compress is installed
+app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP], suppress_callback_exceptions=True, compress=flask_compress is not None)
+
+# Serialise the callback responses with orjson if it is installed
+if orjson is not None:
+    pio.json.config.default_engine = 'orjson'
+
+# Store that keeps the state (data, progress, visualisations, action log) of each user session separate
+session_store = SessionStore()
+
+# Pool of worker processes for heavy computations, so that they do not block the web server
+job_runner = JobRunner(initializer=init_worker)
+
+# Cache of rendered visualisations, shared by all sessions
+figure_cache = FigureCache()
+
+# Pool of warm worker processes rendering the visualisations of all sessions in parallel
+render_pool = RenderPool()
+
+# Actions of the missing value handling stage that change the data
+MISSING_VALUE_OPTIONS = {
+    'delete': 'Delete rows with missing values', 
+    'impute-simple': 'Impute missing values using the univariate mean', 
+    'impute-KNN': 'Impute missing values using the k nearest neighbours'
+}
+
+# Display a parallel coordinates plot of the current data of a session
+def render_machine_view(session, vis_objects, df, graph_components):
+    version = session.data_version() if df is session.current_df else None
+    key = figure_cache.key(version, df, machine_view=True)
+    vis1 = figure_cache.get(key, len(vis_objects))
+    if vis1 is None:
+        # Only a bounded sample of the rows is drawn, so only the sample is passed to the rendering worker
+        sample, _ = machine_view_sample(df)
+        try:
+            vis1 = render_pool.render(len(vis_objects), sample, version=version and version + '-machine-view', machine_view=True, rows=len(df))
+        except RenderQueueFull:
+            # Every worker is busy and the queue is full, so the plot is drawn in this thread instead
+            vis1 = Vis(len(vis_objects), sample, machine_view=True, rows=len(df))
+        except RenderTimeout:
+            raise dash.exceptions.PreventUpdate
+        except Exception as e:
+            # The worker failed (e.g. it exited unexpectedly), so the plot is drawn in this thread instead
+            print('Rendering worker failed: ', e)
+            vis1 = Vis(len(vis_objects), sample, machine_view=True, rows=len(df))
+        figure_cache.put(key, vis1)
     # Populate vis_objects list for referring back to the visualisations
     vis_objects.append(vis1)
     # Append the graph, wrapped in a Div to track clicks, to graph_components
@@ -95,15 +134,224 @@ def render_machine_view(vis_objects, df, graph_components):
         graph_components.append(graph1.div)
     return vis_objects, graph_components
 
+# Raised by run_job when the job of a callback has not finished yet
+class JobPending(Exception):
+    pass
+
+# A call of a resumable callback (see resumable_callback): its arguments, and the results of the jobs it submitted
+# in the order it submitted them, which it receives instead of submitting them again when it is called again
+class ResumableCall:
+
+    def __init__(self, callback, args, kwargs):
+        self.callback = callback
+        self.args = args
+        self.kwargs = kwargs
+        self.session = session_store.get(inspect.signature(callback).bind(*args, **kwargs).arguments.get('session_id'))
+        self.results = []
+        # Number of jobs the current run of the callback asked for
+        self.position = 0
+        # Job the call waits for, and the version of the data it was submitted for
+        self.job_id = None
+        self.version = None
+
+# The resumable call run by the current thread
+current_call = threading.local()
+
+# Return the result of a finished job
+def job_result(job_id):
+    try:
+        return job_runner.result(job_id)
+    except JobCancelled:
+        # A newer action of the same session has superseded this computation
+        raise dash.exceptions.PreventUpdate
+
+# Run a heavy computation in the job runner, showing its progress on the GUI
+# Within a resumable callback, the callback stops while the job is running, and receives the job's result
+# when it is called again once the job finished
+def run_job(session, slot, fn, *args, **kwargs):
+    session.job_slot = slot
+    call = getattr(current_call, 'call', None)
+    if call is not None and call.position < len(call.results):
+        call.position += 1
+        return call.results[call.position - 1]
+    job_id = job_runner.submit((session.session_id, slot), fn, *args, **kwargs)
+    if call is None:
+        return job_result(job_id)
+    if not job_runner.done(job_id):
+        raise JobPending(job_id)
+    call.results.append(job_result(job_id))
+    call.position += 1
+    return call.results[-1]
+
+# Check whether the result of a callback changes any of its outputs
+def is_update(result):
+    values = result if isinstance(result, (list, tuple)) else [result]
+    return any(value is not dash.no_update for value in values)
+
+# Cancel the job of the call a session is waiting for, as another call of its callbacks supersedes it
+def supersede_pending_call(session, call):
+    pending = session.pending_call
+    if pending is not None and pending is not call:
+        job_runner.cancel(pending.job_id)
+    session.pending_call = None
+
+# Run a resumable call: if one of its jobs is still running, the changes of the callback to the session are reverted
+# (they are made again when it is called again) and its outputs are left unchanged, so that the web server does
+# not wait for the job, and the call waits for the job instead
+def run_call(call):
+    session = call.session
+    state = session.snapshot()
+    call.position = 0
+    current_call.call = call
+    try:
+        result = call.callback(*call.args, **call.kwargs)
+    except JobPending as e:
+        session.restore(state)
+        supersede_pending_call(session, call)
+        call.job_id = e.args[0]
+        call.version = session.data_version()
+        session.pending_call = call
+        raise dash.exceptions.PreventUpdate
+    finally:
+        current_call.call = None
+    # Callbacks sharing an input (e.g. the dropdowns of the outlier handling stages) that do not act on it
+    # leave the pending call of another callback in place
+    if is_update(result):
+        supersede_pending_call(session, call)
+    return result
+
+# Register a callback whose heavy computations run as background jobs without blocking the web server: while a
+# job is running, the outputs (and so the dropdowns of the user) stay as they are, and the callback is called
+# again with the same arguments once the job finished, which finish_pending_call announces
+def resumable_callback(outputs, inputs, states, **kwargs):
+    def register(callback):
+        @functools.wraps(callback)
+        def start(*args, **kwargs):
+            return run_call(ResumableCall(callback, args, kwargs))
+
+        # Call the callback again once the job of its pending call finished, unless the data changed meanwhile
+        def resume(job_id, session_id=None):
+            session = session_store.peek(session_id)
+            call = session.pending_call if session is not None else None
+            if call is None or call.callback is not callback or call.job_id != job_id:
+                raise dash.exceptions.PreventUpdate
+            session.pending_call = None
+            if session.data_version() != call.version:
+                job_runner.cleanup(job_id)
+                raise dash.exceptions.PreventUpdate
+            call.results.append(job_result(job_id))
+            return run_call(call)
+
+        app.callback(outputs, inputs, states, **kwargs)(start)
+        resumed_outputs = [Output(output.component_id, output.component_property, allow_duplicate=True) for output in outputs]
+        app.callback(resumed_outputs, Input('finished-job', 'data'), State('session-id', 'data'), prevent_initial_call=True)(resume)
+        start.resume = resume
+        return start
+    return register
+
+# Build a visualisation in the rendering pool, re-using the figure of an identical earlier request (of any session)
+# Figures are cached by the version of the data: the current data of the session, or the given version for a
+# shallow copy of it with another intent (other data, e.g. a preview sample, is not cached)
+def render_vis(session, slot, id, df, version=None, **kwargs):
+    if version is None and df is session.current_df:
+        version = session.data_version()
+    key = figure_cache.key(version, df, **kwargs)
+    vis = figure_cache.get(key, id)
+    if vis is None:
+        try:
+            vis = render_pool.render(id, df, version=version, **kwargs)
+        except RenderQueueFull:
+            # Every worker is busy and the queue is full, so the visualisation is built by the job runner instead
+            vis = run_job(session, slot, build_vis, id, df, **kwargs)
+        except RenderTimeout:
+            # The visualisation took too long, and its worker has been replaced
+            raise dash.exceptions.PreventUpdate
+        except Exception as e:
+            # The worker failed (e.g. it exited unexpectedly), so the visualisation is built by the job runner instead
+            print('Rendering worker failed: ', e)
+            vis = run_job(session, slot, build_vis, id, df, **kwargs)
+        figure_cache.put(key, vis)
+    if vis.fallback_used:
+        # Later visualisations of the current data follow the columns of the chart shown instead
+        session.current_df.intent = extract_intent(vis.columns)
+    return vis
+
+# Detect duplicated rows of the current data, either exactly or (once selected by the user) approximately
+def detect_session_duplicates(session):
+    if session.duplicate_mode == 'near':
+        detected_df, session.dups_count = run_job(session, 'duplicates', detect_near_duplicates, session.current_df, threshold=session.near_duplicate_threshold)
+        session.commit(detected_df)
+        return str(session.dups_count) + ' near-duplicated rows were detected'
+    duplicate_index = session.get_duplicate_index()
+    detected_df, session.dups_count = detect_duplicates(session.current_df, index=duplicate_index)
+    session.commit(detected_df, duplicates=duplicate_index)
+    return str(session.dups_count) + ' duplicated rows were detected'
+
+# Flag the outliers of the current data, re-using the anomaly scores of this version of the data if available,
+# so that changing the contamination does not retrain the model
+def detect_session_outliers(session, slot, contamination, intent=[]):
+    # The detector is picked by the size of the data once per outlier handling stage
+    if session.outlier_detector is None:
+        session.outlier_detector = choose_outlier_detector(session.current_df)
+    index_name = 'outlier_scores_' + session.outlier_detector
+    scores = session.get_index(index_name, lambda df: run_job(session, slot, outlier_scores, df, session.outlier_detector))
+    flagged_df, session.outlier_count = detect_outliers(session.current_df, contamination=contamination, intent=intent, scores=scores)
+    # Flagging only adds a column, so the scores remain valid for the flagged data
+    session.commit(flagged_df, **{index_name: scores})
+
+# Remove the flagged outliers from the current data, recording the detector and contamination they were flagged with
+def remove_session_outliers(session):
+    session.plan.record('remove_outliers', detector=session.outlier_detector, contamination=session.outlier_contamination_history[-1])
+    session.commit(session.current_df[session.current_df.outlier != True])
+
+# Return the statistics of an imputation of the current data, fitted once for its preview and its final pass
+def imputation_statistics(session, method):
+    return session.get_index('imputation_' + method, lambda df: fit_imputation(df, method))
+
+# Preview an imputation on a stratified sample of the current data, showing the distributions before and after
+# the imputation and the first recommended visualisation of the imputed sample
+def render_imputation_preview(session, method):
+    selected_option = MISSING_VALUE_OPTIONS['impute-' + method]
+    sample, imputed_sample, _ = run_job(session, 'missing-values', preview_imputation, session.current_df, method, imputation_statistics(session, method))
+    summary_df = distribution_summary(sample, imputed_sample)
+    graph_list = []
+    vis2 = render_vis(session, 'missing-values', len(session.vis_objects), imputed_sample)
+    session.vis_objects.append(vis2)
+    graph2 = Graph_component(vis2)
+    if graph2.div is not None:
+        graph_list.append(graph2.div)
+    log(session, 'Preview: ' + selected_option, 'user')
+    message = 'Preview on a sample of ' + str(len(sample)) + ' of ' + str(len(session.current_df)) + ' rows'
+    log(session, message, 'system')
+    # Offer to apply the previewed imputation to all rows, or to preview the other options
+    options = {'confirm-' + method: 'Apply this imputation to all rows'}
+    options.update({value: label for value, label in MISSING_VALUE_OPTIONS.items() if value != 'impute-' + method})
+    return html.Div(children=[
+        html.P(f'Selected action: Preview - {selected_option}'),
+        html.P(message),
+        dbc.Table.from_dataframe(summary_df, striped=True, bordered=True, hover=True),
+        show_side_by_side(graph_list),
+        dcc.Dropdown(
+            placeholder='Select an action to take', 
+            id={'type': 'missing-value-removal', 'index': session.step},
+            options=options
+        )
+    ])
+
+# Add the option to detect near-duplicates to the options of the duplicate removal dropdown
+def duplicate_options(session, options):
+    if session.duplicate_mode != 'near':
+        options = dict(options, near='Detect near-duplicates (ignoring casing, whitespace and small numeric differences)')
+    return options
+
 # Create an entry in the action log
-def log(message, type):
-    global action_log
+def log(session, message, type):
     entry = ''
     if type == 'system':
         entry = 'SYSTEM NOTE: ' + message
     elif type == 'user':
         entry = 'USER ACTION: ' + message
-    action_log.append(entry)
+    session.action_log.append(entry)
 
 
 ##############################################################
@@ -143,6 +391,11 @@ progress_bar = html.Div(
             pills=True,
         ),
         html.Hr(),
+        # Progress of the currently running background computation
+        html.Div(id='job-progress', style={'color': 'white'}),
+        dcc.Interval(id='job-progress-interval', interval=1000),
+        # Job whose callback is called again, as it has finished
+        dcc.Store(id='finished-job'),
         html.Div(
             children=[
                 html.P('Congratulations on finishing the data cleaning.', style={'font': 'bold', 'color': 'white'}),
@@ -295,16 +548,28 @@ dashboard = html.Div(id='dashboard', children=[
             style={'display': 'none'}
         ),
         dcc.Download(id='download-log'),
+        html.Br(),
+        dbc.Button(
+            'Download Cleaning Plan',
+            id='plan-btn',
+            className='btn btn-success',
+            style={'display': 'none'}
+        ),
+        dcc.Download(id='download-plan'),
         html.Br()
     ])
 ], style=DASHBOARD_STYLE)
 
-# Set dashboard layout
-app.layout = dbc.Container([
-    dcc.Location(id='url'),
-    progress_bar,
-    dashboard,
-])
+# Set dashboard layout, assigning a new session ID to every page load
+def serve_layout():
+    return dbc.Container([
+        dcc.Location(id='url'),
+        dcc.Store(id='session-id', data=str(uuid.uuid4())),
+        progress_bar,
+        dashboard,
+    ])
+
+app.layout = serve_layout
 
 
 ################################################################
@@ -313,65 +578,60 @@ app.layout = dbc.Container([
 ### engineering pipeline                                     ###
 
 # Callback to handle the file upload
-@app.callback(
+@resumable_callback(
     [Output(component_id='output-data-upload', component_property='children'),
      Output(component_id='start-button', component_property='style')],
     [Input(component_id='upload-data', component_property='contents'),
      Input(component_id='dataset-selection', component_property='value')],
-    [State(component_id='upload-data', component_property='filename')],
+    [State(component_id='upload-data', component_property='filename'),
+     State(component_id='session-id', component_property='data')],
     prevent_initial_call=True
 )
-def update_ui(contents, selected_dataset, filename):
-    global uploaded_df
-    global current_df
-    global previous_df
-    global stage
-    global step
-    global vis_objects
-    global file_name
-    global dups_count
-    global outlier_count
-    global action_log
+def update_ui(contents, selected_dataset, filename, session_id=None):
+    session = session_store.get(session_id)
 
     if contents is None:
         # Handle selection of preloaded datasets
         if selected_dataset and len(selected_dataset) > 0:
-            file_name = selected_dataset
+            session.file_name = selected_dataset
             filename = selected_dataset
-            uploaded_df = prepare_contents(file_name)
+            uploaded_df, datetime_formats, content_key = prepare_contents(session.file_name)
         else:
             # If no data has been uploaded yet
-            log('Unsupported file type', 'system')
+            log(session, 'Unsupported file type', 'system')
             return html.Div('Unsupported file type.'), {'display': 'block'}
     # Handle file upload (uploading data)
     else:
         # Parse uploaded contents
-        uploaded_df = parse_contents(contents, filename)
-        file_name = filename
-    stage = 'data-loading'
-    step = 0
+        uploaded_df, datetime_formats, content_key = parse_contents(contents, filename)
+        session.file_name = filename
+    session.stage = 'data-loading'
+    session.step = 0
     if uploaded_df is not None:
-        step += 1
+        session.step += 1
         # Enable Lux for the uploaded DataFrame
         uploaded_df = pd.DataFrame(uploaded_df)
         if 'unnamed_0' in uploaded_df.columns:
             uploaded_df = uploaded_df.drop('unnamed_0', axis=1)
-        current_df = uploaded_df.copy()
-        previous_df = uploaded_df.copy()
+        # Start the history of versions, which undo steps return to instead of full copies
+        # (the unchanged data of equal uploads shares its version, and so its cached figures)
+        session.load(uploaded_df, content_key)
+        # Start a new cleaning plan for the schema of the uploaded data
+        session.plan = CleaningPlan.from_frame(uploaded_df, session.file_name, datetime_formats)
         graph_components = []
-        # Reset global variables
-        vis_objects = []
-        dups_count = 0
-        outlier_count = 0
-        action_log = []
+        # Reset session variables
+        session.vis_objects = []
+        session.dups_count = 0
+        session.outlier_count = 0
+        session.action_log = []
 
         # Display a parallel coordinates plot
-        vis_objects, graph_components = render_machine_view(vis_objects, uploaded_df, graph_components)
+        session.vis_objects, graph_components = render_machine_view(session, session.vis_objects, session.current_df, graph_components)
 
         # Display the first recommended visualisation
-        vis2 = Vis(len(vis_objects), current_df)
+        vis2 = render_vis(session, 'upload', len(session.vis_objects), session.current_df)
         # Populate vis_objects list for referring back to the visualisations
-        vis_objects.append(vis2)
+        session.vis_objects.append(vis2)
         # Append the graph, wrapped in a Div to track clicks, to graph_components
         graph2 = Graph_component(vis2)
         if graph2.div is not None:
@@ -379,13 +639,13 @@ def update_ui(contents, selected_dataset, filename):
         else:
             print("No recommendations available. Please upload data first.")
 
-        log('Data uploaded', 'system')
+        log(session, 'Data uploaded', 'system')
         # Return all components
         graph_div = show_side_by_side(graph_components)
         return (
             html.Div([
                 html.H5(f'Uploaded File: {filename}'),
-                dbc.Table.from_dataframe(current_df.head(), striped=True, bordered=True, hover=True),
+                dbc.Table.from_dataframe(session.current_df.head(), striped=True, bordered=True, hover=True),
                 graph_div
             ]), 
             {'display': 'block'}
@@ -398,33 +658,29 @@ def update_ui(contents, selected_dataset, filename):
 @app.callback(
     [Output(component_id='missing-output', component_property='children')],
     [Input(component_id='start-button', component_property='n_clicks')],
+    [State(component_id='session-id', component_property='data')],
     prevent_initial_call=True,
     running=[(Output(component_id='missing-end-btn', component_property='disabled'), True, False)]
 )
-def render_missing_values(n_clicks):
-    global current_df
-    global stage
-    global step
-    global vis_objects
-    global missing_count
-    global file_name
-
-    if n_clicks > 0 and current_df is not None:
-        stage = 'missing-value-handling'
-        step += 1
-        file_name = determine_filename(file_name)
+def render_missing_values(n_clicks, session_id=None):
+    session = session_store.get(session_id)
+
+    if n_clicks > 0 and session.current_df is not None:
+        session.stage = 'missing-value-handling'
+        session.step += 1
+        session.file_name = determine_filename(session.file_name)
 
         # Call the backend function for missing value detection
-        missing_df, missing_count = detect_missing_values(current_df)
+        missing_df, session.missing_count = detect_missing_values(session.current_df, session.get_missing_index())
 
         if isinstance(missing_df, pd.Series):
             missing_df = missing_df.to_frame()
 
-        message = str(missing_count) + ' missing values were detected'
-        log(message, 'system')
+        message = str(session.missing_count) + ' missing values were detected'
+        log(session, message, 'system')
 
         # Add new div to the UI
-        if missing_count == 0:
+        if session.missing_count == 0:
             new_div = html.Div(children=[
                 html.P(message, style={'color': 'green'}),
             ])
@@ -434,9 +690,10 @@ def render_missing_values(n_clicks):
                 dbc.Table.from_dataframe(missing_df, striped=True, bordered=True, hover=True),
                 dcc.Dropdown(
                     placeholder='Select an action to take', 
-                    id={'type': 'missing-value-removal', 'index': step},
+                    id={'type': 'missing-value-removal', 'index': session.step},
                     options={
                         'highlight': 'Show rows with missing values', 
+                        'patterns': 'Show patterns of missing values', 
                         'delete': 'Delete rows with missing values', 
                         'impute-simple': 'Impute missing values using the univariate mean', 
                         'impute-KNN': 'Impute missing values using the k nearest neighbours'
@@ -447,41 +704,37 @@ def render_missing_values(n_clicks):
     
 
 # Callback to handle updates within the 'missing-value-handling' stage
-@app.callback(
+@resumable_callback(
     [Output(component_id='missing-output-1', component_property='children')],
     [Input(component_id={'type': 'missing-value-removal', 'index': ALL}, component_property='value')],
-    [State(component_id='start-button', component_property='n_clicks')],
+    [State(component_id='start-button', component_property='n_clicks'),
+     State(component_id='session-id', component_property='data')],
     prevent_initial_call=True,
-    running=[(Output(component_id='missing-end-btn', component_property='disabled'), True, False),
-             (Output(component_id={'type': 'missing-value-removal', 'index': ALL}, component_property='disabled'), True, False)]
+    running=[(Output(component_id='missing-end-btn', component_property='disabled'), True, False)]
 )
-def update_missing_values(drop_value, n_clicks):
-    global current_df
-    global previous_df
-    global stage
-    global step
-    global vis_objects
-    global missing_count
+def update_missing_values(drop_value, n_clicks, session_id=None):
+    session = session_store.get(session_id)
 
     selected_option = ''
     graph_list = []
     if drop_value[-1] is None:
         return dash.no_update
-    if n_clicks > 0 and current_df is not None:
-        step += 1
+    if n_clicks > 0 and session.current_df is not None:
+        session.step += 1
 
         if 'highlight' == drop_value[-1]:
             selected_option = 'Show rows with missing values'
             # Detect and show rows with missing values
-            highlight_df = current_df[current_df.isnull().any(axis=1)]
+            highlight_df = session.current_df[session.get_missing_index().any_null_mask()]
             new_div = html.Div(children=[
                 html.P(f'Selected action: {selected_option}'),
-                html.P(f'{missing_count} missing values were detected', style={'color': 'red'}),
+                html.P(f'{session.missing_count} missing values were detected', style={'color': 'red'}),
                 dbc.Table.from_dataframe(highlight_df, striped=True, bordered=True, hover=True),
                 dcc.Dropdown(
                     placeholder='Select an action to take', 
-                    id={'type': 'missing-value-removal', 'index': step},
+                    id={'type': 'missing-value-removal', 'index': session.step},
                     options={
+                        'patterns': 'Show patterns of missing values', 
                         'delete': 'Delete rows with missing values', 
                         'impute-simple': 'Impute missing values using the univariate mean', 
                         'impute-KNN': 'Impute missing values using the k nearest neighbours'
@@ -489,42 +742,76 @@ def update_missing_values(drop_value, n_clicks):
                 )
             ])
             return [new_div]
-        elif 'impute-simple' == drop_value[-1]:
+        elif 'patterns' == drop_value[-1]:
+            selected_option = 'Show patterns of missing values'
+            # Count the patterns of missing values and the columns missing together from the bit-packed missing values
+            matrix = session.get_missing_patterns()
+            action, reason = recommend_missing_value_action(matrix)
+            recommendation = 'Recommendation: ' + MISSING_VALUE_OPTIONS[action] + '. ' + reason if action else reason
+            log(session, selected_option, 'user')
+            log(session, recommendation, 'system')
+            new_div = html.Div(children=[
+                html.P(f'Selected action: {selected_option}'),
+                html.P(f'{session.missing_count} missing values were detected', style={'color': 'red'}),
+                html.H6('Most frequent patterns of missing values'),
+                dbc.Table.from_dataframe(pattern_table(matrix), striped=True, bordered=True, hover=True),
+                html.H6('Columns most often missing together'),
+                dbc.Table.from_dataframe(co_missing_table(matrix), striped=True, bordered=True, hover=True),
+                html.P(recommendation),
+                dcc.Dropdown(
+                    placeholder='Select an action to take', 
+                    id={'type': 'missing-value-removal', 'index': session.step},
+                    options=dict({'highlight': 'Show rows with missing values'}, **MISSING_VALUE_OPTIONS)
+                )
+            ])
+            return [new_div]
+        elif drop_value[-1] in ('impute-simple', 'impute-KNN') and len(session.current_df) > PREVIEW_MIN_ROWS:
+            # Large data is imputed on a sample first, and only imputed in full once the user confirms
+            return [render_imputation_preview(session, drop_value[-1].split('-')[1])]
+        elif drop_value[-1] in ('impute-simple', 'confirm-simple'):
             # Use the backend univariate mean imputer
             selected_option = 'Impute missing values using the univariate mean'
-            current_df = impute_missing_values(current_df)
-        elif 'impute-KNN' == drop_value[-1]:
+            imputed_df = impute_missing_values(session.current_df, 'simple', imputation_statistics(session, 'simple'))
+            session.plan.record('impute', method='simple')
+            # Imputation only fills in values, so only the previously missing cells need to be re-checked
+            session.commit(imputed_df, missing=session.get_missing_index().fill(imputed_df))
+        elif drop_value[-1] in ('impute-KNN', 'confirm-KNN'):
             # Use the backend KNN imputer
             selected_option = 'Impute missing values using the k nearest neighbours'
-            current_df = impute_missing_values(current_df, 'KNN')
+            imputed_df = run_job(session, 'missing-values', impute_missing_values, session.current_df, 'KNN', imputation_statistics(session, 'KNN'))
+            session.plan.record('impute', method='KNN')
+            session.commit(imputed_df, missing=session.get_missing_index().fill(imputed_df))
         elif 'delete' == drop_value[-1]:
             # Remove missing values
             selected_option = 'Delete rows with missing values'
-            current_df = current_df[current_df.notnull().all(axis=1)]
+            missing_index = session.get_missing_index()
+            keep_mask = ~missing_index.any_null_mask()
+            session.plan.record('drop_missing')
+            session.commit(session.current_df[keep_mask], missing=missing_index.drop_rows(keep_mask))
         elif 'undo' == drop_value[-1]:
             # Revert dataframe back to its previous state
             selected_option = 'Undo the last step'
-            current_df = previous_df.copy()
+            session.undo()
         else:
             return dash.no_update
 
-        missing_df, missing_count = detect_missing_values(current_df)
+        missing_df, session.missing_count = detect_missing_values(session.current_df, session.get_missing_index())
         # Display a parallel coordinates plot
-        vis_objects, graph_list = render_machine_view(vis_objects, current_df, graph_list)
+        session.vis_objects, graph_list = render_machine_view(session, session.vis_objects, session.current_df, graph_list)
 
         # Display the first recommended visualisation
-        vis2 = Vis(len(vis_objects), current_df) #, num_rec=1
+        vis2 = render_vis(session, 'missing-values', len(session.vis_objects), session.current_df) #, num_rec=1
         # Populate vis_objects list for referring back to the visualisations
-        vis_objects.append(vis2)
+        session.vis_objects.append(vis2)
         # Append the graph, wrapped in a Div to track clicks, to graph_list
         graph2 = Graph_component(vis2)
         if graph2.div is not None:
             graph_list.append(graph2.div)
         else:
             print('No recommendations available. Please upload data first.')
-        log(selected_option, 'user')
-        message = str(missing_count) + ' missing values were detected'
-        log(message, 'system')
+        log(session, selected_option, 'user')
+        message = str(session.missing_count) + ' missing values were detected'
+        log(session, message, 'system')
         # Return all components
         graph_div = show_side_by_side(graph_list)
         if 'undo' == drop_value[-1]:
@@ -534,9 +821,10 @@ def update_missing_values(drop_value, n_clicks):
                 graph_div,
                 dcc.Dropdown(
                     placeholder='Select an action to take', 
-                    id={'type': 'missing-value-removal', 'index': step},
+                    id={'type': 'missing-value-removal', 'index': session.step},
                     options={
                         'highlight': 'Show rows with missing values', 
+                        'patterns': 'Show patterns of missing values', 
                         'delete': 'Delete rows with missing values', 
                         'impute-simple': 'Impute missing values using the univariate mean', 
                         'impute-KNN': 'Impute missing values using the k nearest neighbours'
@@ -550,7 +838,7 @@ def update_missing_values(drop_value, n_clicks):
                 graph_div,
                 dcc.Dropdown(
                     placeholder='Select an action to take', 
-                    id={'type': 'missing-value-removal', 'index': step},
+                    id={'type': 'missing-value-removal', 'index': session.step},
                     options={
                         'undo': 'Undo the last step'
                     }
@@ -564,49 +852,46 @@ def update_missing_values(drop_value, n_clicks):
 
 
 # Callback to handle the first render within the 'duplicate-removal' stage
-@app.callback(
+@resumable_callback(
     [Output(component_id='duplicate-output', component_property='children')],
     [Input(component_id='missing-end-btn', component_property='n_clicks')],
+    [State(component_id='session-id', component_property='data')],
     prevent_initial_call=True,
     running=[(Output(component_id='duplicate-end-btn', component_property='disabled'), True, False)]
 )
-def render_duplicates(n_clicks):
-    global current_df
-    global previous_df
-    global stage
-    global step
-    global vis_objects
-    global dups_count
+def render_duplicates(n_clicks, session_id=None):
+    session = session_store.get(session_id)
 
     graph_list = []
     # First render
-    if n_clicks > 0 and current_df is not None:
-        log('Finish Missing Value Handling', 'user')
-        stage = 'duplicate-removal'
-        step += 1
-        previous_df = current_df.copy()
+    if n_clicks > 0 and session.current_df is not None:
+        log(session, 'Finish Missing Value Handling', 'user')
+        session.stage = 'duplicate-removal'
+        session.step += 1
+        session.checkpoint()
         # Access the last visualisation rendered on the right for intent specification
-        human_previous = vis_objects[-1]
+        human_previous = session.vis_objects[-1]
         
         # Display a parallel coordinates plot
-        vis_objects, graph_list = render_machine_view(vis_objects, current_df, graph_list)
+        session.vis_objects, graph_list = render_machine_view(session, session.vis_objects, session.current_df, graph_list)
 
         # Detect and visualise duplicates
-        current_df, dups_count = detect_duplicates(current_df)
-        right_df = current_df.copy()
+        session.duplicate_mode = 'exact'
+        message = detect_session_duplicates(session)
+        right_df = session.current_df.copy(deep=False)
         right_df.intent = extract_intent(human_previous.columns)
         # Display the second visualisation
-        vis2 = Vis(len(vis_objects), right_df, enhance='duplicate')
+        vis2 = render_vis(session, 'duplicates', len(session.vis_objects), right_df, version=session.data_version(), enhance='duplicate')
         # Catch the missing value error if applicable:
         if vis2.missing_value_flag:
             message = 'ERROR: Visualisations cannot be displayed due to missing values in the data. Please revisit the "Missing Value Handling" step above, and click the "Finish Missing Value Handling" button when done.'
-            log(message, 'system')
+            log(session, message, 'system')
             new_div = html.Div(children=[
                 html.P(message, style={'color': 'red'})
             ])
             return [new_div]
         # Populate vis_objects list for referring back to the visualisations
-        vis_objects.append(vis2)
+        session.vis_objects.append(vis2)
         # Append the graph, wrapped in a Div to track clicks, to graph_list
         graph2 = Graph_component(vis2)
         if graph2.div is not None:
@@ -614,15 +899,14 @@ def render_duplicates(n_clicks):
         else:
             print('No recommendations available. Please upload data first.')
 
-        # Determine colour of system message
-        if dups_count == 0:
-            show_dropdown = {'display': 'none'}
+        # Determine colour of system message (near-duplicates can still be searched for if there are no exact duplicates)
+        if session.dups_count == 0:
+            options = duplicate_options(session, {})
             text_col = {'color': 'green'}
         else:
-            show_dropdown = {'display': 'block'}
+            options = duplicate_options(session, {'highlight': 'Show duplicated rows', 'delete': 'Delete duplicates', 'keep': 'Keep all duplicates'})
             text_col = {'color': 'red'}
-        message = str(dups_count) + ' duplicated rows were detected'
-        log(message, 'system')
+        log(session, message, 'system')
         # Return all components
         graph_div = show_side_by_side(graph_list)
         new_div = html.Div(children=[
@@ -630,48 +914,49 @@ def render_duplicates(n_clicks):
             graph_div,
             dcc.Dropdown(
                 placeholder='Select an action to take', 
-                id={'type': 'duplicate-removal', 'index': step},
-                options={'highlight': 'Show duplicated rows', 'delete': 'Delete duplicates', 'keep': 'Keep all duplicates'},
-                style=show_dropdown
+                id={'type': 'duplicate-removal', 'index': session.step},
+                options=options
             ),
+            html.Div(children=[
+                html.P('Similarity threshold for near-duplicates'),
+                dcc.Slider(id={'type': 'near-duplicate-threshold', 'index': session.step}, min=0.5, max=1.0, step=0.05, value=DEFAULT_THRESHOLD)
+            ]),
             html.Br()
         ])
         return [new_div]
 
 
 # Callback to handle updates within the 'duplicate-removal' stage
-@app.callback(
+@resumable_callback(
     [Output(component_id='duplicate-output-1', component_property='children')],
     [Input(component_id={'type': 'duplicate-removal', 'index': ALL}, component_property='value')],
-    [State(component_id='missing-end-btn', component_property='n_clicks')],
+    [State(component_id='missing-end-btn', component_property='n_clicks'),
+     State(component_id={'type': 'near-duplicate-threshold', 'index': ALL}, component_property='value'),
+     State(component_id='session-id', component_property='data')],
     prevent_initial_call=True,
-    running=[(Output(component_id='duplicate-end-btn', component_property='disabled'), True, False),
-             (Output(component_id={'type': 'duplicate-removal', 'index': ALL}, component_property='disabled'), True, False)]
+    running=[(Output(component_id='duplicate-end-btn', component_property='disabled'), True, False)]
 )
-def update_duplicates(drop_value, n_clicks):
-    global current_df
-    global previous_df
-    global stage
-    global step
-    global vis_objects
-    global dups_count
+def update_duplicates(drop_value, n_clicks, near_thresholds=None, session_id=None):
+    session = session_store.get(session_id)
 
     selected_option = ''
     graph_list = []
-    if n_clicks > 0 and current_df is not None:
-        step += 1
+    if n_clicks > 0 and session.current_df is not None:
+        session.step += 1
         # Access the last visualisation rendered on the right (human view)
-        human_previous = vis_objects[-1]
+        human_previous = session.vis_objects[-1]
 
         if 'highlight' == drop_value[-1]:
             selected_option = 'Highlight duplicated rows'
             # Detect and show duplicates
-            highlight_df, highlight_count = detect_duplicates(current_df, keep=False)
-            highlight_df = highlight_df[highlight_df.duplicate != False]
-            highlight_df = highlight_df.sort_values(by=[highlight_df.columns[2], highlight_df.columns[3], highlight_df.columns[4]])
-            log(selected_option, 'user')
-            message = str(dups_count) + ' duplicated rows were detected'
-            log(message, 'system')
+            if session.duplicate_mode == 'near':
+                highlight_df = run_job(session, 'duplicates', highlight_near_duplicates, session.current_df, threshold=session.near_duplicate_threshold)
+                message = str(session.dups_count) + ' near-duplicated rows were detected'
+            else:
+                highlight_df = highlight_duplicates(session.current_df, session.get_duplicate_index())
+                message = str(session.dups_count) + ' duplicated rows were detected'
+            log(session, selected_option, 'user')
+            log(session, message, 'system')
             # Add a new div to the UI
             new_div = html.Div(children=[
                 html.P(f'Selected action: {selected_option}'),
@@ -679,8 +964,8 @@ def update_duplicates(drop_value, n_clicks):
                 dbc.Table.from_dataframe(highlight_df, striped=True, bordered=True, hover=True),
                 dcc.Dropdown(
                     placeholder='Select an action to take', 
-                    id={'type': 'duplicate-removal', 'index': step},
-                    options={'highlight': 'Show duplicated rows', 'delete': 'Delete duplicates', 'keep': 'Keep all duplicates'}
+                    id={'type': 'duplicate-removal', 'index': session.step},
+                    options=duplicate_options(session, {'highlight': 'Show duplicated rows', 'delete': 'Delete duplicates', 'keep': 'Keep all duplicates'})
                 ),
                 html.Br()
             ])
@@ -689,31 +974,38 @@ def update_duplicates(drop_value, n_clicks):
         elif 'undo' == drop_value[-1]:
             # Revert the dataframe back to its previous state
             selected_option = 'Undo the last step'
-            current_df = previous_df.copy()
+            session.undo()
         elif 'delete' == drop_value[-1]:
             # Remove duplicated rows
             selected_option = 'Delete duplicates'
-            current_df = current_df[current_df.duplicate != True]
+            keep_mask = (session.current_df.duplicate != True).to_numpy()
+            if session.duplicate_mode == 'near':
+                session.plan.record('drop_duplicates', mode='near', threshold=session.near_duplicate_threshold)
+            else:
+                session.plan.record('drop_duplicates', mode='exact')
+            # Update the duplicate index for the remaining rows instead of re-hashing them
+            session.commit(session.current_df[keep_mask], duplicates=session.get_duplicate_index().drop_rows(keep_mask))
+        elif 'near' == drop_value[-1]:
+            # Switch to the detection of near-duplicates, using the similarity threshold selected on the slider
+            selected_option = 'Detect near-duplicates'
+            session.duplicate_mode = 'near'
+            if near_thresholds and near_thresholds[-1] is not None:
+                session.near_duplicate_threshold = near_thresholds[-1]
         else:
             return dash.no_update
          
         # Display a parallel coordinates plot
-        vis_objects, graph_list = render_machine_view(vis_objects, current_df, graph_list)
+        session.vis_objects, graph_list = render_machine_view(session, session.vis_objects, session.current_df, graph_list)
 
         # Detect and visualise duplicates
-        current_df, dups_count = detect_duplicates(current_df)
-        right_df = current_df.copy()
+        message = detect_session_duplicates(session)
+        right_df = session.current_df.copy(deep=False)
         right_df.intent = extract_intent(human_previous.columns)
         # Display the second visualisation
-        vis2 = Vis(len(vis_objects), right_df)
-        # Catch the missing value error if applicable:
-        if vis2.missing_value_flag:
-            # Display the second visualisation (second recommendation - num_rec=1 - rather than the first as usual)
-            temp_vis = Vis(len(vis_objects), current_df, num_rec=1, temporary=True)
-            current_df.intent = extract_intent(temp_vis.columns)
-            vis2 = Vis(len(vis_objects), current_df, enhance='duplicate')
+        # Display another recommended chart if this one cannot be displayed (e.g. due to missing values)
+        vis2 = render_vis(session, 'duplicates', len(session.vis_objects), right_df, version=session.data_version(), fallback=True, fallback_enhance='duplicate')
         # Populate vis_objects list for referring back to the visualisations
-        vis_objects.append(vis2)
+        session.vis_objects.append(vis2)
         # Append the graph, wrapped in a Div to track clicks, to graph_list
         graph2 = Graph_component(vis2)
         if graph2.div is not None:
@@ -722,21 +1014,20 @@ def update_duplicates(drop_value, n_clicks):
             print('No recommendations available. Please upload data first.')
 
         # Add entries to the action log
-        log(selected_option, 'user')
-        message = str(dups_count) + ' duplicated rows were detected'
-        log(message, 'system')
+        log(session, selected_option, 'user')
+        log(session, message, 'system')
 
         # Return all components
         graph_div = show_side_by_side(graph_list)
-        if dups_count == 0:
+        if session.dups_count == 0:
             new_div = html.Div(children=[
                 html.P(f'Selected action: {selected_option}'),
                 html.P(message, style={'color': 'green'}),
                 graph_div,
                 dcc.Dropdown(
                     placeholder='Select an action to take', 
-                    id={'type': 'duplicate-removal', 'index': step},
-                    options={'undo': 'Undo the last step'}
+                    id={'type': 'duplicate-removal', 'index': session.step},
+                    options=duplicate_options(session, {'undo': 'Undo the last step'})
                 ),
                 html.Br()
             ])
@@ -747,8 +1038,8 @@ def update_duplicates(drop_value, n_clicks):
                 graph_div,
                 dcc.Dropdown(
                     placeholder='Select an action to take', 
-                    id={'type': 'duplicate-removal', 'index': step},
-                    options={'highlight': 'Show duplicated rows', 'delete': 'Delete duplicates', 'keep': 'Keep all duplicates'}
+                    id={'type': 'duplicate-removal', 'index': session.step},
+                    options=duplicate_options(session, {'highlight': 'Show duplicated rows', 'delete': 'Delete duplicates', 'keep': 'Keep all duplicates'})
                 ),
                 html.Br()
             ])
@@ -759,22 +1050,17 @@ def update_duplicates(drop_value, n_clicks):
          
 
 # Callback to handle the first render within the 'outlier-handling' stage
-@app.callback(
+@resumable_callback(
     [Output(component_id='outlier-output', component_property='children'),
      Output(component_id='duplicate-end-btn', component_property='n_clicks')],
     [Input(component_id='duplicate-end-btn', component_property='n_clicks'),
      Input(component_id={'type': 'duplicate-removal', 'index': ALL}, component_property='value')],
+    [State(component_id='session-id', component_property='data')],
     prevent_initial_call=True,
     running=[(Output(component_id='outlier-end-btn', component_property='disabled'), True, False)]
 )
-def render_outliers(n_clicks, drop_value):
-    global current_df
-    global previous_df
-    global stage
-    global step
-    global vis_objects
-    global outlier_count
-    global outlier_contamination_history
+def render_outliers(n_clicks, drop_value, session_id=None):
+    session = session_store.get(session_id)
 
     graph_list = []
     # First render
@@ -784,41 +1070,37 @@ def render_outliers(n_clicks, drop_value):
                 return dash.no_update
         else:
             return dash.no_update
-    log('Finish Duplicate Removal', 'user')
-    stage = 'outlier-handling'
-    step += 1
-    previous_df = current_df.copy()
+    log(session, 'Finish Duplicate Removal', 'user')
+    session.stage = 'outlier-handling'
+    session.outlier_detector = None
+    session.step += 1
+    session.checkpoint()
     # Access the last visualisation rendered on the right for intent specification
-    human_previous = vis_objects[-1]
+    human_previous = session.vis_objects[-1]
     
     # Display a parallel coordinates plot
-    vis_objects, graph_list = render_machine_view(vis_objects, current_df, graph_list)
+    session.vis_objects, graph_list = render_machine_view(session, session.vis_objects, session.current_df, graph_list)
 
     # Detect and visualise outliers
-    outlier_contamination = determine_contamination(outlier_contamination_history, True)
-    outlier_contamination_history.append(outlier_contamination)
+    outlier_contamination = determine_contamination(session.outlier_contamination_history, True)
+    session.outlier_contamination_history.append(outlier_contamination)
     intent = extract_intent(human_previous.columns)
-    current_df, outlier_count = train_isolation_forest(current_df, contamination=outlier_contamination, intent=intent)
-    outlier_df = current_df.copy()
+    detect_session_outliers(session, 'outliers', outlier_contamination, intent)
+    outlier_df = session.current_df.copy(deep=False)
     outlier_df.intent = intent
     # Display the second visualisation
-    vis2 = Vis(len(vis_objects), outlier_df, enhance='outlier')
-    # Catch the missing value error if applicable:
-    if vis2.missing_value_flag or vis2.output_type == 'img':
-        # Display the second visualisation (second recommendation - num_rec=1 - rather than the first as usual)
-        temp_vis = Vis(len(vis_objects), current_df, num_rec=1, temporary=True)
-        current_df.intent = extract_intent(temp_vis.columns)
-        vis2 = Vis(len(vis_objects), current_df, enhance='outlier')
+    # Display another recommended chart if this one cannot be displayed (e.g. due to missing values)
+    vis2 = render_vis(session, 'outliers', len(session.vis_objects), outlier_df, version=session.data_version(), enhance='outlier', fallback=True)
     # Populate vis_objects list for referring back to the visualisations
-    vis_objects.append(vis2)
+    session.vis_objects.append(vis2)
     # Append the graph, wrapped in a Div to track clicks, to graph_list
     graph2 = Graph_component(vis2)
     if graph2.div is not None:
         graph_list.append(graph2.div)
 
     # Add an entry to the action log
-    message = str(outlier_count) + ' outlier values were detected'
-    log(message, 'system')
+    message = str(session.outlier_count) + ' outlier values were detected'
+    log(session, message, 'system')
     # Return all components
     graph_div = show_side_by_side(graph_list)
     new_div = html.Div(children=[
@@ -826,7 +1108,7 @@ def render_outliers(n_clicks, drop_value):
         graph_div,
         dcc.Dropdown(
             placeholder='Select an action to take', 
-            id={'type': 'outlier-handling', 'index': step},
+            id={'type': 'outlier-handling', 'index': session.step},
             options={
                 'more': 'Find more outliers', 
                 'less': 'Find less outliers', 
@@ -840,22 +1122,16 @@ def render_outliers(n_clicks, drop_value):
 
 
 # Callback to handle updates within the 'outlier-handling' stage
-@app.callback(
+@resumable_callback(
     [Output(component_id='outlier-output-1', component_property='children')],
     [Input(component_id={'type': 'outlier-handling', 'index': ALL}, component_property='value')],
-    [State(component_id='duplicate-end-btn', component_property='n_clicks')],
+    [State(component_id='duplicate-end-btn', component_property='n_clicks'),
+     State(component_id='session-id', component_property='data')],
     prevent_initial_call=True,
-    running=[(Output(component_id='outlier-end-btn', component_property='disabled'), True, False),
-             (Output(component_id={'type': 'outlier-handling', 'index': ALL}, component_property='disabled'), True, False)]
+    running=[(Output(component_id='outlier-end-btn', component_property='disabled'), True, False)]
 )
-def update_outliers(drop_value, n_clicks):
-    global current_df
-    global previous_df
-    global stage
-    global step
-    global vis_objects
-    global outlier_count
-    global outlier_contamination_history
+def update_outliers(drop_value, n_clicks, session_id=None):
+    session = session_store.get(session_id)
 
     selected_option = ''
     graph_list = []
@@ -867,44 +1143,39 @@ def update_outliers(drop_value, n_clicks):
         'keep': 'Keep all outliers',
     }
 
-    if n_clicks is None or None in drop_value or stage != 'outlier-handling':    
+    if n_clicks is None or None in drop_value or session.stage != 'outlier-handling':    
         return dash.no_update
     else:
-        if n_clicks > 0 and current_df is not None:
-            step += 1
+        if n_clicks > 0 and session.current_df is not None:
+            session.step += 1
             # Access the last visualisation rendered on the right for intent specification
-            human_previous = vis_objects[-1]
+            human_previous = session.vis_objects[-1]
 
             if 'next' == drop_value[-1] or 'accept' == drop_value[-1]:
-                stage = 'outlier-handling-2'  
+                session.stage = 'outlier-handling-2'  
                 return dash.no_update
             elif 'accept-0' == drop_value[-1]:
                 # Just got sent here from render_outliers
                 options['keep'] = 'Keep remaining outliers'
                 options['undo'] = 'Undo the last step'
                 selected_option = 'Remove the detected outliers'
-                current_df = current_df[current_df.outlier != True]
+                remove_session_outliers(session)
                 
                 # Display a parallel coordinates plot
-                vis_objects, graph_list = render_machine_view(vis_objects, current_df, graph_list)
+                session.vis_objects, graph_list = render_machine_view(session, session.vis_objects, session.current_df, graph_list)
 
                 # Detect and visualise outliers
-                outlier_contamination = outlier_contamination_history[-1]
-                outlier_contamination_history.append(outlier_contamination)
+                outlier_contamination = session.outlier_contamination_history[-1]
+                session.outlier_contamination_history.append(outlier_contamination)
                 intent = extract_intent(human_previous.columns)
-                current_df, outlier_count = train_isolation_forest(current_df, contamination=outlier_contamination, intent=intent)
-                outlier_df = current_df.copy()
+                detect_session_outliers(session, 'outliers', outlier_contamination, intent)
+                outlier_df = session.current_df.copy(deep=False)
                 outlier_df.intent = intent
                 # Display the second visualisation
-                vis2 = Vis(len(vis_objects), outlier_df, enhance='outlier')
-                # Catch the missing value error if applicable:
-                if vis2.missing_value_flag or vis2.output_type == 'img':
-                    # Display the second visualisation (second recommendation - num_rec=1 - rather than the first as usual)
-                    temp_vis = Vis(len(vis_objects), current_df, num_rec=1, temporary=True)
-                    current_df.intent = extract_intent(temp_vis.columns)
-                    vis2 = Vis(len(vis_objects), current_df, enhance='outlier')
+                # Display another recommended chart if this one cannot be displayed (e.g. due to missing values)
+                vis2 = render_vis(session, 'outliers', len(session.vis_objects), outlier_df, version=session.data_version(), enhance='outlier', fallback=True)
                 # Populate vis_objects list for referring back to the visualisations
-                vis_objects.append(vis2)
+                session.vis_objects.append(vis2)
                 # Append the graph, wrapped in a Div to track clicks, to graph_list
                 graph2 = Graph_component(vis2)
                 if graph2.div is not None:
@@ -914,43 +1185,38 @@ def update_outliers(drop_value, n_clicks):
             elif 'undo' == drop_value[-1]:
                 # Revert the dataframe back to its previous state
                 selected_option = 'Undo the last step'
-                current_df = previous_df.copy()
+                session.undo()
                 if 'undo' in options:
                     # Remove undo from the dropdown options
                     rv = options.pop('undo')
-                outlier_contamination = outlier_contamination_history[-1]
+                outlier_contamination = session.outlier_contamination_history[-1]
             elif 'more' == drop_value[-1]:
-                previous_df = current_df.copy()
+                session.checkpoint()
                 selected_option = 'Find more outliers'
                 # Increase contamination parameter to find more outliers
-                outlier_contamination = determine_contamination(outlier_contamination_history, True)
-                outlier_contamination_history.append(outlier_contamination)
+                outlier_contamination = determine_contamination(session.outlier_contamination_history, True)
+                session.outlier_contamination_history.append(outlier_contamination)
             elif 'less' in drop_value[-1]:
-                previous_df = current_df.copy()
+                session.checkpoint()
                 selected_option = 'Find less outliers'
                 # Decrease contamination parameter to find more outliers
-                outlier_contamination = determine_contamination(outlier_contamination_history, False)
-                outlier_contamination_history.append(outlier_contamination)
+                outlier_contamination = determine_contamination(session.outlier_contamination_history, False)
+                session.outlier_contamination_history.append(outlier_contamination)
             else:
                 return dash.no_update
                 
             # Display a parallel coordinates plot
-            vis_objects, graph_list = render_machine_view(vis_objects, current_df, graph_list)
+            session.vis_objects, graph_list = render_machine_view(session, session.vis_objects, session.current_df, graph_list)
             
             intent = extract_intent(human_previous.columns)
-            current_df, outlier_count = train_isolation_forest(current_df, contamination=outlier_contamination, intent=intent)
-            outlier_df = current_df.copy()
+            detect_session_outliers(session, 'outliers', outlier_contamination, intent)
+            outlier_df = session.current_df.copy(deep=False)
             outlier_df.intent = intent
             # Display the second visualisation
-            vis2 = Vis(len(vis_objects), outlier_df, enhance='outlier')
-            # Catch the missing value error if applicable:
-            if vis2.missing_value_flag or vis2.output_type == 'img':
-                # Display the second visualisation (second recommendation - num_rec=1 - rather than the first as usual)
-                temp_vis = Vis(len(vis_objects), current_df, num_rec=1, temporary=True)
-                current_df.intent = extract_intent(temp_vis.columns)
-                vis2 = Vis(len(vis_objects), current_df, enhance='outlier')
+            # Display another recommended chart if this one cannot be displayed (e.g. due to missing values)
+            vis2 = render_vis(session, 'outliers', len(session.vis_objects), outlier_df, version=session.data_version(), enhance='outlier', fallback=True)
             # Populate vis_objects list for referring back to the visualisations
-            vis_objects.append(vis2)
+            session.vis_objects.append(vis2)
             # Append the graph, wrapped in a Div to track clicks, to graph_list
             graph2 = Graph_component(vis2)
             if graph2.div is not None:
@@ -960,9 +1226,9 @@ def update_outliers(drop_value, n_clicks):
 
             # Add entries to the action log
             if drop_value[-1] != 'accept':
-                log(selected_option, 'user')
-                message = str(outlier_count) + ' outlier values were detected'
-                log(message, 'system')
+                log(session, selected_option, 'user')
+                message = str(session.outlier_count) + ' outlier values were detected'
+                log(session, message, 'system')
             # Return all components
             graph_div = show_side_by_side(graph_list)
             new_div = html.Div(children=[
@@ -971,7 +1237,7 @@ def update_outliers(drop_value, n_clicks):
                 graph_div,
                 dcc.Dropdown(
                     placeholder='Select an action to take', 
-                    id={'type': 'outlier-handling', 'index': step},
+                    id={'type': 'outlier-handling', 'index': session.step},
                     options=options
                 ),
                 html.Br()
@@ -982,22 +1248,16 @@ def update_outliers(drop_value, n_clicks):
 
 
 # Callback to handle updates within the 'outlier-handling' stage #2
-@app.callback(
+@resumable_callback(
     [Output(component_id='outlier-output-2', component_property='children')],
     [Input(component_id={'type': 'outlier-handling', 'index': ALL}, component_property='value')],
-    [State(component_id='duplicate-end-btn', component_property='n_clicks')],
+    [State(component_id='duplicate-end-btn', component_property='n_clicks'),
+     State(component_id='session-id', component_property='data')],
     prevent_initial_call=True,
-    running=[(Output(component_id='outlier-end-btn', component_property='disabled'), True, False),
-             (Output(component_id={'type': 'outlier-handling', 'index': ALL}, component_property='disabled'), True, False)]
+    running=[(Output(component_id='outlier-end-btn', component_property='disabled'), True, False)]
 )
-def update_outliers_2(drop_value, n_clicks):
-    global current_df
-    global previous_df
-    global stage
-    global step
-    global vis_objects
-    global outlier_count
-    global outlier_contamination_history
+def update_outliers_2(drop_value, n_clicks, session_id=None):
+    session = session_store.get(session_id)
 
     selected_option = ''
     graph_list = []
@@ -1009,41 +1269,36 @@ def update_outliers_2(drop_value, n_clicks):
         'keep': 'Keep remaining outliers'
     }
 
-    if n_clicks is None or None in drop_value or len(drop_value) < 2 or stage != 'outlier-handling-2':    
+    if n_clicks is None or None in drop_value or len(drop_value) < 2 or session.stage != 'outlier-handling-2':    
         return dash.no_update
     else:
-        if n_clicks > 0 and current_df is not None:
-            stage = 'outlier-handling-2'
-            step += 1
+        if n_clicks > 0 and session.current_df is not None:
+            session.stage = 'outlier-handling-2'
+            session.step += 1
             # Access the last visualisation rendered on the right for intent specification
-            human_previous = vis_objects[-1]
+            human_previous = session.vis_objects[-1]
 
             if 'accept' == drop_value[-1]:
                 # Just got sent here from update_outliers
                 options['undo-2'] = 'Undo the last step'
                 selected_option = 'Remove the detected outliers'
-                current_df = current_df[current_df.outlier != True]
+                remove_session_outliers(session)
                 
                 # Display a parallel coordinates plot
-                vis_objects, graph_list = render_machine_view(vis_objects, current_df, graph_list)
+                session.vis_objects, graph_list = render_machine_view(session, session.vis_objects, session.current_df, graph_list)
 
                 # Detect and visualise outliers
-                outlier_contamination = outlier_contamination_history[-1]
-                outlier_contamination_history.append(outlier_contamination)
+                outlier_contamination = session.outlier_contamination_history[-1]
+                session.outlier_contamination_history.append(outlier_contamination)
                 intent = extract_intent(human_previous.columns)
-                current_df, outlier_count = train_isolation_forest(current_df, contamination=outlier_contamination, intent=intent)
-                outlier_df = current_df.copy()
+                detect_session_outliers(session, 'outliers-2', outlier_contamination, intent)
+                outlier_df = session.current_df.copy(deep=False)
                 outlier_df.intent = intent
                 # Display the second visualisation
-                vis2 = Vis(len(vis_objects), outlier_df, enhance='outlier')
-                # Catch the missing value error if applicable:
-                if vis2.missing_value_flag or vis2.output_type == 'img':
-                    # Display the second visualisation (second recommendation - num_rec=1 - rather than the first as usual)
-                    temp_vis = Vis(len(vis_objects), current_df, num_rec=1, temporary=True)
-                    current_df.intent = extract_intent(temp_vis.columns)
-                    vis2 = Vis(len(vis_objects), current_df, enhance='outlier')
+                # Display another recommended chart if this one cannot be displayed (e.g. due to missing values)
+                vis2 = render_vis(session, 'outliers-2', len(session.vis_objects), outlier_df, version=session.data_version(), enhance='outlier', fallback=True)
                 # Populate vis_objects list for referring back to the visualisations
-                vis_objects.append(vis2)
+                session.vis_objects.append(vis2)
                 # Append the graph, wrapped in a Div to track clicks, to graph_list
                 graph2 = Graph_component(vis2)
                 if graph2.div is not None:
@@ -1052,33 +1307,24 @@ def update_outliers_2(drop_value, n_clicks):
                     print('No recommendations available. Please upload data first.')
             else:
                 # Access the last visualisation rendered on the right for intent specification
-                human_previous = vis_objects[-1]
+                human_previous = session.vis_objects[-1]
                 if 'next' == drop_value[-1]:
-                    previous_df = current_df.copy()
+                    session.checkpoint()
                     # Just got sent here from update_outliers_1
                     selected_option = 'Show remaining outliers'
 
                     # Display a parallel coordinates plot
-                    vis_objects, graph_list = render_machine_view(vis_objects, current_df, graph_list)
+                    session.vis_objects, graph_list = render_machine_view(session, session.vis_objects, session.current_df, graph_list)
                     
                     # Detect and visualise outliers
-                    outlier_contamination = outlier_contamination_history[-1]
-                    outlier_contamination_history.append(outlier_contamination)
-                    current_df, outlier_count = train_isolation_forest(current_df, contamination=outlier_contamination)
-                    current_df = lux.LuxDataFrame(current_df)
+                    outlier_contamination = session.outlier_contamination_history[-1]
+                    session.outlier_contamination_history.append(outlier_contamination)
+                    detect_session_outliers(session, 'outliers-2', outlier_contamination)
 
                     # Display the second visualisation (second recommendation - num_rec=1 - rather than the first as usual)
-                    temp_vis = Vis(len(vis_objects), current_df, num_rec=1, temporary=True)
-                    current_df.intent = extract_intent(temp_vis.columns)
-                    vis2 = Vis(len(vis_objects), current_df, enhance='outlier')
-                    # Catch the missing value error if applicable:
-                    if vis2.missing_value_flag or vis2.output_type == 'img':
-                        # Display the second visualisation (second recommendation - num_rec=1 - rather than the first as usual)
-                        temp_vis = Vis(len(vis_objects), current_df, num_rec=1, temporary=True)
-                        current_df.intent = extract_intent(temp_vis.columns)
-                        vis2 = Vis(len(vis_objects), current_df, enhance='outlier')
+                    vis2 = render_vis(session, 'outliers-2', len(session.vis_objects), session.current_df, enhance='outlier', alternative=True)
                     # Populate vis_objects list for referring back to the visualisations
-                    vis_objects.append(vis2)
+                    session.vis_objects.append(vis2)
                     # Append the graph, wrapped in a Div to track clicks, to graph_list
                     graph2 = Graph_component(vis2)
                     if graph2.div is not None:
@@ -1089,54 +1335,47 @@ def update_outliers_2(drop_value, n_clicks):
                 elif 'undo-2' == drop_value[-1]:
                     # Revert the dataframe back to its previous state
                     selected_option = 'Undo the last step'
-                    current_df = previous_df.copy()
+                    session.undo()
                     if 'undo-2' in options:
                         # Remove undo from the dropdown options
                         rv = options.pop('undo-2')
-                    outlier_contamination = outlier_contamination_history[-1]
+                    outlier_contamination = session.outlier_contamination_history[-1]
                 elif 'more-2' == drop_value[-1]:
-                    previous_df = current_df.copy()
+                    session.checkpoint()
                     selected_option = 'Find more outliers'
                     # Increase contamination parameter to find more outliers
-                    outlier_contamination = determine_contamination(outlier_contamination_history, True)
-                    outlier_contamination_history.append(outlier_contamination)
+                    outlier_contamination = determine_contamination(session.outlier_contamination_history, True)
+                    session.outlier_contamination_history.append(outlier_contamination)
                 elif 'less-2' in drop_value[-1]:
-                    previous_df = current_df.copy()
+                    session.checkpoint()
                     selected_option = 'Find less outliers'
                     # Decrease contamination parameter to find more outliers
-                    outlier_contamination = determine_contamination(outlier_contamination_history, False)
-                    outlier_contamination_history.append(outlier_contamination)
+                    outlier_contamination = determine_contamination(session.outlier_contamination_history, False)
+                    session.outlier_contamination_history.append(outlier_contamination)
                 elif 'remove' == drop_value[-1]:
                     # Remove the selected outliers (handled by the next callback function and in a new UI section)
-                    stage = 'outlier-handling-3'
+                    session.stage = 'outlier-handling-3'
                     return dash.no_update
                 else:
                     return dash.no_update
                     
                 # Display a parallel coordinates plot
-                vis_objects, graph_list = render_machine_view(vis_objects, current_df, graph_list)
+                session.vis_objects, graph_list = render_machine_view(session, session.vis_objects, session.current_df, graph_list)
                 
                 intent = extract_intent(human_previous.columns)
-                current_df, outlier_count = train_isolation_forest(current_df, contamination=outlier_contamination, intent=intent)
-                outlier_df = current_df.copy()
+                detect_session_outliers(session, 'outliers-2', outlier_contamination, intent)
+                outlier_df = session.current_df.copy(deep=False)
                 outlier_df.intent = intent
                 # Display the second visualisation, catching any AttributeError that occurs
                 try:
-                    vis2 = Vis(len(vis_objects), outlier_df, enhance='outlier')
-                    # Catch the missing value error if applicable:
-                    if vis2.missing_value_flag or vis2.output_type == 'img':
-                        # Display the second visualisation (second recommendation - num_rec=1 - rather than the first as usual)
-                        temp_vis = Vis(len(vis_objects), current_df, num_rec=1, temporary=True)
-                        current_df.intent = extract_intent(temp_vis.columns)
-                        vis2 = Vis(len(vis_objects), current_df, enhance='outlier')
+                    # Display another recommended chart if this one cannot be displayed (e.g. due to missing values)
+                    vis2 = render_vis(session, 'outliers-2', len(session.vis_objects), outlier_df, version=session.data_version(), enhance='outlier', fallback=True)
                 except AttributeError as e:
                     print(e)
                     # Display the second visualisation (second recommendation - num_rec=1 - rather than the first as usual)
-                    temp_vis = Vis(len(vis_objects), current_df, num_rec=1, temporary=True)
-                    current_df.intent = extract_intent(temp_vis.columns)
-                    vis2 = Vis(len(vis_objects), current_df, enhance='outlier')
+                    vis2 = render_vis(session, 'outliers-2', len(session.vis_objects), session.current_df, enhance='outlier', alternative=True)
                 # Populate vis_objects list for referring back to the visualisations
-                vis_objects.append(vis2)
+                session.vis_objects.append(vis2)
                 # Append the graph, wrapped in a Div to track clicks, to graph_list
                 graph2 = Graph_component(vis2)
                 if graph2.div is not None:
@@ -1146,9 +1385,9 @@ def update_outliers_2(drop_value, n_clicks):
 
             # Add entries to the action log
             if drop_value[-1] != 'remove':
-                log(selected_option, 'user')
-                message = str(outlier_count) + ' new potential outlier values were detected. If no more outliers should be removed, please click on "Finish Outlier Handling" below.'
-                log(message, 'system')
+                log(session, selected_option, 'user')
+                message = str(session.outlier_count) + ' new potential outlier values were detected. If no more outliers should be removed, please click on "Finish Outlier Handling" below.'
+                log(session, message, 'system')
             # Return all components
             graph_div = show_side_by_side(graph_list)
             new_div = html.Div(children=[
@@ -1157,7 +1396,7 @@ def update_outliers_2(drop_value, n_clicks):
                 graph_div,
                 dcc.Dropdown(
                     placeholder='Select an action to take', 
-                    id={'type': 'outlier-handling', 'index': step},
+                    id={'type': 'outlier-handling', 'index': session.step},
                     options=options
                 )
             ])
@@ -1167,22 +1406,16 @@ def update_outliers_2(drop_value, n_clicks):
 
 
 # Callback to handle updates within the 'outlier-handling' stage #3 (final UI section for this stage)
-@app.callback(
+@resumable_callback(
     [Output(component_id='outlier-output-3', component_property='children')],
     [Input(component_id={'type': 'outlier-handling', 'index': ALL}, component_property='value')],
-    [State(component_id='duplicate-end-btn', component_property='n_clicks')],
+    [State(component_id='duplicate-end-btn', component_property='n_clicks'),
+     State(component_id='session-id', component_property='data')],
     prevent_initial_call=True,
-    running=[(Output(component_id='outlier-end-btn', component_property='disabled'), True, False),
-             (Output(component_id={'type': 'outlier-handling', 'index': ALL}, component_property='disabled'), True, False)]
+    running=[(Output(component_id='outlier-end-btn', component_property='disabled'), True, False)]
 )
-def update_outliers_3(drop_value, n_clicks):
-    global current_df
-    global previous_df
-    global stage
-    global step
-    global vis_objects
-    global outlier_count
-    global outlier_contamination_history
+def update_outliers_3(drop_value, n_clicks, session_id=None):
+    session = session_store.get(session_id)
 
     selected_option = ''
     graph_list = []
@@ -1194,41 +1427,36 @@ def update_outliers_3(drop_value, n_clicks):
         'keep': 'Keep remaining outliers'
     }
 
-    if n_clicks is None or None in drop_value or len(drop_value) < 2  or stage != 'outlier-handling-3':    
+    if n_clicks is None or None in drop_value or len(drop_value) < 2  or session.stage != 'outlier-handling-3':    
         return dash.no_update
     else:
-        if n_clicks > 0 and current_df is not None:
-            stage = 'outlier-handling-3'
-            step += 1
+        if n_clicks > 0 and session.current_df is not None:
+            session.stage = 'outlier-handling-3'
+            session.step += 1
             # Access the last visualisation rendered on the right for intent specification
-            human_previous = vis_objects[-1]
+            human_previous = session.vis_objects[-1]
 
             if 'remove' == drop_value[-1] or 'remove-3' == drop_value[-1]:
                 # Just got sent here from update_outliers_2, or it is the final removal
                 options['undo-3'] = 'Undo the last step'
                 selected_option = 'Remove the detected outliers'
-                current_df = current_df[current_df.outlier != True]
+                remove_session_outliers(session)
                 
                 # Display a parallel coordinates plot
-                vis_objects, graph_list = render_machine_view(vis_objects, current_df, graph_list)
+                session.vis_objects, graph_list = render_machine_view(session, session.vis_objects, session.current_df, graph_list)
 
                 # Detect and visualise outliers
-                outlier_contamination = outlier_contamination_history[-1]
-                outlier_contamination_history.append(outlier_contamination)
+                outlier_contamination = session.outlier_contamination_history[-1]
+                session.outlier_contamination_history.append(outlier_contamination)
                 intent = extract_intent(human_previous.columns)
-                current_df, outlier_count = train_isolation_forest(current_df, contamination=outlier_contamination, intent=intent)
-                outlier_df = current_df.copy()
+                detect_session_outliers(session, 'outliers-3', outlier_contamination, intent)
+                outlier_df = session.current_df.copy(deep=False)
                 outlier_df.intent = intent
                 # Display the second visualisation
-                vis2 = Vis(len(vis_objects), outlier_df, enhance='outlier')
-                # Catch the missing value error if applicable:
-                if vis2.missing_value_flag or vis2.output_type == 'img':
-                    # Display the second visualisation (second recommendation - num_rec=1 - rather than the first as usual)
-                    temp_vis = Vis(len(vis_objects), current_df, num_rec=1, temporary=True)
-                    current_df.intent = extract_intent(temp_vis.columns)
-                    vis2 = Vis(len(vis_objects), current_df, enhance='outlier')
+                # Display another recommended chart if this one cannot be displayed (e.g. due to missing values)
+                vis2 = render_vis(session, 'outliers-3', len(session.vis_objects), outlier_df, version=session.data_version(), enhance='outlier', fallback=True)
                 # Populate vis_objects list for referring back to the visualisations
-                vis_objects.append(vis2)
+                session.vis_objects.append(vis2)
                 # Append the graph, wrapped in a Div to track clicks, to graph_list
                 graph2 = Graph_component(vis2)
                 if graph2.div is not None:
@@ -1237,54 +1465,47 @@ def update_outliers_3(drop_value, n_clicks):
                     print('No recommendations available. Please upload data first.')
             else:
                 # Access the last visualisation rendered on the right for intent specification
-                human_previous = vis_objects[-1]
+                human_previous = session.vis_objects[-1]
                 if 'undo-3' == drop_value[-1]:
                     # Revert the dataframe back to its previous state
                     selected_option = 'Undo the last step'
-                    current_df = previous_df.copy()
+                    session.undo()
                     if 'undo-3' in options:
                         # Remove undo from the dropdown options
                         rv = options.pop('undo-3')
-                    outlier_contamination = outlier_contamination_history[-1]
+                    outlier_contamination = session.outlier_contamination_history[-1]
                 elif 'more-3' == drop_value[-1]:
-                    previous_df = current_df.copy()
+                    session.checkpoint()
                     selected_option = 'Find more outliers'
                     # Increase contamination parameter to find more outliers
-                    outlier_contamination = determine_contamination(outlier_contamination_history, True)
-                    outlier_contamination_history.append(outlier_contamination)
+                    outlier_contamination = determine_contamination(session.outlier_contamination_history, True)
+                    session.outlier_contamination_history.append(outlier_contamination)
                 elif 'less-3' in drop_value[-1]:
-                    previous_df = current_df.copy()
+                    session.checkpoint()
                     selected_option = 'Find less outliers'
                     # Decrease contamination parameter to find more outliers
-                    outlier_contamination = determine_contamination(outlier_contamination_history, False)
-                    outlier_contamination_history.append(outlier_contamination)
+                    outlier_contamination = determine_contamination(session.outlier_contamination_history, False)
+                    session.outlier_contamination_history.append(outlier_contamination)
                 else:
                     return dash.no_update
                 
                 # Display a parallel coordinates plot
-                vis_objects, graph_list = render_machine_view(vis_objects, current_df, graph_list)
+                session.vis_objects, graph_list = render_machine_view(session, session.vis_objects, session.current_df, graph_list)
                 
                 intent = extract_intent(human_previous.columns)
-                current_df, outlier_count = train_isolation_forest(current_df, contamination=outlier_contamination, intent=intent)
-                outlier_df = current_df.copy()
+                detect_session_outliers(session, 'outliers-3', outlier_contamination, intent)
+                outlier_df = session.current_df.copy(deep=False)
                 outlier_df.intent = intent
                 # Display the second visualisation, catching any AttributeError that occurs
                 try:
-                    vis2 = Vis(len(vis_objects), outlier_df, enhance='outlier')
-                    # Catch the missing value error if applicable:
-                    if vis2.missing_value_flag or vis2.output_type == 'img':
-                        # Display the second visualisation (second recommendation - num_rec=1 - rather than the first as usual)
-                        temp_vis = Vis(len(vis_objects), current_df, num_rec=1, temporary=True)
-                        current_df.intent = extract_intent(temp_vis.columns)
-                        vis2 = Vis(len(vis_objects), current_df, enhance='outlier')
+                    # Display another recommended chart if this one cannot be displayed (e.g. due to missing values)
+                    vis2 = render_vis(session, 'outliers-3', len(session.vis_objects), outlier_df, version=session.data_version(), enhance='outlier', fallback=True)
                 except AttributeError as e:
                     print(e)
                     # Display the second visualisation (second recommendation - num_rec=1 - rather than the first as usual)
-                    temp_vis = Vis(len(vis_objects), current_df, num_rec=1, temporary=True)
-                    current_df.intent = extract_intent(temp_vis.columns)
-                    vis2 = Vis(len(vis_objects), current_df, enhance='outlier')
+                    vis2 = render_vis(session, 'outliers-3', len(session.vis_objects), session.current_df, enhance='outlier', alternative=True)
                 # Populate vis_objects list for referring back to the visualisations
-                vis_objects.append(vis2)
+                session.vis_objects.append(vis2)
                 # Append the graph, wrapped in a Div to track clicks, to graph_list
                 graph2 = Graph_component(vis2)
                 if graph2.div is not None:
@@ -1293,9 +1514,9 @@ def update_outliers_3(drop_value, n_clicks):
                     print('No recommendations available. Please upload data first.')
 
             # Add entries to the action log
-            log(selected_option, 'user')
-            message = str(outlier_count) + ' new potential outlier values were detected. If no more outliers should be removed, please click on "Finish Outlier Handling" below.'
-            log(message, 'system')
+            log(session, selected_option, 'user')
+            message = str(session.outlier_count) + ' new potential outlier values were detected. If no more outliers should be removed, please click on "Finish Outlier Handling" below.'
+            log(session, message, 'system')
             # Return all components
             graph_div = show_side_by_side(graph_list)
             new_div = html.Div(children=[
@@ -1304,7 +1525,7 @@ def update_outliers_3(drop_value, n_clicks):
                 graph_div,
                 dcc.Dropdown(
                     placeholder='Select an action to take', 
-                    id={'type': 'outlier-handling', 'index': step},
+                    id={'type': 'outlier-handling', 'index': session.step},
                     options=options
                 ),
                 html.Br()
@@ -1373,6 +1594,7 @@ def indicate_process_end(start_n_clicks, miss_n_clicks, dup_n_clicks, out_n_clic
      Output(component_id='download-header', component_property='style'),
      Output(component_id='download-info', component_property='style'),
      Output(component_id='download-btn', component_property='style'),
+     Output(component_id='plan-btn', component_property='style'),
      Output(component_id='completion-message', component_property='style')],
     [Input(component_id='upload-data', component_property='contents'),
      Input(component_id='dataset-selection', component_property='value'),
@@ -1384,84 +1606,125 @@ def indicate_process_end(start_n_clicks, miss_n_clicks, dup_n_clicks, out_n_clic
      Input(component_id='download-btn', component_property='n_clicks'),
      Input(component_id={'type': 'duplicate-removal', 'index': ALL}, component_property='value'),
      Input(component_id={'type': 'outlier-handling', 'index': ALL}, component_property='value')],
+    [State(component_id='session-id', component_property='data')],
     prevent_initial_call=True
 )
-def update_progress(contents, selected_dataset, click_start, click_miss, click_dup, click_out, click_down, click_down_dash, drop_dup, drop_out):
-    global download_completion
-    global load_colour
-    global miss_colour
-    global dup_colour
-    global out_colour
-    global down_colour
-    global missing_style
-    global dup_style
-    global out_style
-    global info_style
-    global download_style
-    global down_info_style
-    global completion_style
+def update_progress(contents, selected_dataset, click_start, click_miss, click_dup, click_out, click_down, click_down_dash, drop_dup, drop_out, session_id=None):
+    session = session_store.get(session_id)
 
     ctx = dash.callback_context
 
     # If buttons are clicked, change the respective progress bars
     changed_id = [p['prop_id'] for p in dash.callback_context.triggered][0]
     
-    load_colour, miss_colour, dup_colour, out_colour, down_colour, missing_style, dup_style, out_style, info_style, download_style, down_info_style, completion_style, download_completion, log_msg = style_progress(ctx, changed_id, click_out, download_completion, drop_dup, drop_out, load_colour, miss_colour, dup_colour, out_colour, down_colour, missing_style, dup_style, out_style, info_style, download_style, down_info_style, completion_style)
+    session.load_colour, session.miss_colour, session.dup_colour, session.out_colour, session.down_colour, session.missing_style, session.dup_style, session.out_style, session.info_style, session.download_style, session.down_info_style, session.completion_style, session.download_completion, log_msg = style_progress(ctx, changed_id, click_out, session.download_completion, drop_dup, drop_out, session.load_colour, session.miss_colour, session.dup_colour, session.out_colour, session.down_colour, session.missing_style, session.dup_style, session.out_style, session.info_style, session.download_style, session.down_info_style, session.completion_style)
 
     if log_msg[0] != '':
-        log(log_msg[0], log_msg[1])
+        log(session, log_msg[0], log_msg[1])
     
     return (
-        {'background-color': load_colour, 'color': 'white'},  # progress-load
-        {'background-color': miss_colour, 'color': 'white'},  # progress-missing
-        {'background-color': dup_colour, 'color': 'white'},   # progress-duplicate
-        {'background-color': out_colour, 'color': 'white'},   # progress-outlier
-        {'background-color': down_colour, 'color': 'white'},  # progress-download
-        missing_style,    # missing-end-btn
-        dup_style,        # duplicate-end-btn
-        out_style,        # outlier-end-btn
-        info_style,       # out-end-info
-        download_style,   # csv-btn
-        download_style,   # download-header
-        down_info_style,  # download-info
-        download_style,   # download-btn
-        completion_style  # completion-message
+        {'background-color': session.load_colour, 'color': 'white'},  # progress-load
+        {'background-color': session.miss_colour, 'color': 'white'},  # progress-missing
+        {'background-color': session.dup_colour, 'color': 'white'},   # progress-duplicate
+        {'background-color': session.out_colour, 'color': 'white'},   # progress-outlier
+        {'background-color': session.down_colour, 'color': 'white'},  # progress-download
+        session.missing_style,    # missing-end-btn
+        session.dup_style,        # duplicate-end-btn
+        session.out_style,        # outlier-end-btn
+        session.info_style,       # out-end-info
+        session.download_style,   # csv-btn
+        session.download_style,   # download-header
+        session.down_info_style,  # download-info
+        session.download_style,   # download-btn
+        session.download_style,   # plan-btn
+        session.completion_style  # completion-message
     )
 
 
+# Callback to show the progress of background computations
+@app.callback(
+    Output(component_id='job-progress', component_property='children'),
+    Input(component_id='job-progress-interval', component_property='n_intervals'),
+    State(component_id='session-id', component_property='data'),
+    prevent_initial_call=True
+)
+def show_job_progress(n_intervals, session_id=None):
+    session = session_store.peek(session_id)
+    status = None
+    if session is not None and session.job_slot is not None:
+        status = job_runner.slot_status((session.session_id, session.job_slot))
+    # The progress bar is cleared once the job is done, cancelled or failed
+    if status is None or status['state'] in ('done', 'cancelled', 'failed'):
+        return []
+    return [
+        html.P(status['message'] if status['state'] == 'running' else 'Waiting for a free worker...'),
+        dbc.Progress(value=int(status['progress'] * 100), striped=True, animated=True)
+    ]
+
+
+# Callback to announce that the job of a session's pending callback call has finished, so that the callback is
+# called again (see resumable_callback)
+@app.callback(
+    Output(component_id='finished-job', component_property='data'),
+    Input(component_id='job-progress-interval', component_property='n_intervals'),
+    State(component_id='session-id', component_property='data'),
+    prevent_initial_call=True
+)
+def finish_pending_call(n_intervals, session_id=None):
+    session = session_store.peek(session_id)
+    call = session.pending_call if session is not None else None
+    if call is None or not job_runner.done(call.job_id):
+        raise dash.exceptions.PreventUpdate
+    return call.job_id
+
+
 ######################################################################
-### Callback functions for the downloading of the cleaned data and ###
-### action log                                                     ###
+### Callback functions for the downloading of the cleaned data,   ###
+### action log and cleaning plan                                   ###
 
 # Callback to download cleaned dataset into a csv file
 @app.callback(
     Output(component_id='download-dataframe-csv', component_property='data'),
     Input(component_id='csv-btn', component_property='n_clicks'),
+    State(component_id='session-id', component_property='data'),
     prevent_initial_call=True,
 )
-def func(n_clicks):
-    global file_name
-    return dcc.send_data_frame(downloadable_data(current_df).to_csv, file_name)
+def func(n_clicks, session_id=None):
+    session = session_store.get(session_id)
+    return dcc.send_data_frame(downloadable_data(session.current_df).to_csv, session.file_name)
 
 
 # Callback to download log into a txt file
 @app.callback(
     Output(component_id='download-log', component_property='data'),
     Input(component_id='download-btn', component_property='n_clicks'),
+    State(component_id='session-id', component_property='data'),
     prevent_initial_call=True,
 )
-def save_list_to_file(n_clicks):
-    global file_name
-    global action_log
+def save_list_to_file(n_clicks, session_id=None):
+    session = session_store.get(session_id)
     # Create a suitable filename
-    filename = file_name[:-4]
+    filename = session.file_name[:-4]
     filename = filename + '_log.txt'
     # Convert the list into a file-like object
-    file_content = "\n".join(action_log)  # Each item on a new line
+    file_content = "\n".join(session.action_log)  # Each item on a new line
     file_obj = io.StringIO(file_content)
     return dict(content=file_obj.getvalue(), filename=filename)
 
 
+# Callback to download the cleaning plan into a json file, which can be replayed on the full data
+@app.callback(
+    Output(component_id='download-plan', component_property='data'),
+    Input(component_id='plan-btn', component_property='n_clicks'),
+    State(component_id='session-id', component_property='data'),
+    prevent_initial_call=True,
+)
+def save_plan_to_file(n_clicks, session_id=None):
+    session = session_store.get(session_id)
+    filename = session.file_name[:-4] + '_plan.json'
+    return dict(content=session.plan.to_json(), filename=filename)
+
+
 #########################################
 ### Functionality for running the app ###
 
@@ -1470,4 +1733,8 @@ server = app.server
 
 # Run the Dash app
 if __name__ == '__main__':
+    # Warm up the rendering workers while the server starts, in the process serving the requests
+    # (not in the reloader process of debug mode, which only watches the files)
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        render_pool.start()
     app.run(debug=True)
@@ -3,16 +3,28 @@
 ### duplicated rows                                                 ###
 #######################################################################
 
-def detect_duplicates(df, keep='first'):
+import numpy as np
+from classes.duplicate_index import DuplicateIndex
+
+def detect_duplicates(df, keep='first', index=None):
     # Reset previous detection steps
     if 'duplicate' in df.columns:
         df = df.drop('duplicate', axis=1)
-    df_copy = df
-    # Remove interfering columns
-    if 'id' in df_copy.columns:
-        df_copy = df_copy.drop('id', axis=1)
-    # Add a new column 
-    df['duplicate'] = df_copy.duplicated(keep=keep)
+    # Hash every row once (ignoring the 'id' column), unless an up-to-date index is given
+    if index is None:
+        index = DuplicateIndex.from_frame(df)
+    # Add a new column (to a shallow copy, so that the caller's DataFrame is never modified)
+    df = df.assign(duplicate=index.duplicated(keep=keep))
     # Count the number of duplicates detected
-    dups_count = df['duplicate'].value_counts().get(True, 0)
+    dups_count = int(df['duplicate'].sum())
     return df, dups_count
+
+def highlight_duplicates(df, index=None):
+    if index is None:
+        index = DuplicateIndex.from_frame(df)
+    # Select all members of every cluster of identical rows, and show the members of a cluster together
+    members = np.flatnonzero(index.duplicated(keep=False))
+    order = np.argsort(index.codes[members], kind='stable')
+    if 'duplicate' in df.columns:
+        df = df.drop('duplicate', axis=1)
+    return df.iloc[members[order]].assign(duplicate=True)
@@ -0,0 +1,118 @@
+#######################################################################
+### This file contains functionality to compact the figures sent   ###
+### to the browser, by encoding the large numeric arrays of their   ###
+### traces as base64 typed arrays instead of lists of numbers, and  ###
+### to measure or estimate the size of the resulting payloads       ###
+#######################################################################
+
+import os
+import base64
+import numpy as np
+import plotly.io as pio
+
+# Arrays with fewer values are sent as lists, which can be overridden with the VDW_TYPED_ARRAY_MIN_LENGTH environment variable
+TYPED_ARRAY_MIN_LENGTH = int(os.environ.get('VDW_TYPED_ARRAY_MIN_LENGTH', 256))
+# Whether the payload size of every figure is printed, which can be set with the VDW_REPORT_PAYLOADS environment variable
+REPORT_PAYLOADS = os.environ.get('VDW_REPORT_PAYLOADS', '0') == '1'
+# Types of the typed arrays that Plotly.js decodes (64-bit integers are not among them)
+TYPED_ARRAY_DTYPES = {
+    'int8': 'i1', 'uint8': 'u1', 'int16': 'i2', 'uint16': 'u2',
+    'int32': 'i4', 'uint32': 'u4', 'float32': 'f4', 'float64': 'f8'
+}
+# Estimated number of characters of a number (or another value without a length) in JSON
+ESTIMATED_NUMBER_BYTES = 8
+# Trace attributes that hold labels rather than numbers, and are always sent as lists
+LABEL_KEYS = {'text', 'hovertext', 'ids', 'labels', 'name', 'meta', 'selectedpoints', 'ticktext'}
+
+
+# Smallest type of the typed arrays holding integers between the given bounds
+def integer_dtype(low, high):
+    for dtype in (np.uint8, np.int8, np.uint16, np.int16, np.uint32, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return np.float64
+
+
+# Encode an array of numbers as a Plotly typed array specification, or return None if it is not numeric
+def typed_array(values):
+    try:
+        array = np.asarray(values)
+    except ValueError:
+        # Ragged nested lists
+        return None
+    if array.dtype.kind not in 'iuf' or array.ndim not in (1, 2) or array.size == 0:
+        return None
+    if array.dtype.kind in 'iu':
+        # Integers are sent in the smallest type that holds them (Plotly.js has no 64-bit integers, so larger ones are sent as floats)
+        array = array.astype(integer_dtype(array.min(), array.max()))
+    elif array.dtype == np.float16:
+        array = array.astype(np.float32)
+    dtype = TYPED_ARRAY_DTYPES[array.dtype.name]
+    spec = {'dtype': dtype, 'bdata': base64.b64encode(np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<')).tobytes()).decode('ascii')}
+    if array.ndim == 2:
+        # Rows and columns of two-dimensional arrays (e.g. the z values of heatmaps)
+        spec['shape'] = '%d,%d' % array.shape
+    return spec
+
+
+# Replace the large numeric arrays of a trace (or of its nested attributes, e.g. marker colours or dimensions) by typed arrays
+def compact_value(value, min_length):
+    if isinstance(value, dict):
+        return {key: (item if key in LABEL_KEYS else compact_value(item, min_length)) for key, item in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        if len(value) >= min_length or (len(value) > 0 and isinstance(value[0], (list, tuple, np.ndarray)) and len(value) * len(value[0]) >= min_length):
+            spec = typed_array(value)
+            if spec is not None:
+                return spec
+        if len(value) > 0 and isinstance(value[0], dict):
+            # Lists of objects, e.g. the dimensions of a parallel coordinates plot
+            return [compact_value(item, min_length) for item in value]
+    return value
+
+
+# Compact a figure (a dict or a Plotly figure) for sending it to the browser; the layout is kept as it is
+def compact_figure(figure, min_length=TYPED_ARRAY_MIN_LENGTH):
+    if hasattr(figure, 'to_plotly_json'):
+        figure = figure.to_plotly_json()
+    compact = dict(figure)
+    compact['data'] = [compact_value(trace, min_length) for trace in figure.get('data', [])]
+    return compact
+
+
+# Size of a figure as sent to the browser, in bytes of JSON
+def payload_size(figure):
+    return len(pio.to_json(figure, validate=False).encode('utf-8'))
+
+
+# Estimated number of characters of a value in JSON, without serialising it: the lengths of its strings (which
+# include the base64 typed arrays making up most of a compact figure) and a fixed size per number
+def json_size(value):
+    if isinstance(value, str):
+        return len(value) + 2
+    if isinstance(value, dict):
+        return 2 + sum(len(str(key)) + 4 + json_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return 2 + sum(json_size(item) + 1 for item in value)
+    if isinstance(value, np.ndarray):
+        return 2 + value.size * (ESTIMATED_NUMBER_BYTES + 1)
+    return ESTIMATED_NUMBER_BYTES
+
+
+# Estimate the size of a compact figure from its traces (its layout is small and of bounded size, so it is not counted)
+def estimate_payload_size(figure):
+    return json_size(figure.get('data', []))
+
+
+# Size of a compact figure in bytes: measured by serialising it when the payloads are reported, and otherwise
+# estimated, as the figure is serialised again when it is sent
+def measure_payload(figure):
+    if REPORT_PAYLOADS:
+        return payload_size(figure)
+    return estimate_payload_size(figure)
+
+
+# Report the payload size of a figure against the size of the data it shows
+def report_payload(id, payload_bytes, rows):
+    if REPORT_PAYLOADS:
+        print('Figure %s: %d bytes for %d rows (%.1f bytes per row)' % (id, payload_bytes, rows, payload_bytes / max(rows, 1)))
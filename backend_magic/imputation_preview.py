@@ -0,0 +1,68 @@
+#######################################################################
+### This file contains functionality to preview an imputation on a ###
+### stratified sample of the data, so that the user can judge its  ###
+### effect before the full imputation is run                        ###
+#######################################################################
+
+import os
+import time
+import numpy as np
+import pandas as pd
+from classes.job_runner import report_progress
+from backend_magic.missing_value_detection import fit_imputation, impute_missing_values
+from backend_magic.stratified_sampling import row_strata, stratified_positions
+
+# Data with more rows is imputed on a sample first, which can be overridden with the VDW_PREVIEW_MIN_ROWS environment variable
+PREVIEW_MIN_ROWS = int(os.environ.get('VDW_PREVIEW_MIN_ROWS', 20000))
+# Latency budget of a preview in seconds, which can be overridden with the VDW_PREVIEW_BUDGET environment variable
+PREVIEW_BUDGET = float(os.environ.get('VDW_PREVIEW_BUDGET', 2.0))
+# Number of rows of the pilot sample from which the cost of a preview is estimated, and the maximum size of a sample
+PILOT_ROWS = 1000
+MAX_PREVIEW_ROWS = 20000
+
+
+# Draw a sample of at most the given number of rows, whose strata are the patterns of missing values, in proportion
+# to their size (every pattern keeps at least one row while they fit, so that rare combinations of missing values
+# are previewed as well)
+def stratified_sample(df, rows, seed=0):
+    if rows >= len(df):
+        return df
+    return df.iloc[stratified_positions(row_strata(df.isna()), rows, np.random.default_rng(seed))]
+
+
+# Summarise the distribution of every numeric column with missing values, before and after the imputation
+def distribution_summary(before, after):
+    columns = [col for col in after.select_dtypes(include=[np.number]).columns if before[col].isna().any()]
+    summary = pd.DataFrame({
+        'column': columns,
+        'missing before': [int(before[col].isna().sum()) for col in columns],
+        'mean before': [before[col].mean() for col in columns],
+        'mean after': [after[col].mean() for col in columns],
+        'std before': [before[col].std() for col in columns],
+        'std after': [after[col].std() for col in columns],
+        'median before': [before[col].median() for col in columns],
+        'median after': [after[col].median() for col in columns]
+    })
+    return summary.round(3)
+
+
+# Impute a stratified sample of the data, sized to stay within the latency budget, with the statistics fitted
+# for the full data (which the final imputation of all rows reuses)
+def preview_imputation(df, method='simple', statistics=None, budget=PREVIEW_BUDGET, max_rows=MAX_PREVIEW_ROWS):
+    start = time.perf_counter()
+    if statistics is None:
+        statistics = fit_imputation(df, method)
+    # Estimate the cost per row on a pilot sample, then draw the largest sample that fits into the remaining budget
+    report_progress(0.2, 'Imputing a pilot sample')
+    pilot = stratified_sample(df, PILOT_ROWS)
+    pilot_start = time.perf_counter()
+    imputed = impute_missing_values(pilot, method, statistics)
+    per_row = (time.perf_counter() - pilot_start) / max(len(pilot), 1)
+    remaining = budget - (time.perf_counter() - start)
+    rows = min(max_rows, len(df), int(remaining / per_row) if per_row > 0 else max_rows)
+    sample = pilot
+    if rows > len(pilot):
+        report_progress(0.5, 'Imputing a sample of ' + str(rows) + ' rows')
+        sample = stratified_sample(df, rows)
+        imputed = impute_missing_values(sample, method, statistics)
+    return sample, imputed, statistics
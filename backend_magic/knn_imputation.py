@@ -0,0 +1,144 @@
+#######################################################################
+### This file contains a scalable KNN imputation engine for numeric ###
+### columns, which finds the nearest neighbours of incomplete rows  ###
+### with k-d trees instead of computing all pairwise distances      ###
+#######################################################################
+
+import os
+import numpy as np
+from scipy.spatial import cKDTree
+from classes.job_runner import report_progress
+
+# Number of incomplete rows whose neighbours are searched at once
+BATCH_ROWS = 50000
+# Maximum number of distances computed directly at once (bounding the memory of the direct comparisons)
+DIRECT_PAIRS = 1000000
+# Donor groups with fewer rows are compared directly instead of through a tree
+MIN_TREE_ROWS = 256
+# Number of threads searching the trees (-1 uses all cores),
+# which can be overridden with the VDW_IMPUTATION_JOBS environment variable
+N_JOBS = int(os.environ.get('VDW_IMPUTATION_JOBS', -1))
+
+
+# Standardise every column to zero mean and unit variance (ignoring missing values), so that
+# no column dominates the distances by its scale
+# (the means and standard deviations can be given, e.g. as fitted on the full data)
+def standardise(values, mean=None, std=None):
+    with np.errstate(invalid='ignore'):
+        if mean is None:
+            mean = np.nanmean(values, axis=0) if len(values) else np.zeros(values.shape[1])
+        if std is None:
+            std = np.nanstd(values, axis=0) if len(values) else np.ones(values.shape[1])
+    mean = np.nan_to_num(mean)
+    std = np.where(np.isfinite(std) & (std > 0), std, 1.0)
+    return (values - mean) / std
+
+
+# Return the positions of the members of every group, from the group of every position
+def group_rows(groups, n_groups):
+    order = np.argsort(groups, kind='stable')
+    return np.split(order, np.cumsum(np.bincount(groups, minlength=n_groups))[:-1])
+
+
+# Keep the k nearest of the current and the new neighbours of every row
+def merge_neighbours(best_dist, best_rows, dist, rows, k):
+    dist = np.concatenate([best_dist, dist], axis=1)
+    rows = np.concatenate([best_rows, rows], axis=1)
+    nearest = np.argpartition(dist, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(dist, nearest, axis=1), np.take_along_axis(rows, nearest, axis=1)
+
+
+# Prepare the terms of the squared distances to a set of donors, so that the distances to many rows need a single
+# product: |a - b|^2 over the common columns = a^2 . observed(b) + observed(a) . b^2 - 2 a . b
+def distance_terms(filled, observed, donors):
+    donor_observed = observed[donors].astype(np.float64)
+    return donors, np.hstack([donor_observed, filled[donors] ** 2, -2 * filled[donors]]), donor_observed
+
+
+# Compute the nan_euclidean distances between rows and donors directly (infinite without a common column)
+def direct_distances(filled, observed, rows, donor_terms, donor_observed):
+    rows_observed = observed[rows].astype(np.float64)
+    squares = np.hstack([filled[rows] ** 2, rows_observed, filled[rows]]) @ donor_terms.T
+    shared = rows_observed @ donor_observed.T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dist = np.sqrt(np.maximum(squares, 0) * filled.shape[1] / shared)
+    dist[shared == 0] = np.inf
+    return dist
+
+
+# Impute the missing values of a numeric matrix with the mean of the k nearest rows that have the value.
+# Distances follow sklearn's nan_euclidean metric: the euclidean distance over the columns observed in both rows,
+# scaled up by the fraction of columns observed in both (rows without a common column are no neighbours)
+# The column means and standard deviations can be given to reuse statistics fitted before
+def knn_impute(values, n_neighbors=2, batch_rows=BATCH_ROWS, n_jobs=N_JOBS, mean=None, std=None):
+    values = np.asarray(values, dtype=np.float64)
+    observed = ~np.isnan(values)
+    result = values.copy()
+    n_rows, n_cols = values.shape
+    incomplete = np.flatnonzero(~observed.all(axis=1))
+    if len(incomplete) == 0:
+        return result
+    with np.errstate(invalid='ignore'):
+        column_means = np.nanmean(values, axis=0) if mean is None else np.asarray(mean)
+    scaled = standardise(values, column_means, std)
+    filled = np.nan_to_num(scaled)
+
+    # Rows are grouped by the columns they observe: every large group of donors is searched by its own tree
+    # over the columns it shares with the incomplete rows, and the rows of small groups are compared directly
+    donor_patterns, donor_groups = np.unique(observed, axis=0, return_inverse=True)
+    donor_rows = group_rows(donor_groups.ravel(), len(donor_patterns))
+    large = np.array([len(rows) >= MIN_TREE_ROWS for rows in donor_rows])
+    small_donors = np.sort(np.concatenate([donor_rows[q] for q in np.flatnonzero(~large)] + [np.zeros(0, dtype=np.int64)]))
+    # The terms of the direct comparisons are prepared once, for all rows or only for the small groups
+    all_terms, small_terms = None, distance_terms(filled, observed, small_donors)
+    patterns, groups = np.unique(observed[incomplete], axis=0, return_inverse=True)
+    receiver_rows = group_rows(groups.ravel(), len(patterns))
+
+    for p, pattern in enumerate(patterns):
+        report_progress(0.1 + 0.8 * p / len(patterns), 'Imputing missing values')
+        receivers = incomplete[receiver_rows[p]]
+        missing_cols = np.flatnonzero(~pattern)
+        # A few incomplete rows are compared to all rows directly, which is cheaper than building trees
+        if len(receivers) * n_rows <= DIRECT_PAIRS:
+            if all_terms is None:
+                all_terms = distance_terms(filled, observed, np.arange(n_rows))
+            trees, direct_terms = [], all_terms
+        else:
+            trees, direct_terms = [], small_terms
+            for q in np.flatnonzero(large):
+                shared = np.flatnonzero(pattern & donor_patterns[q])
+                if len(shared) == 0 or not donor_patterns[q][missing_cols].any():
+                    continue
+                donors = donor_rows[q]
+                trees.append((cKDTree(scaled[np.ix_(donors, shared)]), donors, shared, donor_patterns[q]))
+
+        for start in range(0, len(receivers), batch_rows):
+            batch = receivers[start:start + batch_rows]
+            best_dist = {c: np.full((len(batch), n_neighbors), np.inf) for c in missing_cols}
+            best_rows = {c: np.zeros((len(batch), n_neighbors), dtype=np.int64) for c in missing_cols}
+            for tree, donors, shared, donor_pattern in trees:
+                k = min(n_neighbors, len(donors))
+                dist, positions = tree.query(scaled[np.ix_(batch, shared)], k=k, workers=n_jobs)
+                dist = dist.reshape(len(batch), k) * np.sqrt(n_cols / len(shared))
+                rows = donors[positions.reshape(len(batch), k)]
+                for c in missing_cols[donor_pattern[missing_cols]]:
+                    best_dist[c], best_rows[c] = merge_neighbours(best_dist[c], best_rows[c], dist, rows, n_neighbors)
+            # Compare the remaining donors directly, in blocks that bound the memory of the distances
+            direct_donors, donor_terms, donor_observed = direct_terms
+            block_rows = max(1, DIRECT_PAIRS // len(batch))
+            for block_start in range(0, len(direct_donors), block_rows):
+                block = slice(block_start, block_start + block_rows)
+                donors = direct_donors[block]
+                dist = direct_distances(filled, observed, batch, donor_terms[block], donor_observed[block])
+                rows = np.broadcast_to(donors, dist.shape)
+                for c in missing_cols:
+                    donor_dist = np.where(observed[donors, c], dist, np.inf)
+                    best_dist[c], best_rows[c] = merge_neighbours(best_dist[c], best_rows[c], donor_dist, rows, n_neighbors)
+            for c in missing_cols:
+                # Average the values of the neighbours found, and fall back to the column mean without neighbours
+                found = np.isfinite(best_dist[c])
+                neighbour_values = np.where(found, values[best_rows[c], c], 0.0)
+                with np.errstate(invalid='ignore'):
+                    imputed = neighbour_values.sum(axis=1) / found.sum(axis=1)
+                result[batch, c] = np.where(found.any(axis=1), imputed, column_means[c])
+    return result
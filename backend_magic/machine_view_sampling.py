@@ -0,0 +1,45 @@
+#######################################################################
+### This file contains functionality to reduce the rows shown in   ###
+### the parallel coordinates plot (machine view) to a bounded      ###
+### sample, which keeps the rows flagged as outliers or duplicates ###
+### and the rows with missing values                               ###
+#######################################################################
+
+import os
+import numpy as np
+import pandas as pd
+from backend_magic.stratified_sampling import row_strata, stratified_positions
+
+# Maximum number of rows drawn in the machine view, which can be overridden with the VDW_MACHINE_VIEW_ROWS environment variable
+MACHINE_VIEW_MAX_ROWS = int(os.environ.get('VDW_MACHINE_VIEW_ROWS', 5000))
+# Columns flagging rows that are always kept in the sample
+FLAG_COLUMNS = ('outlier', 'duplicate')
+
+
+# Flags of the rows that are always kept: rows flagged as outliers or duplicates, and rows with missing values
+def kept_rows(df):
+    keep = df.isna().to_numpy().any(axis=1)
+    for col in FLAG_COLUMNS:
+        if col in df.columns:
+            keep |= (df[col] == True).to_numpy()
+    return keep
+
+
+# Reduce the data to at most max_rows rows for the machine view, returning the sample and its share of the rows.
+# The kept rows are all included if they fit, and the remaining rows are sampled uniformly; otherwise the kept
+# rows themselves are sampled, stratified by their flags and patterns of missing values
+def machine_view_sample(df, max_rows=MACHINE_VIEW_MAX_ROWS, seed=0):
+    if len(df) <= max_rows:
+        return df, 1.0
+    rng = np.random.default_rng(seed)
+    keep = kept_rows(df)
+    kept = np.flatnonzero(keep)
+    if len(kept) >= max_rows:
+        flags = [df[col] == True for col in FLAG_COLUMNS if col in df.columns]
+        signature = pd.concat([df.isna()] + flags, axis=1).iloc[kept]
+        selected = kept[stratified_positions(row_strata(signature), max_rows, rng)]
+    else:
+        others = np.flatnonzero(~keep)
+        selected = np.concatenate([kept, rng.choice(others, max_rows - len(kept), replace=False)])
+    selected = np.sort(selected)
+    return df.iloc[selected], len(selected) / len(df)
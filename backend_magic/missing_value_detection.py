@@ -5,10 +5,14 @@
 
 import pandas as pd
 import numpy as np
-from sklearn.impute import SimpleImputer
-from sklearn.impute import KNNImputer
+import warnings
+from classes.job_runner import report_progress
+from backend_magic.knn_imputation import knn_impute
 
-def detect_missing_values(df):
+def detect_missing_values(df, index=None):
+    if index is not None:
+        # Read the counts from the maintained index instead of scanning the data
+        return index.summary(), index.total()
     # Count the number of missing values detected in each column
     missing_df = df.isnull().sum()
     missing_df = pd.DataFrame(missing_df)
@@ -17,23 +21,36 @@ def detect_missing_values(df):
     missing_val = int(missing_df.sum().sum())
     return missing_df, missing_val
 
-def impute_missing_values(df, method='simple'):
+# Fit the statistics of an imputation once (the numeric columns with their means and standard deviations),
+# so that they can be reused, e.g. by a preview on a sample and the final pass on all rows
+def fit_imputation(df, method='simple'):
+    num_cols = df.select_dtypes(include=[np.number]).columns
+    values = df[num_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+    with warnings.catch_warnings():
+        # Columns without any value have no statistics
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        means, stds = np.nanmean(values, axis=0), np.nanstd(values, axis=0)
+    return {'method': method, 'columns': num_cols, 'means': means, 'stds': stds}
+
+def impute_missing_values(df, method='simple', statistics=None):
+    if statistics is None:
+        statistics = fit_imputation(df, method)
     df_copy = df.copy()
     # Select only numeric columns
-    num_cols = df_copy.select_dtypes(include=[np.number]).columns
+    num_cols = statistics['columns']
+    values = df_copy[num_cols].to_numpy(dtype=np.float64, na_value=np.nan)
 
-    if method == 'simple':
-        imp = SimpleImputer(missing_values=np.nan, strategy='mean')
-    if method == 'KNN':
-        imp = KNNImputer(n_neighbors=2, weights="uniform")
+    report_progress(0.1, 'Imputing missing values')
+    if statistics['method'] == 'KNN':
+        # Impute from the nearest rows, found with k-d trees instead of all pairwise distances
+        df_copy[num_cols] = knn_impute(values, n_neighbors=2, mean=statistics['means'], std=statistics['stds'])
     else:
-        # Default to the simple imputer
-        imp = SimpleImputer(missing_values=np.nan, strategy='mean')
-
-    # Apply imputation only to numeric columns    
-    df_copy[num_cols] = imp.fit_transform(df_copy[num_cols])
+        # Default to the univariate mean
+        df_copy[num_cols] = np.where(np.isnan(values), statistics['means'], values)
     return df_copy
 
-def remove_missing_values(df):
+def remove_missing_values(df, index=None):
+    if index is not None:
+        return df[~index.any_null_mask()]
     df = df[df.notnull().all(axis=1)]
     return df
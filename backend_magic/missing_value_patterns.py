@@ -0,0 +1,54 @@
+#######################################################################
+### This file contains functionality to describe which columns go  ###
+### missing together, and to recommend how to handle the missing   ###
+### values based on their patterns                                 ###
+#######################################################################
+
+import pandas as pd
+
+# Maximum share of incomplete rows whose deletion is recommended
+DELETE_SHARE = 0.05
+# Minimum Jaccard similarity of the missing values of two columns to consider them missing together
+CO_MISSING_SIMILARITY = 0.5
+
+
+# Table of the most frequent patterns of missing values, as displayed on the GUI
+def pattern_table(matrix, k=10):
+    patterns = [(columns, count) for columns, count in matrix.top_patterns(k + 1) if columns][:k]
+    return pd.DataFrame({
+        'missing columns': [', '.join(map(str, columns)) for columns, _ in patterns],
+        'rows': [count for _, count in patterns],
+        'share of rows': [round(count / matrix.n_rows, 4) for _, count in patterns]
+    })
+
+
+# Table of the pairs of columns that are most often missing together, with the Jaccard similarity of their missing values
+def co_missing_table(matrix, k=10):
+    co_missing = matrix.co_missingness()
+    columns = list(co_missing.columns)
+    pairs = []
+    for i in range(len(columns)):
+        for j in range(i + 1, len(columns)):
+            both = co_missing.iat[i, j]
+            if both > 0:
+                either = co_missing.iat[i, i] + co_missing.iat[j, j] - both
+                pairs.append((columns[i], columns[j], int(both), round(both / either, 4)))
+    pairs.sort(key=lambda pair: (-pair[3], -pair[2]))
+    return pd.DataFrame(pairs[:k], columns=['column', 'other column', 'rows missing both', 'similarity'])
+
+
+# Recommend an action of the missing value handling stage from the patterns of missing values,
+# returning the value of the action and the reason for it
+def recommend_missing_value_action(matrix):
+    incomplete = matrix.n_rows - matrix.pattern_count([])
+    if incomplete == 0:
+        return None, 'There are no missing values.'
+    share = incomplete / matrix.n_rows
+    if share <= DELETE_SHARE:
+        return 'delete', f'Only {share:.1%} of the rows have missing values, so deleting them loses little data.'
+    pairs = co_missing_table(matrix, k=1)
+    if len(pairs) and pairs['similarity'].iloc[0] >= CO_MISSING_SIMILARITY:
+        pair = pairs.iloc[0]
+        return 'impute-KNN', (f"'{pair['column']}' and '{pair['other column']}' are mostly missing together, so their values are "
+                              'unlikely to be missing at random: imputing from the nearest neighbours preserves the relations between columns.')
+    return 'impute-simple', f'{share:.1%} of the rows have missing values, scattered independently across columns: imputing the mean keeps all rows.'
@@ -0,0 +1,232 @@
+#######################################################################
+### This file contains functionality for the automated detection of ###
+### near-duplicated rows, which differ only in whitespace, casing   ###
+### or small numeric deviations, using MinHash signatures and       ###
+### locality-sensitive hashing (LSH)                                ###
+#######################################################################
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from classes.job_runner import report_progress
+
+# Default minimum (estimated) Jaccard similarity of two rows to be considered near-duplicates
+DEFAULT_THRESHOLD = 0.8
+# Default numeric tolerance, relative to the standard deviation of a column
+DEFAULT_TOLERANCE = 0.01
+# Number of hash functions of every MinHash signature
+NUM_PERM = 64
+# Length of the character shingles of text values
+SHINGLE_SIZE = 3
+# Number of rows whose signatures are computed at once
+BLOCK_ROWS = 100000
+# Columns that do not take part in the comparison of rows
+IGNORED_COLUMNS = ('id', 'duplicate')
+
+# Mersenne prime used by the universal hash functions
+_PRIME = np.uint64((1 << 31) - 1)
+_MAX_HASH = np.uint32((1 << 31) - 1)
+
+
+# Create the parameters of the random hash functions h(x) = (a * x + b) mod p
+def hash_functions(num_perm, seed):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, int(_PRIME), num_perm, dtype=np.uint64)
+    b = rng.integers(0, int(_PRIME), num_perm, dtype=np.uint64)
+    return a, b
+
+
+# Hash token values (any array) to 32-bit integers, salted with the column they belong to
+def token_hashes(values, salt):
+    hashes = pd.util.hash_array(np.asarray(values), categorize=False)
+    return ((hashes ^ np.uint64(salt)) * np.uint64(0x9E3779B97F4A7C15)) >> np.uint64(32)
+
+
+# Apply every hash function to every token, returning an array of shape (tokens, num_perm)
+def permute(hashes, a, b):
+    return ((hashes[:, None] * a[None, :] + b[None, :]) % _PRIME).astype(np.uint32)
+
+
+# Replace the missing value code (-1) of pd.factorize by an extra code after all unique values
+def factorize_with_missing(values):
+    codes, uniques = pd.factorize(values)
+    missing = codes < 0
+    if missing.any():
+        codes[missing] = len(uniques)
+    return codes, uniques, missing.any()
+
+
+# Return the token columns of a numeric column: two grids of cell width 'tolerance', offset by half a cell,
+# so that values closer than half a cell always share at least one grid cell
+def numeric_token_columns(values, salt, tolerance, a, b):
+    values = values.astype(np.float64)
+    scale = np.nanstd(values) if np.isfinite(values).any() else 0.0
+    width = tolerance * (scale if scale > 0 else 1.0)
+    token_columns = []
+    for grid_salt, offset in enumerate((0.0, 0.5)):
+        grid = np.floor(values / width + offset)
+        codes, uniques, has_missing = factorize_with_missing(grid)
+        uniques = np.asarray(uniques, dtype=np.float64)
+        if has_missing:
+            uniques = np.append(uniques, np.nan)
+        token_columns.append((codes, permute(token_hashes(uniques, salt + grid_salt), a, b)))
+    return token_columns
+
+
+# Return the token column of a text (or other non-numeric) column: the MinHash of the character shingles
+# of every distinct value, after normalising whitespace and casing
+def text_token_column(values, salt, a, b):
+    codes, uniques, has_missing = factorize_with_missing(values)
+    # Normalise only the distinct values, then merge values that became identical
+    normalised = pd.Series(np.asarray(uniques, dtype=object)).astype(str).str.lower().str.strip().str.replace(r'\s+', ' ', regex=True)
+    if has_missing:
+        normalised = pd.concat([normalised, pd.Series(['\x00missing'])], ignore_index=True)
+    normalised_codes, normalised_uniques = pd.factorize(normalised)
+    codes = normalised_codes[codes]
+    # Shingle every distinct value, remembering which value every shingle belongs to
+    shingles, owners = [], []
+    for i, value in enumerate(normalised_uniques):
+        value_shingles = [value[j:j + SHINGLE_SIZE] for j in range(max(1, len(value) - SHINGLE_SIZE + 1))]
+        shingles.extend(value_shingles)
+        owners.extend([i] * len(value_shingles))
+    owners = np.asarray(owners, dtype=np.int64)
+    hashes = token_hashes(np.asarray(shingles, dtype=object), salt)
+    # The MinHash of a value is the minimum over its shingles, computed in blocks to bound memory
+    table = np.full((len(normalised_uniques), len(a)), _MAX_HASH, dtype=np.uint32)
+    for start in range(0, len(hashes), BLOCK_ROWS):
+        block_owners = owners[start:start + BLOCK_ROWS]
+        starts = np.flatnonzero(np.r_[True, block_owners[1:] != block_owners[:-1]])
+        partial = np.minimum.reduceat(permute(hashes[start:start + BLOCK_ROWS], a, b), starts, axis=0)
+        # Values whose shingles span two blocks are combined with their earlier partial minimum
+        np.minimum.at(table, block_owners[starts], partial)
+    return codes, table
+
+
+# Build the token columns of all compared columns of a DataFrame
+def build_token_columns(df, tolerance, a, b):
+    token_columns = []
+    for i, col in enumerate(col for col in df.columns if col not in IGNORED_COLUMNS):
+        values = df[col]
+        salt = 1000003 * (i + 1)
+        if pd.api.types.is_datetime64_any_dtype(values):
+            values = values.astype('int64').where(values.notna())
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            token_columns.extend(numeric_token_columns(values.to_numpy(dtype=np.float64, na_value=np.nan), salt, tolerance, a, b))
+        else:
+            token_columns.append(text_token_column(values.to_numpy(dtype=object), salt, a, b))
+    return token_columns
+
+
+# Compute the MinHash signatures of the given rows: the minimum over the signatures of their cells
+def signatures(token_columns, rows, num_perm):
+    signature = np.full((len(rows), num_perm), _MAX_HASH, dtype=np.uint32)
+    for codes, table in token_columns:
+        np.minimum(signature, table[codes[rows]], out=signature)
+    return signature
+
+
+# Choose the number of bands and rows per band whose LSH threshold is closest to (but not above) the threshold
+def lsh_parameters(threshold, num_perm):
+    options = []
+    for rows_per_band in range(1, num_perm + 1):
+        if num_perm % rows_per_band == 0:
+            bands = num_perm // rows_per_band
+            options.append(((1 / bands) ** (1 / rows_per_band), bands, rows_per_band))
+    below = [option for option in options if option[0] <= threshold]
+    _, bands, rows_per_band = max(below) if below else min(options)
+    return bands, rows_per_band
+
+
+# Find the pairs of rows that share the bucket of any band (given the bucket keys of every row and band)
+# Every row is paired with its neighbour and with the first row of its bucket, which keeps the number of pairs
+# linear in the number of rows, while a row that does not match its neighbour (e.g. a dissimilar row sorted
+# between two near-duplicates) still reaches the rest of its bucket
+def candidate_pairs(keys):
+    candidates = []
+    for band in range(keys.shape[1]):
+        order = np.argsort(keys[:, band], kind='stable')
+        same_bucket = keys[order[1:], band] == keys[order[:-1], band]
+        candidates.append(np.stack([order[:-1][same_bucket], order[1:][same_bucket]], axis=1))
+        # Position (in sorted order) of the first row of every row's bucket
+        first = np.maximum.accumulate(np.where(np.concatenate([[True], ~same_bucket]), np.arange(len(order)), 0))
+        later = np.flatnonzero(first < np.arange(len(order)) - 1)
+        candidates.append(np.stack([order[first[later]], order[later]], axis=1))
+    if not candidates:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.unique(np.concatenate(candidates), axis=0)
+
+
+# Assign every row to a cluster of near-duplicated rows, numbered in the order of their first occurrence
+def near_duplicate_clusters(df, threshold=DEFAULT_THRESHOLD, tolerance=DEFAULT_TOLERANCE, num_perm=NUM_PERM, seed=0):
+    n = len(df)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    a, b = hash_functions(num_perm, seed)
+    report_progress(0.1, 'Hashing values')
+    token_columns = build_token_columns(df, tolerance, a, b)
+    bands, rows_per_band = lsh_parameters(threshold, num_perm)
+    multipliers = np.random.default_rng(seed + 1).integers(1, 1 << 62, rows_per_band, dtype=np.uint64) | np.uint64(1)
+
+    # Hash every band of every signature into a bucket key
+    report_progress(0.3, 'Computing signatures')
+    keys = np.empty((n, bands), dtype=np.uint64)
+    for start in range(0, n, BLOCK_ROWS):
+        block = np.arange(start, min(start + BLOCK_ROWS, n))
+        signature = signatures(token_columns, block, num_perm).astype(np.uint64).reshape(len(block), bands, rows_per_band)
+        keys[block] = (signature * multipliers).sum(axis=2)
+
+    report_progress(0.6, 'Finding candidate pairs')
+    candidates = candidate_pairs(keys)
+
+    # Verify the candidates with the similarity estimated from their full signatures
+    report_progress(0.8, 'Verifying candidate pairs')
+    verified = np.zeros(len(candidates), dtype=bool)
+    for start in range(0, len(candidates), BLOCK_ROWS):
+        pairs = candidates[start:start + BLOCK_ROWS]
+        similarity = (signatures(token_columns, pairs[:, 0], num_perm) == signatures(token_columns, pairs[:, 1], num_perm)).mean(axis=1)
+        verified[start:start + BLOCK_ROWS] = similarity >= threshold
+    edges = candidates[verified]
+
+    # Rows connected by verified pairs form a cluster
+    graph = coo_matrix((np.ones(len(edges), dtype=np.int8), (edges[:, 0], edges[:, 1])), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+    clusters, _ = pd.factorize(labels)
+    return clusters.astype(np.int64)
+
+
+# Boolean mask of the rows that nearly duplicate another row, like DataFrame.duplicated(keep=keep)
+def near_duplicated(clusters, keep='first'):
+    counts = np.bincount(clusters)
+    if keep is False:
+        return counts[clusters] > 1
+    positions = np.arange(len(clusters))
+    first = np.empty(len(counts), dtype=np.int64)
+    if keep == 'last':
+        first[clusters] = positions
+    else:
+        # Assigning in reverse order leaves the first position of every cluster
+        first[clusters[::-1]] = positions[::-1]
+    return first[clusters] != positions
+
+
+def detect_near_duplicates(df, keep='first', threshold=DEFAULT_THRESHOLD, tolerance=DEFAULT_TOLERANCE):
+    # Reset previous detection steps
+    if 'duplicate' in df.columns:
+        df = df.drop('duplicate', axis=1)
+    clusters = near_duplicate_clusters(df, threshold, tolerance)
+    # Add a new column (to a shallow copy, so that the caller's DataFrame is never modified)
+    df = df.assign(duplicate=near_duplicated(clusters, keep=keep))
+    # Count the number of near-duplicates detected
+    dups_count = int(df['duplicate'].sum())
+    return df, dups_count
+
+
+def highlight_near_duplicates(df, threshold=DEFAULT_THRESHOLD, tolerance=DEFAULT_TOLERANCE):
+    if 'duplicate' in df.columns:
+        df = df.drop('duplicate', axis=1)
+    clusters = near_duplicate_clusters(df, threshold, tolerance)
+    # Select all members of every cluster of near-duplicated rows, and show the members of a cluster together
+    members = np.flatnonzero(near_duplicated(clusters, keep=False))
+    order = np.argsort(clusters[members], kind='stable')
+    return df.iloc[members[order]].assign(duplicate=True)
@@ -0,0 +1,133 @@
+#######################################################################
+### This file contains the registry of outlier detectors, which    ###
+### all score the rows of a DataFrame (lower scores are more       ###
+### anomalous) and flag the outliers through a common interface    ###
+#######################################################################
+
+import os
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import LocalOutlierFactor
+from classes.job_runner import report_progress
+from classes.outlier_scores import OutlierScores
+from classes.feature_encoder import FeatureEncoder
+from backend_magic.outlier_isolation_forest import encode_features, fit_outlier_scores, N_JOBS
+
+# Data with at least this many cells is first checked by a vectorised detector instead of an IsolationForest,
+# which can be overridden with the VDW_OUTLIER_VECTORISED_CELLS environment variable
+VECTORISED_CELLS = int(os.environ.get('VDW_OUTLIER_VECTORISED_CELLS', 5000000))
+# Detector used regardless of the size of the data, which can be set with the VDW_OUTLIER_DETECTOR environment variable
+FORCED_DETECTOR = os.environ.get('VDW_OUTLIER_DETECTOR')
+# Number of neighbours compared by the local outlier factor
+LOF_NEIGHBOURS = 20
+
+
+# Return the numeric and datetime columns of the data as a float64 matrix (other columns have no order or scale)
+# The columns are selected by their schema first, so that no other column is ever encoded
+def numeric_features(data):
+    data = pd.DataFrame(data)
+    columns = [col for col, kind in FeatureEncoder.schema_of(data) if kind in ('numeric', 'datetime')]
+    features = data[columns]
+    return FeatureEncoder.for_frame(features).encode(features).astype(np.float64)
+
+
+# Divide the deviations of every column by its scale, ignoring columns without spread
+def scaled(deviations, scale):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(scale > 0, deviations / scale, 0.0)
+
+
+# Combine the per-cell anomaly of every row into a score, where missing cells are not anomalous
+def row_scores(cell_anomaly, combine=np.max):
+    cell_anomaly = np.nan_to_num(cell_anomaly, nan=0.0)
+    if cell_anomaly.shape[1] == 0:
+        return np.zeros(len(cell_anomaly))
+    return -combine(cell_anomaly, axis=1)
+
+
+# Robust z-score: the largest distance of a cell from the median of its column, in units of the
+# (normally consistent) median absolute deviation
+def robust_z_scores(data):
+    report_progress(0.3, 'Computing robust z-scores')
+    features = numeric_features(data)
+    if len(features) == 0:
+        return OutlierScores(np.zeros(0))
+    deviations = np.abs(features - np.nanmedian(features, axis=0))
+    mad = 1.4826 * np.nanmedian(deviations, axis=0)
+    return OutlierScores(row_scores(scaled(deviations, mad)))
+
+
+# IQR fences: the largest distance of a cell beyond the fences at 1.5 interquartile ranges outside
+# the quartiles of its column (rows within all fences score 0)
+def iqr_scores(data):
+    report_progress(0.3, 'Computing interquartile ranges')
+    features = numeric_features(data)
+    if len(features) == 0:
+        return OutlierScores(np.zeros(0))
+    q1, q3 = np.nanpercentile(features, [25, 75], axis=0)
+    iqr = q3 - q1
+    excess = np.maximum(np.maximum(q1 - 1.5 * iqr - features, features - q3 - 1.5 * iqr), 0.0)
+    return OutlierScores(row_scores(scaled(excess, iqr)))
+
+
+# Empirical-CDF score: the sum over the columns of the negative log of the probability of a value
+# at least as extreme (in the nearer tail) as the one of the cell
+def ecdf_scores(data):
+    report_progress(0.3, 'Computing empirical distributions')
+    features = pd.DataFrame(numeric_features(data))
+    valid = features.notna().sum().to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        left = features.rank(method='max').to_numpy() / valid
+        right = (valid + 1 - features.rank(method='min').to_numpy()) / valid
+    return OutlierScores(row_scores(-np.log(np.minimum(left, right)), combine=np.sum))
+
+
+# Local outlier factor: the density of every row relative to the density of its nearest neighbours,
+# on standardised features (missing cells take the median of their column)
+def lof_scores(data):
+    features = encode_features(data).astype(np.float64)
+    if len(features) < 2:
+        return OutlierScores(np.zeros(len(features)))
+    median = np.nanmedian(features, axis=0)
+    features = np.where(np.isnan(features), median, features)
+    features = scaled(features - features.mean(axis=0), features.std(axis=0))
+    report_progress(0.3, 'Computing local outlier factors')
+    lof = LocalOutlierFactor(n_neighbors=min(LOF_NEIGHBOURS, len(features) - 1), n_jobs=N_JOBS)
+    lof.fit(features)
+    return OutlierScores(lof.negative_outlier_factor_, lof)
+
+
+# Registry of the outlier detectors by name, each returning the OutlierScores of the rows of a DataFrame
+# (further detectors can be added with the same interface)
+OUTLIER_DETECTORS = {
+    'isolation_forest': fit_outlier_scores,
+    'lof': lof_scores,
+    'robust_z': robust_z_scores,
+    'iqr': iqr_scores,
+    'ecdf': ecdf_scores
+}
+
+
+# Pick a detector by the size of the data: huge or wide data is first checked by a vectorised detector
+def choose_outlier_detector(data):
+    if FORCED_DETECTOR is not None:
+        return FORCED_DETECTOR
+    if data.shape[0] * data.shape[1] >= VECTORISED_CELLS:
+        return 'robust_z'
+    return 'isolation_forest'
+
+
+# Score the rows of the data with the given detector
+def outlier_scores(data, method='isolation_forest'):
+    if method not in OUTLIER_DETECTORS:
+        raise ValueError('Unknown outlier detector: ' + str(method))
+    return OUTLIER_DETECTORS[method](data)
+
+
+def detect_outliers(data, method=None, contamination=0.2, intent=[], scores=None):
+    if method is None:
+        method = choose_outlier_detector(data)
+    if scores is None:
+        scores = outlier_scores(data, method)
+    # Flagging the rows from their scores is the same for every detector
+    return scores.flag_frame(data, contamination=contamination, intent=intent)
@@ -4,9 +4,15 @@
 ##########################################################
 
 from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import LabelEncoder
+import numpy as np
 import pandas as pd
+import os
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from joblib import effective_n_jobs
+from classes.job_runner import report_progress
+from classes.outlier_scores import OutlierScores
+from classes.feature_encoder import FeatureEncoder
 
 warnings.filterwarnings(
     "ignore",
@@ -14,54 +20,55 @@ warnings.filterwarnings(
     category=UserWarning,
 )
 
-def train_isolation_forest(data, contamination=0.2, intent=[]):
-    # Ensure valid contamination value
-    if contamination <= 0.0 or contamination > 0.5:
-        contamination = 0.2
+# Number of threads used to fit the trees and score the data (-1 uses all cores),
+# which can be overridden with the VDW_OUTLIER_JOBS environment variable
+N_JOBS = int(os.environ.get('VDW_OUTLIER_JOBS', -1))
+# Maximum number of rows the model is trained on (0 trains on all rows),
+# which can be overridden with the VDW_OUTLIER_TRAIN_ROWS environment variable
+MAX_TRAIN_ROWS = int(os.environ.get('VDW_OUTLIER_TRAIN_ROWS', 100000))
+# Number of rows scored at once
+SCORE_CHUNK_ROWS = 65536
 
-    # Make a copy of the data to retain original categorical labels
-    data_original = data.copy()
+def encode_features(data):
+    # Encode all feature columns into one float32 matrix in a single pass, with the plan compiled for this schema
+    data = pd.DataFrame(data)
+    return FeatureEncoder.for_frame(data).encode(data)
 
-    # Convert LuxDataFrame to Pandas DataFrame if necessary
-    if not isinstance(data_original, pd.DataFrame):
-        data_original = pd.DataFrame(data_original)
-    data_converted = data_original.copy()
+# Score the rows of a matrix in fixed-size chunks, so that the temporary memory of the trees stays bounded,
+# with the chunks spread over a pool of threads (the trees release the GIL while traversing)
+def chunked_scores(model, matrix, n_jobs=N_JOBS, chunk_rows=SCORE_CHUNK_ROWS):
+    scores = np.empty(len(matrix), dtype=np.float64)
+    starts = range(0, len(matrix), chunk_rows)
+    executor = ThreadPoolExecutor(max_workers=effective_n_jobs(n_jobs))
+    try:
+        chunks = executor.map(lambda start: model.score_samples(matrix[start:start + chunk_rows]), starts)
+        for i, (start, chunk) in enumerate(zip(starts, chunks)):
+            scores[start:start + len(chunk)] = chunk
+            report_progress(0.5 + 0.45 * (i + 1) / len(starts), 'Scoring the data')
+    finally:
+        # A cancelled job does not wait for the remaining chunks
+        executor.shutdown(cancel_futures=True)
+    return scores
 
-    # Convert datetime columns to timestamps
-    for col in data_converted.select_dtypes(include=['datetime64']).columns:
-        data_converted[col] = data_converted[col].astype('int64') // 10**9  # Convert to seconds
+def fit_outlier_scores(data, n_jobs=N_JOBS, max_train_rows=MAX_TRAIN_ROWS, chunk_rows=SCORE_CHUNK_ROWS, random_state=None):
+    matrix = encode_features(data)
+    # Train the detection model on a bounded random subsample of large data
+    # (every tree only sees a few hundred rows, so a larger sample adds cost but no accuracy)
+    report_progress(0.3, 'Training the outlier detection model')
+    training = matrix
+    if max_train_rows and len(matrix) > max_train_rows:
+        rows = np.random.default_rng(random_state).choice(len(matrix), max_train_rows, replace=False)
+        training = matrix[np.sort(rows)]
+    iso = IsolationForest(n_jobs=n_jobs, random_state=random_state)
+    iso.fit(training)
+    # Keep the scores of all rows, from which the outliers of any contamination can be derived
+    report_progress(0.5, 'Scoring the data')
+    return OutlierScores(chunked_scores(iso, matrix, n_jobs, chunk_rows), iso)
 
-    # Convert boolean columns to integers
-    for col in data_converted.select_dtypes(include=['bool']).columns:
-        data_converted[col] = data_converted[col].astype(int)
+def train_isolation_forest(data, contamination=0.2, intent=[], scores=None):
+    # Fit a model unless the scores of this version of the data were computed before
+    if scores is None:
+        scores = fit_outlier_scores(data)
 
-    # Convert object columns to numerical for model training
-    object_cols = data_converted.select_dtypes(include=['object']).columns
-
-    # Check if column is datetime column or categorical column
-    for col in object_cols:
-        try:
-            parsed_col = pd.to_datetime(col, errors='coerce')
-            timestamp_ratio = parsed_col.notna().mean()  # Proportion of successfully converted values
-            if timestamp_ratio > 0.9:  # If most values convert successfully, treat it as a timestamp
-                # Convert timestamp column to integer
-                year = [int(year_str[:4]) for year_str in data_converted[col]]
-                data_converted[col] = year
-        except Exception:
-            # Treat it as a categorical column
-            le = LabelEncoder()
-            # Encode categories numerically
-            data_converted[col] = le.fit_transform(data_converted[col])  
-
-    # Train the detection model
-    iso = IsolationForest(contamination=contamination)
-    yhat = iso.fit_predict(data_converted)
-
-    # Apply predictions to the original DataFrame
-    data_original['outlier'] = yhat == -1
-    # Count outliers
-    outlier_count = data_original['outlier'].sum()
-    # Preserve intent if applicable
-    data_original.intent = intent  
-
-    return data_original, outlier_count
+    # Apply predictions to a copy of the original DataFrame, and count outliers
+    return scores.flag_frame(data, contamination=contamination, intent=intent)
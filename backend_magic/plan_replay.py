@@ -0,0 +1,228 @@
+#######################################################################
+### This file contains functionality to replay a recorded cleaning ###
+### plan headlessly on a CSV file, streaming the file in chunks:   ###
+### steps that need statistics of their input (e.g. imputation     ###
+### means or an outlier model) are fitted in a pass each, and the  ###
+### cleaned chunks are written out in a final pass                 ###
+#######################################################################
+
+import contextlib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import IsolationForest
+from classes.streaming_csv_reader import StreamingCsvReader
+from classes.feature_encoder import FeatureEncoder
+from classes.outlier_scores import OutlierScores
+from classes.duplicate_index import IGNORED_COLUMNS as DUPLICATE_IGNORED_COLUMNS
+from classes.job_runner import report_progress
+from backend_magic.missing_value_detection import impute_missing_values
+from backend_magic.near_duplicate_detection import detect_near_duplicates, DEFAULT_THRESHOLD
+from backend_magic.outlier_detectors import outlier_scores
+from backend_magic.outlier_isolation_forest import chunked_scores, MAX_TRAIN_ROWS, N_JOBS
+
+# Columns added by the interactive stages, which are never part of the replayed data
+HELPER_COLUMNS = ('duplicate', 'outlier')
+# Column of the row numbers written by earlier downloads, which the GUI drops after uploading
+INDEX_COLUMN = 'unnamed_0'
+
+
+# Read the chunks of a CSV file, named and typed like the data the plan was recorded on
+def plan_chunks(reader, plan):
+    with reader.open_stream() as stream:
+        for chunk in pd.read_csv(stream, chunksize=reader.chunk_rows, nrows=reader.max_rows, low_memory=False):
+            chunk = chunk.rename(columns=StreamingCsvReader.normalise_column_name)
+            if INDEX_COLUMN in chunk.columns and INDEX_COLUMN not in plan.columns:
+                chunk = chunk.drop(columns=INDEX_COLUMN)
+            yield plan.conform(chunk)
+
+
+# Read the chunks of a CSV file and pass them through the given steps with their fitted states,
+# counting the rows removed by every step
+def replayed_chunks(reader, plan, steps, fitted, removed=None):
+    appliers = [STEP_APPLIERS[step['step']](step, state) for step, state in zip(steps, fitted)]
+    for chunk in plan_chunks(reader, plan):
+        for i, apply in enumerate(appliers):
+            rows = len(chunk)
+            chunk = apply(chunk)
+            if removed is not None:
+                removed[i] += rows - len(chunk)
+        yield chunk
+
+
+#######################
+### Missing values ###
+
+def drop_missing_applier(step, state):
+    return lambda chunk: chunk[chunk.notnull().all(axis=1)]
+
+
+# Fit the means and standard deviations of the numeric columns over all chunks, merging the moments of every chunk
+# (Chan et al.'s parallel algorithm), so that chunks are imputed with the statistics of the whole data
+def fit_imputation_step(step, chunks):
+    columns, count, mean, m2 = None, None, None, None
+    for chunk in chunks:
+        if columns is None:
+            columns = chunk.select_dtypes(include=[np.number]).columns
+            count, mean, m2 = np.zeros(len(columns)), np.zeros(len(columns)), np.zeros(len(columns))
+        values = chunk[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        chunk_count = (~np.isnan(values)).sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            chunk_mean = np.where(chunk_count > 0, np.nansum(values, axis=0) / chunk_count, 0.0)
+            chunk_m2 = np.nansum((values - chunk_mean) ** 2, axis=0)
+            total = count + chunk_count
+            delta = chunk_mean - mean
+            mean = np.where(total > 0, mean + delta * chunk_count / total, 0.0)
+            m2 = np.where(total > 0, m2 + chunk_m2 + delta ** 2 * count * chunk_count / total, 0.0)
+        count = total
+    if columns is None:
+        return None
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Columns without any value have no statistics, as with np.nanmean
+        means = np.where(count > 0, mean, np.nan)
+        stds = np.where(count > 0, np.sqrt(m2 / count), np.nan)
+    return {'method': step['method'], 'columns': columns, 'means': means, 'stds': stds}
+
+
+# The nearest neighbours of a KNN imputation are searched within every chunk
+def impute_applier(step, statistics):
+    return lambda chunk: impute_missing_values(chunk, step['method'], statistics) if len(chunk) else chunk
+
+
+##################
+### Duplicates ###
+
+# Hash every row (ignoring the 'id' column), with numbers hashed as floats so that a column parsed as integers
+# in one chunk and as floats in another hashes alike
+def row_hashes(chunk):
+    frame = chunk[[col for col in chunk.columns if col not in DUPLICATE_IGNORED_COLUMNS]]
+    numeric = frame.select_dtypes(include=[np.number]).columns
+    frame = frame.astype({col: 'float64' for col in numeric})
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+# Exact duplicates are found across chunks by keeping the sorted hashes of all rows kept so far;
+# near-duplicates are searched within every chunk
+def drop_duplicates_applier(step, state):
+    if step.get('mode') == 'near':
+        threshold = step.get('threshold', DEFAULT_THRESHOLD)
+        def apply(chunk):
+            if len(chunk) == 0:
+                return chunk
+            detected, _ = detect_near_duplicates(chunk, threshold=threshold)
+            return chunk[~detected['duplicate'].to_numpy(dtype=bool)]
+        return apply
+    seen = np.zeros(0, dtype=np.uint64)
+    def apply(chunk):
+        nonlocal seen
+        hashes = row_hashes(chunk)
+        keep = ~pd.Series(hashes).duplicated().to_numpy()
+        if len(seen):
+            positions = np.minimum(np.searchsorted(seen, hashes), len(seen) - 1)
+            keep &= seen[positions] != hashes
+        # Merging the sorted runs is linear with a stable sort
+        seen = np.sort(np.concatenate([seen, np.sort(hashes[keep])]), kind='stable')
+        return chunk[keep]
+    return apply
+
+
+################
+### Outliers ###
+
+# Keep a uniform random sample of the rows of all chunks (the rows with the smallest random keys)
+def reservoir_sample(chunks, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    sample, keys = None, np.zeros(0)
+    for chunk in chunks:
+        sample = chunk if sample is None else pd.concat([sample, chunk])
+        keys = np.concatenate([keys, rng.random(len(chunk))])
+        if len(sample) > rows:
+            smallest = np.sort(np.argpartition(keys, rows - 1)[:rows])
+            sample, keys = sample.iloc[smallest], keys[smallest]
+    return sample
+
+
+# Fit an outlier detector on a sample of the step's input, and the score below which rows are outliers.
+# An IsolationForest scores further rows with its model; detectors without a model score every chunk
+# together with the sample, which stands in for the rest of the data
+def fit_outlier_step(step, chunks, sample_rows=MAX_TRAIN_ROWS, seed=0):
+    contamination = step['contamination']
+    # Ensure a valid contamination value, as for the interactive detection
+    if contamination <= 0.0 or contamination > 0.5:
+        contamination = 0.2
+    sample = reservoir_sample(chunks, sample_rows, seed)
+    if sample is None or len(sample) == 0:
+        return None
+    sample = sample.drop(columns=[col for col in HELPER_COLUMNS if col in sample.columns])
+    if step['detector'] == 'isolation_forest':
+        encoder = FeatureEncoder.for_frame(sample)
+        categories = encoder.categories_of(sample)
+        matrix = encoder.encode(sample, categories)
+        model = IsolationForest(n_jobs=N_JOBS, random_state=seed).fit(matrix)
+        scores = OutlierScores(chunked_scores(model, matrix), model)
+        return {'encoder': encoder, 'categories': categories, 'model': model, 'threshold': scores.threshold(contamination)}
+    scores = outlier_scores(sample, step['detector'])
+    return {'sample': sample, 'threshold': scores.threshold(contamination)}
+
+
+def remove_outliers_applier(step, state):
+    def apply(chunk):
+        if state is None or len(chunk) == 0:
+            return chunk
+        chunk = chunk.drop(columns=[col for col in HELPER_COLUMNS if col in chunk.columns])
+        if 'model' in state:
+            scores = chunked_scores(state['model'], state['encoder'].encode(chunk, state['categories']))
+        else:
+            scores = outlier_scores(pd.concat([state['sample'], chunk]), step['detector']).scores[len(state['sample']):]
+        return chunk[~(scores < state['threshold'])]
+    return apply
+
+
+# Steps that are fitted on a pass over their input before they are applied
+STEP_FITTERS = {
+    'impute': fit_imputation_step,
+    'remove_outliers': fit_outlier_step
+}
+
+# Functions creating the transformation of the chunks of every step for one pass over the data
+# (from the step and its fitted state)
+STEP_APPLIERS = {
+    'drop_missing': drop_missing_applier,
+    'impute': impute_applier,
+    'drop_duplicates': drop_duplicates_applier,
+    'remove_outliers': remove_outliers_applier
+}
+
+
+# Replay a cleaning plan on the CSV file of a StreamingCsvReader, writing the cleaned rows as CSV to a path or buffer,
+# and return the number of rows read, written and removed by every step
+def replay_plan(plan, reader, output):
+    fitted = []
+    passes = 1
+    for i, step in enumerate(plan.steps):
+        fit = STEP_FITTERS.get(step['step'])
+        if fit is None:
+            fitted.append(None)
+            continue
+        report_progress(0.9 * i / len(plan.steps), 'Fitting step ' + str(i + 1) + ' (' + step['step'] + ')')
+        fitted.append(fit(step, replayed_chunks(reader, plan, plan.steps[:i], fitted)))
+        passes += 1
+
+    report_progress(0.9, 'Writing the cleaned data')
+    removed = [0] * len(plan.steps)
+    rows_written = 0
+    with (open(output, 'w', newline='') if isinstance(output, str) else contextlib.nullcontext(output)) as stream:
+        header = True
+        for chunk in replayed_chunks(reader, plan, plan.steps, fitted, removed):
+            chunk = chunk.drop(columns=[col for col in HELPER_COLUMNS if col in chunk.columns])
+            chunk.to_csv(stream, header=header, index=False)
+            header = False
+            rows_written += len(chunk)
+        if header:
+            # Without any chunk, the cleaned data still has the columns of the plan
+            pd.DataFrame(columns=list(plan.columns)).to_csv(stream, index=False)
+    return {
+        'rows_read': rows_written + sum(removed),
+        'rows_written': rows_written,
+        'passes': passes,
+        'steps': [dict(step, rows_removed=count) for step, count in zip(plan.steps, removed)]
+    }
@@ -0,0 +1,30 @@
+#######################################################################
+### This file contains functionality to draw stratified samples of ###
+### rows, which represent every stratum (e.g. every pattern of     ###
+### missing values) in proportion to its size within a bounded     ###
+### number of rows                                                 ###
+#######################################################################
+
+import numpy as np
+import pandas as pd
+
+
+# Number the distinct rows of a DataFrame (e.g. of missingness flags), which form the strata of a sample
+def row_strata(signature):
+    strata, _ = pd.factorize(pd.util.hash_pandas_object(signature, index=False).to_numpy())
+    return strata
+
+
+# Return the sorted positions of at most the given number of rows, picked from every stratum in proportion to its size
+# (every stratum keeps at least one row while they fit, so that rare strata are represented as well)
+def stratified_positions(strata, rows, rng):
+    counts = np.bincount(strata)
+    quotas = np.maximum(1, np.floor(counts * rows / len(strata))).astype(np.int64)
+    # Shuffle the rows, then keep the first rows of every stratum up to its quota
+    order = rng.permutation(len(strata))
+    rank = pd.Series(strata[order]).groupby(strata[order]).cumcount().to_numpy()
+    selected = order[rank < quotas[strata[order]]]
+    if len(selected) > rows:
+        # Strata that keep a single row each can exceed the number of rows (e.g. of wide, sparse data)
+        selected = rng.choice(selected, rows, replace=False)
+    return np.sort(selected)
@@ -0,0 +1,76 @@
+#######################################################################
+### This script compares the sample-first datetime detection with  ###
+### the previous implementation, which parsed every object column  ###
+### in full to measure its parse ratio                             ###
+### Usage: python benchmarks/datetime_parsing_benchmark.py [rows]  ###
+#######################################################################
+
+import sys
+import os
+import time
+import warnings
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from classes.datetime_detector import DatetimeDetector
+
+
+# The previous implementation of helper_functions.parse_datetime_cols
+def legacy_parse_datetime_cols(df):
+    data_original = df.copy()
+    object_cols = data_original.select_dtypes(include=['object']).columns
+    for col in object_cols:
+        try:
+            parsed_col = pd.to_datetime(df[col].str.strip(), errors='coerce')
+            timestamp_ratio = parsed_col.notna().mean()
+            if timestamp_ratio > 0.9:
+                data_original[col] = parsed_col
+        except Exception as e:
+            print('EXCEPTION: ', e)
+            data_original[col] = data_original[col]
+    return data_original
+
+
+# Generate a string-heavy DataFrame with datetime and non-datetime object columns
+def generate_data(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    timestamps = pd.Timestamp('2000-01-01') + pd.to_timedelta(rng.integers(0, 25 * 365 * 86400, rows), unit='s')
+    words = np.array(['apple', 'banana', 'cherry', 'date', 'elderberry', 'fig'])
+    return pd.DataFrame({
+        'iso_timestamp': timestamps.strftime('%Y-%m-%d %H:%M:%S'),
+        'us_date': timestamps.strftime('%m/%d/%Y'),
+        'day': timestamps.strftime('%d %b %Y'),
+        'fruit': words[rng.integers(0, len(words), rows)],
+        'code': pd.Series(rng.integers(0, 10**6, rows)).map('C-{:06d}'.format),
+        'mostly_text': np.where(rng.random(rows) < 0.5, timestamps.strftime('%Y-%m-%d'), words[rng.integers(0, len(words), rows)]),
+        'value': rng.normal(size=rows)
+    })
+
+
+# Return the median run time of a function over several repetitions
+def measure(fn, df, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = fn(df)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)), output
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    df = generate_data(rows)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        legacy_time, legacy_output = measure(legacy_parse_datetime_cols, df, repeat)
+    detector_time, detector_output = measure(lambda data: DatetimeDetector().parse(data.copy())[0], df, repeat)
+    # Both implementations must detect the same columns with the same values
+    pd.testing.assert_frame_equal(legacy_output, detector_output)
+    print('Rows:', rows)
+    print('Datetime columns:', list(detector_output.select_dtypes(include=['datetime']).columns))
+    print('Previous implementation: %.2f s' % legacy_time)
+    print('Sample-first detection:  %.2f s' % detector_time)
+    print('Speed-up: %.1fx' % (legacy_time / detector_time))
@@ -0,0 +1,55 @@
+#######################################################################
+### This script reports the payload sizes of the figures sent to   ###
+### the browser, with and without typed arrays, and their JSON     ###
+### serialisation times, against the number of rows of the data   ###
+### Usage: python benchmarks/figure_payload_benchmark.py           ###
+#######################################################################
+
+import sys
+import os
+import time
+import gzip
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from helper_functions import *
+from classes.vis import Vis
+from backend_magic.figure_payload import compact_figure
+
+# Numbers of rows of the generated datasets
+ROWS = [1000, 10000, 100000]
+
+
+def generate(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'height': rng.normal(170, 10, n),
+        'weight': rng.normal(70, 5, n),
+        'age': rng.integers(18, 90, n),
+        'outlier': rng.random(n) < 0.05
+    })
+
+
+# Serialise a figure as Dash does, returning its size, its compressed size and the time taken
+def serialise(figure):
+    start = time.perf_counter()
+    payload = pio.to_json(figure, validate=False).encode('utf-8')
+    seconds = time.perf_counter() - start
+    return len(payload), len(gzip.compress(payload)), seconds
+
+
+if __name__ == '__main__':
+    print('JSON engine: %s' % pio.json.config.default_engine)
+    for n in ROWS:
+        df = generate(n)
+        df.intent = ['height', 'weight']
+        for name, vis in (('machine view', Vis(0, df, machine_view=True)), ('scatter', Vis(1, df, enhance='outlier'))):
+            if vis.figure is None:
+                continue
+            plain = serialise(vis.figure)
+            compact = serialise(compact_figure(vis.figure))
+            print('%7d rows %-12s lists %8d bytes (%7d gzip, %6.1f ms), typed arrays %8d bytes (%7d gzip, %6.1f ms), %.1f bytes per row'
+                  % (n, name, plain[0], plain[1], 1000 * plain[2], compact[0], compact[1], 1000 * compact[2], compact[0] / n))
@@ -0,0 +1,57 @@
+#######################################################################
+### This script measures how the MinHash/LSH near-duplicate        ###
+### detection scales with the number of rows, and how many of the  ###
+### injected near-duplicates it recovers                           ###
+### Usage: python benchmarks/near_duplicate_benchmark.py [rows...] ###
+#######################################################################
+
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend_magic.near_duplicate_detection import near_duplicate_clusters, near_duplicated
+
+
+# Generate a DataFrame in which 5% of the rows are near-duplicates of other rows
+# (differing in casing, whitespace or by a small numeric deviation)
+def generate_data(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    originals = rows - rows // 20
+    first_names = np.array(['Alice', 'Bob', 'Carol', 'Dave', 'Eve', 'Frank', 'Grace', 'Heidi'])
+    cities = np.array(['London', 'Paris', 'New York', 'Berlin', 'Madrid', 'Rome'])
+    df = pd.DataFrame({
+        'name': pd.Series(first_names[rng.integers(0, len(first_names), originals)]) + ' ' + pd.Series(rng.integers(0, 10**6, originals)).astype(str),
+        'city': cities[rng.integers(0, len(cities), originals)],
+        'age': rng.integers(18, 90, originals),
+        'income': rng.normal(50000, 15000, originals).round(2),
+        'score': rng.random(originals)
+    })
+    # Copy some rows and perturb them slightly
+    sources = rng.choice(originals, rows - originals, replace=False)
+    copies = df.iloc[sources].copy()
+    copies['name'] = np.where(rng.random(len(copies)) < 0.5, copies['name'].str.upper(), '  ' + copies['name'] + ' ')
+    copies['income'] = copies['income'] + rng.normal(0, 1, len(copies))
+    df = pd.concat([df, copies], ignore_index=True)
+    return df, sources
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000]
+    previous = None
+    for rows in sizes:
+        df, sources = generate_data(rows)
+        start = time.perf_counter()
+        clusters = near_duplicate_clusters(df)
+        elapsed = time.perf_counter() - start
+        flagged = near_duplicated(clusters)
+        # An injected copy is recovered if it shares a cluster with the row it was copied from
+        copies = np.arange(len(df) - len(sources), len(df))
+        recall = (clusters[copies] == clusters[sources]).mean()
+        per_row = elapsed / rows * 1e6
+        growth = '' if previous is None else ' (time per row x%.2f)' % (per_row / previous)
+        previous = per_row
+        print('%8d rows: %6.2f s, %5.2f us per row%s, %d flagged, recall %.3f' % (rows, elapsed, per_row, growth, flagged.sum(), recall))
@@ -0,0 +1,44 @@
+#######################################################################
+### This script compares the registered outlier detectors on the  ###
+### bundled corrupted datasets, by latency and by the agreement   ###
+### (Jaccard similarity) of their outliers with the IsolationForest ###
+### Usage: python benchmarks/outlier_detector_benchmark.py [contamination]
+#######################################################################
+
+import sys
+import os
+import glob
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend_magic.outlier_detectors import OUTLIER_DETECTORS, outlier_scores
+
+# Number of runs whose fastest time is reported
+REPEATS = 5
+
+
+def jaccard(a, b):
+    union = (a | b).sum()
+    return (a & b).sum() / union if union else 1.0
+
+
+if __name__ == '__main__':
+    contamination = float(sys.argv[1]) if len(sys.argv) > 1 else 0.1
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(__file__), '..', 'assets', 'corrupted_*.csv'))):
+        # Outliers are handled after the missing values, which the IsolationForest cannot handle
+        df = pd.read_csv(path).dropna().reset_index(drop=True)
+        print('%s (%d rows, contamination %.2f)' % (os.path.basename(path), len(df), contamination))
+        reference = None
+        for method in OUTLIER_DETECTORS:
+            times = []
+            for _ in range(REPEATS):
+                start = time.perf_counter()
+                scores = outlier_scores(df, method)
+                times.append(time.perf_counter() - start)
+            flags = scores.flag(contamination)
+            if reference is None:
+                reference = flags
+            print('  %-16s %8.2f ms %5d outliers, agreement %.2f' % (method, 1000 * min(times), flags.sum(), jaccard(flags, reference)))
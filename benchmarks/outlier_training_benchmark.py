@@ -0,0 +1,66 @@
+#######################################################################
+### This script compares the previous outlier detection (a single ###
+### IsolationForest.fit_predict on all rows) with the parallel,   ###
+### subsampled training and chunked scoring, by time, peak memory ###
+### and agreement of the outlier flags                            ###
+### Usage: python benchmarks/outlier_training_benchmark.py [rows...]
+#######################################################################
+
+import sys
+import os
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import IsolationForest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend_magic.outlier_isolation_forest import encode_features, fit_outlier_scores
+
+CONTAMINATION = 0.2
+
+
+# Generate a DataFrame with numeric, categorical and datetime columns, in which 1% of the rows are anomalous
+def generate_data(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'age': rng.integers(18, 90, rows),
+        'income': rng.normal(50000, 15000, rows).round(2),
+        'score': rng.random(rows),
+        'city': rng.choice(['London', 'Paris', 'New York', 'Berlin', 'Madrid', 'Rome'], rows),
+        'joined': pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 10**8, rows), unit='s')
+    })
+    anomalies = rng.choice(rows, rows // 100, replace=False)
+    df.loc[anomalies, 'income'] = rng.normal(500000, 100000, len(anomalies))
+    return df
+
+
+# Run a function, returning its result, the elapsed time and the peak of the memory allocated meanwhile
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+
+def previous_detection(df):
+    iso = IsolationForest(contamination=CONTAMINATION, random_state=0)
+    return iso.fit_predict(encode_features(df)) == -1
+
+
+def new_detection(df):
+    return fit_outlier_scores(df, random_state=0).flag(CONTAMINATION)
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100000, 1000000, 10000000]
+    for rows in sizes:
+        df = generate_data(rows)
+        previous, previous_time, previous_peak = measure(previous_detection, df)
+        new, new_time, new_peak = measure(new_detection, df)
+        print('%9d rows: previous %7.2f s %7.0f MB | new %7.2f s %7.0f MB | %d vs %d outliers, %.1f%% of flags agree'
+              % (rows, previous_time, previous_peak, new_time, new_peak, previous.sum(), new.sum(), 100 * (previous == new).mean()))
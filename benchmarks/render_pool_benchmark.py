@@ -0,0 +1,54 @@
+#######################################################################
+### This script compares rendering the recommended visualisations ###
+### of several sessions one after another in the calling thread   ###
+### with rendering them in parallel in the pool of warm workers    ###
+### Usage: python benchmarks/render_pool_benchmark.py              ###
+#######################################################################
+
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from helper_functions import *
+from classes.vis import build_vis
+from classes.render_pool import RenderPool
+
+# Number of sessions rendering at the same time, and number of rows of their data
+SESSIONS = 8
+ROWS = 5000
+
+
+def generate(seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'height': rng.normal(170, 10, ROWS),
+        'weight': rng.normal(70, 5, ROWS),
+        'age': rng.integers(18, 90, ROWS),
+        'city': rng.choice(['Oslo', 'Rome', 'Lima'], ROWS),
+        'outlier': rng.random(ROWS) < 0.05
+    })
+    df.intent = ['height', 'weight']
+    return df
+
+
+if __name__ == '__main__':
+    frames = [generate(seed) for seed in range(SESSIONS)]
+    start = time.perf_counter()
+    for i, df in enumerate(frames):
+        build_vis(i, df.copy(), enhance='outlier')
+    print('%d renders in the calling thread: %.2f s' % (SESSIONS, time.perf_counter() - start))
+
+    pool = RenderPool()
+    pool.start()
+    # Wait for the workers to warm up, as they would while the server starts
+    pool.render(0, frames[0].copy(), enhance='outlier')
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=SESSIONS) as executor:
+        list(executor.map(lambda i: pool.render(i, frames[i], enhance='outlier'), range(SESSIONS)))
+    print('%d renders in %d warm workers: %.2f s' % (SESSIONS, pool.max_workers, time.perf_counter() - start))
+    pool.shutdown()
@@ -0,0 +1,48 @@
+#######################################################################
+### This script compares rendering the recommended visualisations ###
+### of the bundled corrupted datasets as Plotly figures built from ###
+### their data with generating their Matplotlib code in Lux        ###
+### Usage: python benchmarks/vis_rendering_benchmark.py            ###
+#######################################################################
+
+import sys
+import os
+import glob
+import time
+import copy
+import pandas as pd
+import plotly.io as pio
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from helper_functions import *
+from classes.vis import Vis, CATEGORICAL_COLOURSCALE
+
+# Number of runs whose fastest time is reported
+REPEATS = 5
+
+
+def fastest(render, lux_vis):
+    times = []
+    for _ in range(REPEATS):
+        # Rendering can change the Vis (e.g. binning scatter plots into heatmaps), so every run starts from a copy
+        vis = copy.deepcopy(lux_vis)
+        start = time.perf_counter()
+        result = render(vis)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+if __name__ == '__main__':
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(__file__), '..', 'assets', 'corrupted_*.csv'))):
+        df = pd.read_csv(path).dropna().reset_index(drop=True)
+        print('%s (%d rows)' % (os.path.basename(path), len(df)))
+        for rec_group in range(3):
+            # Recommend without rendering, then render the recommended Lux visualisation both ways
+            lux_vis = Vis(0, df.copy(), rec_group=rec_group, temporary=True).lux_vis
+            if lux_vis is None:
+                continue
+            plotly_time, figure = fastest(lambda vis: vis.to_plotly(colorscale=CATEGORICAL_COLOURSCALE), lux_vis)
+            matplotlib_time, _ = fastest(lambda vis: vis.to_matplotlib(), lux_vis)
+            size = len(pio.to_json(figure)) if figure is not None else 0
+            print('  %-10s plotly %8.2f ms (%7d bytes), matplotlib code %8.2f ms' % (lux_vis.mark, 1000 * plotly_time, size, 1000 * matplotlib_time))
@@ -0,0 +1,111 @@
+#######################################################################
+### This class records the cleaning actions of a session as a      ###
+### declarative, serialisable plan (the schema of the uploaded     ###
+### data and a list of steps), which can be replayed headlessly on ###
+### any dataset with the same schema                               ###
+#######################################################################
+
+import json
+import pandas as pd
+
+# Version of the serialised format of a plan
+PLAN_VERSION = 1
+
+# Steps a plan can consist of, with the parameters each of them takes
+STEP_PARAMETERS = {
+    # Delete the rows with any missing value
+    'drop_missing': (),
+    # Impute the missing values of the numeric columns ('simple' for the mean, or 'KNN')
+    'impute': ('method',),
+    # Delete exact duplicates ('exact'), or near-duplicates at a similarity threshold ('near')
+    'drop_duplicates': ('mode', 'threshold'),
+    # Delete the rows flagged as outliers by a detector at a contamination
+    'remove_outliers': ('detector', 'contamination')
+}
+
+
+class CleaningPlan:
+
+    def __init__(self, columns=None, datetime_formats=None, source=None, steps=None):
+        # Names and types of the columns of the data the plan was recorded on
+        self.columns = dict(columns or {})
+        # Format every datetime column was parsed with ('mixed' if it has no single format)
+        self.datetime_formats = dict(datetime_formats or {})
+        # Name of the file the plan was recorded on
+        self.source = source
+        self.steps = list(steps or [])
+        # Number of steps at the last checkpoint, which undo returns to
+        self.checkpoint_steps = len(self.steps)
+
+    # Start a plan for the (uploaded) DataFrame, recording its schema
+    @classmethod
+    def from_frame(cls, df, source=None, datetime_formats=None):
+        columns = {str(col): str(dtype) for col, dtype in df.dtypes.items()}
+        formats = {col: format for col, format in (datetime_formats or {}).items() if col in columns and columns[col].startswith('datetime64')}
+        return cls(columns, formats, source)
+
+    # Append a step, checking its name and parameters
+    def record(self, step, **params):
+        if step not in STEP_PARAMETERS:
+            raise ValueError('Unknown cleaning step: ' + str(step))
+        unknown = set(params) - set(STEP_PARAMETERS[step])
+        if unknown:
+            raise ValueError('Unknown parameters of the ' + step + ' step: ' + ', '.join(sorted(unknown)))
+        self.steps.append(dict({'step': step}, **params))
+
+    # Remember the current steps as the steps to return to when undoing (mirroring the checkpoints of the data)
+    def checkpoint(self):
+        self.checkpoint_steps = len(self.steps)
+
+    # Forget the steps recorded since the last checkpoint
+    def undo(self):
+        del self.steps[self.checkpoint_steps:]
+
+    def to_dict(self):
+        return {
+            'version': PLAN_VERSION,
+            'source': self.source,
+            'columns': self.columns,
+            'datetime_formats': self.datetime_formats,
+            'steps': self.steps
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    @classmethod
+    def from_dict(cls, plan):
+        if plan.get('version') != PLAN_VERSION:
+            raise ValueError('Unsupported version of a cleaning plan: ' + str(plan.get('version')))
+        result = cls(plan['columns'], plan.get('datetime_formats'), plan.get('source'))
+        for step in plan['steps']:
+            params = {name: value for name, value in step.items() if name != 'step'}
+            result.record(step['step'], **params)
+        result.checkpoint()
+        return result
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(json.loads(text))
+
+    # Bring a chunk of (normalised) data into the schema of the plan, so that every chunk has the same column types
+    def conform(self, df):
+        missing = [col for col in self.columns if col not in df.columns]
+        extra = [col for col in df.columns if col not in self.columns]
+        if missing or extra:
+            raise ValueError('The data does not match the schema of the cleaning plan (missing columns: ' + ', '.join(missing) + '; unexpected columns: ' + ', '.join(extra) + ')')
+        df = df[list(self.columns)].copy()
+        for col, dtype in self.columns.items():
+            if str(df[col].dtype) == dtype or dtype == 'bool':
+                # Boolean columns with missing values in a chunk are left as objects, like pandas parses them
+                continue
+            if dtype.startswith('datetime64'):
+                values = df[col].astype(str).str.strip()
+                df[col] = pd.to_datetime(values, format=self.datetime_formats.get(col, 'mixed'), errors='coerce')
+            elif pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(dtype)):
+                values = pd.to_numeric(df[col], errors='coerce')
+                # Integer columns with missing values in a chunk are kept as floats
+                df[col] = values.astype(dtype) if not values.isna().any() else values.astype('float64')
+            else:
+                df[col] = df[col].astype(dtype)
+        return df
@@ -0,0 +1,121 @@
+#######################################################################
+### This class caches parsed datasets on disk, keyed by a hash of  ###
+### their raw content, so that re-loading the same data skips CSV  ###
+### parsing and datetime detection                                 ###
+#######################################################################
+
+import os
+import json
+import hashlib
+import tempfile
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# Increase whenever the parsing pipeline changes, so that stale cache entries are ignored
+CACHE_VERSION = 4
+
+# Key of the metadata stored along with a cached DataFrame (e.g. the formats of its datetime columns)
+METADATA_KEY = b'visual_data_wizard'
+
+# Default location of the cache, which can be overridden with the VDW_CACHE_DIR environment variable
+DEFAULT_CACHE_DIR = os.environ.get('VDW_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'visual_data_wizard', 'datasets'))
+
+
+class DatasetCache:
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=2 * 1024**3):
+        self.cache_dir = cache_dir
+        # Upper bound on the disk space used by the cache
+        self.max_bytes = max_bytes
+
+    # Compute the cache key of raw file content, given as bytes or as an iterable of byte blocks
+    # Further parameters that affect parsing (e.g. a row limit) are included in the key
+    @staticmethod
+    def content_key(content, *params):
+        digest = hashlib.blake2b(digest_size=20)
+        for block in ([content] if isinstance(content, bytes) else content):
+            digest.update(block)
+        digest.update(str(CACHE_VERSION).encode('utf-8'))
+        for param in params:
+            digest.update(repr(param).encode('utf-8'))
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key + '.feather')
+
+    # Return the cached DataFrame for the given key, or None if it has not been cached yet
+    def get(self, key):
+        return self.get_entry(key)[0]
+
+    # Return the cached DataFrame for the given key and the metadata stored with it, or (None, None) if it has not been cached yet
+    def get_entry(self, key):
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None, None
+        try:
+            # Memory-map the uncompressed Arrow file instead of reading it into a buffer first
+            table = feather.read_table(path, memory_map=True)
+            # Wrap the frame so that it is initialised like any other (Lux) DataFrame
+            df = pd.DataFrame(table.to_pandas(coerce_temporal_nanoseconds=True))
+            metadata = json.loads((table.schema.metadata or {}).get(METADATA_KEY, b'{}'))
+        except (OSError, ValueError, pa.ArrowException) as e:
+            print('EXCEPTION: ', e)
+            return None, None
+        # Arrow restores missing strings as None, whereas the CSV parser produces NaN
+        for col in df.select_dtypes(include=['object']).columns:
+            if df[col].hasnans:
+                df[col] = df[col].fillna(np.nan)
+        # Refresh the modification time, which determines the eviction order
+        os.utime(path)
+        return df, metadata
+
+    # Store a parsed DataFrame under the given key, along with metadata that can be serialised as JSON
+    def put(self, key, df, metadata=None):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path(key)
+        tmp_path = path + '.' + str(os.getpid()) + '.tmp'
+        try:
+            table = pa.Table.from_pandas(pd.DataFrame(df).reset_index(drop=True))
+            if metadata:
+                table = table.replace_schema_metadata({**(table.schema.metadata or {}), METADATA_KEY: json.dumps(metadata).encode('utf-8')})
+            feather.write_feather(table, tmp_path, compression='uncompressed')
+            # Replace atomically so that concurrent readers never see partial files
+            os.replace(tmp_path, path)
+        except (OSError, ValueError, TypeError, pa.ArrowException) as e:
+            # Some frames (e.g. with duplicate column names or mixed-type columns) cannot be stored
+            print('EXCEPTION: ', e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        self.prune()
+        return True
+
+    # Remove the least recently used entries until the cache fits into its disk budget
+    def prune(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.feather'):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    # Remove all entries from the cache
+    def clear(self):
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.feather'):
+                    os.remove(os.path.join(self.cache_dir, name))
@@ -0,0 +1,136 @@
+#######################################################################
+### This class detects object columns that represent datetimes,    ###
+### deciding from a small sample first and converting full columns ###
+### with one explicit format per column (cached per dataset)       ###
+#######################################################################
+
+import os
+import warnings
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+# Number of values per column on which the decision whether a column holds datetimes is made
+DEFAULT_SAMPLE_SIZE = 1000
+
+# Number of sampled values from which the format of a column is guessed
+FORMAT_CANDIDATES = 20
+
+
+class DatetimeDetector:
+
+    def __init__(self, threshold=0.9, sample_size=DEFAULT_SAMPLE_SIZE, max_workers=None, max_formats=1024):
+        # Minimum proportion of values that must convert successfully for a column to be treated as datetimes
+        self.threshold = threshold
+        self.sample_size = sample_size
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        # Format inferred for every (dataset, column name), re-used whenever the same dataset is parsed again
+        # (formats are never shared between datasets, as an ambiguous column like dd/mm vs mm/dd may differ),
+        # ordered from least to most recently used and limited to max_formats columns
+        self.formats = OrderedDict()
+        self.max_formats = max_formats
+        self.lock = threading.Lock()
+
+    # Draw values spread evenly over the whole column (including missing values, as the threshold does)
+    def sample(self, values):
+        if len(values) <= self.sample_size:
+            return values
+        positions = np.linspace(0, len(values) - 1, self.sample_size).astype(np.int64)
+        return values.iloc[positions]
+
+    # Return the proportion of values converted successfully
+    @staticmethod
+    def parse_ratio(values, format=None):
+        with warnings.catch_warnings():
+            # Columns without a consistent format are parsed element by element, which is expected here
+            warnings.simplefilter('ignore', UserWarning)
+            parsed = pd.to_datetime(values, format=format, errors='coerce')
+        return parsed.notna().mean(), parsed
+
+    # Guess the most common explicit format of the sampled values, or None if no format can be guessed
+    @staticmethod
+    def guess_format(values):
+        candidates = Counter()
+        for value in values.dropna().iloc[:FORMAT_CANDIDATES]:
+            if isinstance(value, str):
+                candidates[guess_datetime_format(value)] += 1
+        candidates.pop(None, None)
+        if not candidates:
+            return None
+        return candidates.most_common(1)[0][0]
+
+    # Decide from a sample whether a column holds datetimes, and if so return the format to convert it with
+    # ('mixed' is returned if the values parse, but not with a single explicit format)
+    # The format is cached for the column of the given dataset (e.g. the key of its content), if any
+    def detect(self, col, values, dataset=None):
+        sample = self.sample(values).str.strip()
+        # Try the format cached for this column of the dataset first
+        cached_format = self.cached_format(dataset, col) if dataset is not None else None
+        if cached_format is not None and self.parse_ratio(sample, cached_format)[0] > self.threshold:
+            return cached_format
+        sample_ratio, _ = self.parse_ratio(sample)
+        if sample_ratio <= self.threshold:
+            return None
+        format = self.guess_format(sample)
+        if format is None or self.parse_ratio(sample, format)[0] <= self.threshold:
+            format = 'mixed'
+        if dataset is not None:
+            self.cache_format(dataset, col, format)
+        return format
+
+    # Return the format cached for a column of a dataset, marking it as most recently used
+    def cached_format(self, dataset, col):
+        with self.lock:
+            format = self.formats.get((dataset, col))
+            if format is not None:
+                self.formats.move_to_end((dataset, col))
+            return format
+
+    # Cache the format of a column of a dataset, evicting the least recently used formats beyond max_formats
+    def cache_format(self, dataset, col, format):
+        with self.lock:
+            self.formats[(dataset, col)] = format
+            self.formats.move_to_end((dataset, col))
+            while len(self.formats) > self.max_formats:
+                self.formats.popitem(last=False)
+
+    # Convert a full column with the detected format, or return None if too few values convert
+    def convert(self, values, format):
+        try:
+            values = values.str.strip()
+            if format == 'mixed':
+                # Fall back to guessing the format of every element
+                ratio, parsed = self.parse_ratio(values)
+            else:
+                ratio, parsed = self.parse_ratio(values, format)
+        except Exception as e:
+            print('EXCEPTION: ', e)
+            return None
+        return parsed if ratio > self.threshold else None
+
+    # Convert every object column of a DataFrame that represents datetimes, returning the DataFrame
+    # and the format every converted column was parsed with
+    def parse(self, df, dataset=None):
+        object_cols = df.select_dtypes(include=['object']).columns
+        formats = {}
+        for col in object_cols:
+            try:
+                format = self.detect(col, df[col], dataset)
+            except Exception as e:
+                print('EXCEPTION: ', e)
+                # Treat it as a non-datetime column
+                continue
+            if format is not None:
+                formats[col] = format
+        if not formats:
+            return df, {}
+        # Only the columns detected from their samples are converted in full, in parallel
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(formats))) as executor:
+            converted = dict(zip(formats, executor.map(lambda col: self.convert(df[col], formats[col]), formats)))
+        for col, parsed in converted.items():
+            if parsed is not None:
+                df[col] = parsed
+        return df, {col: formats[col] for col, parsed in converted.items() if parsed is not None}
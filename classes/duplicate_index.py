@@ -0,0 +1,95 @@
+#######################################################################
+### This class groups identical rows of a DataFrame into clusters  ###
+### from a single pass of vectorised row hashing, and keeps the    ###
+### clusters up to date when rows are deleted (rows sharing a hash ###
+### are compared once, so that hash collisions are never merged)   ###
+#######################################################################
+
+import numpy as np
+import pandas as pd
+
+# Columns that do not take part in the comparison of rows
+IGNORED_COLUMNS = ('id', 'duplicate')
+
+
+# Return the position of the first member of every cluster
+def first_positions(codes, n_clusters):
+    positions = np.empty(n_clusters, dtype=np.int64)
+    # Assigning in reverse order leaves the smallest position of every cluster
+    positions[codes[::-1]] = np.arange(len(codes) - 1, -1, -1)
+    return positions
+
+
+# Check whether the rows at two arrays of positions hold the same values (treating missing values as equal)
+def rows_equal(frame, left, right):
+    equal = np.ones(len(left), dtype=bool)
+    for i in range(frame.shape[1]):
+        values = frame.iloc[:, i].to_numpy()
+        a, b = values[left], values[right]
+        missing_a, missing_b = pd.isna(a), pd.isna(b)
+        same = missing_a & missing_b
+        # Only values present in both rows are compared, as comparisons with missing values are undefined
+        present = ~missing_a & ~missing_b
+        same[present] = np.asarray(a[present] == b[present], dtype=bool)
+        equal &= same
+    return equal
+
+
+# Move the rows that share the hash of a cluster without being identical to its first row (e.g. 1 and '1' in a text
+# column, or a genuine hash collision) into clusters of their own, until every cluster only holds identical rows
+def split_collisions(frame, codes, counts):
+    check = np.flatnonzero(counts[codes] > 1)
+    while len(check) > 0:
+        firsts = first_positions(codes, len(counts))[codes[check]]
+        different = check[~rows_equal(frame, check, firsts)]
+        if len(different) == 0:
+            break
+        new_codes, _ = pd.factorize(codes[different])
+        codes[different] = len(counts) + new_codes
+        counts = np.bincount(codes, minlength=len(counts) + new_codes.max() + 1)
+        # Only the moved rows can still differ from the first row of their (new) cluster
+        check = different
+    return codes, counts
+
+
+class DuplicateIndex:
+
+    def __init__(self, codes, counts):
+        # Cluster of every row (identical rows share a cluster)
+        self.codes = codes
+        # Number of rows in every cluster
+        self.counts = counts
+
+    # Build the index by hashing every row of a DataFrame once
+    @classmethod
+    def from_frame(cls, df, ignore=IGNORED_COLUMNS):
+        columns = [col for col in df.columns if col not in ignore]
+        if len(df) == 0 or not columns:
+            return cls(np.zeros(len(df), dtype=np.int64), np.array([len(df)], dtype=np.int64))
+        frame = pd.DataFrame(df[columns])
+        hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+        # Clusters are numbered in the order of their first occurrence
+        codes, uniques = pd.factorize(hashes)
+        counts = np.bincount(codes, minlength=len(uniques))
+        return cls(*split_collisions(frame, codes.astype(np.int64), counts))
+
+    # Boolean mask of the rows that duplicate another row, like DataFrame.duplicated(keep=keep)
+    def duplicated(self, keep='first'):
+        if keep is False:
+            # Every member of a cluster with more than one row
+            return self.counts[self.codes] > 1
+        n_clusters = len(self.counts)
+        if keep == 'last':
+            reversed_positions = first_positions(self.codes[::-1], n_clusters)
+            return (len(self.codes) - 1 - reversed_positions)[self.codes] != np.arange(len(self.codes))
+        return first_positions(self.codes, n_clusters)[self.codes] != np.arange(len(self.codes))
+
+    # Cluster of every row, or -1 for rows without duplicates
+    def cluster_ids(self):
+        return np.where(self.counts[self.codes] > 1, self.codes, -1)
+
+    # Return the index after keeping only the rows of the given boolean mask (without re-hashing any rows)
+    def drop_rows(self, keep_mask):
+        keep_mask = np.asarray(keep_mask, dtype=bool)
+        counts = self.counts - np.bincount(self.codes[~keep_mask], minlength=len(self.counts))
+        return DuplicateIndex(self.codes[keep_mask], counts)
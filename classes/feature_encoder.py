@@ -0,0 +1,106 @@
+#######################################################################
+### This class encodes a DataFrame into a single contiguous        ###
+### float32 matrix for model training, following a plan compiled  ###
+### once per schema (column names and types)                       ###
+#######################################################################
+
+import threading
+import numpy as np
+import pandas as pd
+
+# Columns that are never used as features
+IGNORED_COLUMNS = ('outlier',)
+
+
+class FeatureEncoder:
+
+    # Compiled encoders, shared by all retrains and sessions of this process
+    cache = {}
+    cache_lock = threading.Lock()
+    max_cached = 64
+
+    def __init__(self, schema):
+        self.schema = schema
+        # Group the feature columns by how they are encoded, remembering their position in the matrix
+        self.numeric, self.datetime, self.boolean, self.categorical = [], [], [], []
+        for position, (col, kind) in enumerate(schema):
+            {'numeric': self.numeric, 'datetime': self.datetime, 'boolean': self.boolean, 'categorical': self.categorical}[kind].append((position, col))
+
+    # Describe the feature columns of a DataFrame by name and kind of encoding
+    @staticmethod
+    def schema_of(df):
+        schema = []
+        for col, dtype in df.dtypes.items():
+            if col in IGNORED_COLUMNS:
+                continue
+            if pd.api.types.is_bool_dtype(dtype):
+                kind = 'boolean'
+            elif pd.api.types.is_datetime64_any_dtype(dtype):
+                kind = 'datetime'
+            elif pd.api.types.is_numeric_dtype(dtype):
+                kind = 'numeric'
+            else:
+                kind = 'categorical'
+            schema.append((col, kind))
+        return tuple(schema)
+
+    # Return the compiled encoder for the schema of a DataFrame, compiling it on first use
+    @classmethod
+    def for_frame(cls, df):
+        schema = cls.schema_of(df)
+        with cls.cache_lock:
+            encoder = cls.cache.get(schema)
+            if encoder is None:
+                if len(cls.cache) >= cls.max_cached:
+                    cls.cache.pop(next(iter(cls.cache)))
+                encoder = cls.cache[schema] = cls(schema)
+            return encoder
+
+    @property
+    def columns(self):
+        return [col for col, _ in self.schema]
+
+    # Sorted distinct values of every categorical column, from which further DataFrames can be encoded with the same codes
+    def categories_of(self, df):
+        return {col: self.category_values(df[col]) for _, col in self.categorical}
+
+    # Encode a DataFrame of this schema into a C-contiguous float32 matrix
+    # (categories can be given to encode e.g. every chunk of a large file alike, unknown values become -1)
+    def encode(self, df, categories=None):
+        matrix = np.empty((len(df), len(self.schema)), dtype=np.float32)
+        if self.numeric:
+            # All numeric columns are converted in a single block
+            positions, cols = zip(*self.numeric)
+            matrix[:, list(positions)] = df[list(cols)].to_numpy(dtype=np.float32, na_value=np.nan)
+        for position, col in self.datetime:
+            # Epoch seconds (missing timestamps become NaN)
+            values = df[col].to_numpy(dtype='datetime64[ns]')
+            seconds = values.astype(np.int64) // 10**9
+            matrix[:, position] = np.where(np.isnat(values), np.nan, seconds)
+        for position, col in self.boolean:
+            matrix[:, position] = df[col].to_numpy(dtype=np.float32)
+        for position, col in self.categorical:
+            if categories is None:
+                matrix[:, position] = self.category_codes(df[col])
+            else:
+                matrix[:, position] = categories[col].get_indexer(df[col])
+        return matrix
+
+    # Encode categories as the position of their value among the sorted distinct values (as LabelEncoder does)
+    @staticmethod
+    def category_codes(values):
+        try:
+            codes, _ = pd.factorize(values, sort=True)
+        except TypeError:
+            # Values of different types cannot be sorted, so they are numbered in order of appearance
+            codes, _ = pd.factorize(values)
+        return codes
+
+    # Distinct values of categories in the order of their codes
+    @staticmethod
+    def category_values(values):
+        try:
+            _, uniques = pd.factorize(values, sort=True)
+        except TypeError:
+            _, uniques = pd.factorize(values)
+        return pd.Index(uniques)
@@ -0,0 +1,94 @@
+#######################################################################
+### This class caches rendered visualisations in memory, keyed by  ###
+### the version of the data and the specification of the Vis,      ###
+### so that identical figures (e.g. after undo or re-selecting a   ###
+### dataset) are not recommended and rendered again                ###
+#######################################################################
+
+import os
+import copy
+import threading
+from collections import OrderedDict
+
+# Default memory budget of the cache in megabytes, which can be overridden with the VDW_FIGURE_CACHE_MB environment variable
+DEFAULT_MAX_MB = int(os.environ.get('VDW_FIGURE_CACHE_MB', 256))
+# Estimated number of bytes of a cached Vis besides its figure (e.g. its columns and recommendation details)
+ENTRY_OVERHEAD_BYTES = 1024
+
+
+class FigureCache:
+
+    def __init__(self, max_entries=512, max_bytes=DEFAULT_MAX_MB * 1024**2):
+        # Maximum number of figures kept at the same time
+        self.max_entries = max_entries
+        # Upper bound on the (estimated) size of all cached figures
+        self.max_bytes = max_bytes
+        # Cached Vis objects and their sizes, ordered from least to most recently used
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        # The cache is shared by the callbacks of all sessions
+        self.lock = threading.Lock()
+
+    # Compute the cache key of a Vis of a DataFrame: the key of its version of the data (see VersionedDataset), its
+    # Lux intent and the parameters of the Vis (e.g. the recommendation and the attribute enhanced), which determine
+    # its mark. Data without a version (e.g. a preview sample) is not cached
+    @staticmethod
+    def key(version, df, **params):
+        if version is None:
+            return None
+        intent = tuple(str(clause) for clause in getattr(df, 'intent', None) or [])
+        return (version, intent, tuple(sorted(params.items())))
+
+    # Estimate the number of bytes held by a Vis: its payload and the figure it was compacted from, which holds
+    # the same values (measuring the objects themselves would serialise every figure again)
+    @staticmethod
+    def size_of(vis):
+        return 2 * (vis.payload_bytes or 0) + ENTRY_OVERHEAD_BYTES
+
+    # Return a copy of the cached Vis for the given key under a new ID, or None if it has not been cached yet
+    # (the figure itself is shared between the copies and must not be modified)
+    def get(self, key, id):
+        if key is None:
+            return None
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        vis = copy.copy(entry[0])
+        vis.id = id
+        return vis
+
+    # Store a rendered Vis under the given key
+    def put(self, key, vis):
+        if key is None:
+            return False
+        size = self.size_of(vis)
+        if size > self.max_bytes:
+            return False
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (vis, size)
+            self.total_bytes += size
+            self.evict()
+        return True
+
+    # Remove the least recently used figures until the cache fits into its budgets
+    def evict(self):
+        while self.entries and (len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes):
+            _, (_, size) = self.entries.popitem(last=False)
+            self.total_bytes -= size
+
+    # Remove all figures from the cache
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def __len__(self):
+        return len(self.entries)
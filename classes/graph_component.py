@@ -16,7 +16,8 @@ class Graph_component:
                 children=[
                     dcc.Graph(
                         id={'type': 'dynamic-graph', 'index': vis.id},
-                        figure=vis.figure,
+                        # Large numeric arrays are sent as typed arrays rather than lists of numbers
+                        figure=vis.payload if vis.payload is not None else vis.figure,
                         style={'width': '45%', 'boxSizing': 'border-box'} # 'padding': '5px', 
                     )
                 ],
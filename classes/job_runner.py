@@ -0,0 +1,228 @@
+#######################################################################
+### This class runs heavy computations (model training, imputation ###
+### and recommendation generation) in a pool of worker processes,  ###
+### keeping track of their progress in an on-disk job store        ###
+#######################################################################
+
+import os
+import json
+import time
+import uuid
+import pickle
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Default location of the job store, which can be overridden with the VDW_JOB_DIR environment variable
+DEFAULT_JOB_DIR = os.environ.get('VDW_JOB_DIR', os.path.join(tempfile.gettempdir(), 'visual_data_wizard', 'jobs'))
+
+# Default number of worker processes, which can be overridden with the VDW_JOB_WORKERS environment variable
+# (0 runs every job inline in the calling thread)
+DEFAULT_WORKERS = int(os.environ.get('VDW_JOB_WORKERS', min(4, os.cpu_count() or 1)))
+
+# The job currently executed by this thread (of a worker process, or of the web server if jobs run inline),
+# used by report_progress()
+_current_job = threading.local()
+
+
+class JobCancelled(Exception):
+    pass
+
+
+# Write the status of a job to the job store
+def _write_status(job_dir, job_id, state, progress=0.0, message=''):
+    path = os.path.join(job_dir, job_id + '.json')
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'state': state, 'progress': progress, 'message': message, 'updated': time.time()}, f)
+    os.replace(tmp_path, path)
+
+
+# Report the progress (between 0 and 1) of the job running in this process
+# Outside of a job this is a no-op, so computations can call it unconditionally
+def report_progress(progress, message=''):
+    job = getattr(_current_job, 'job', None)
+    if job is None:
+        return
+    job_dir, job_id = job
+    # Cancellation is cooperative: a superseded job stops at its next progress report
+    if os.path.exists(os.path.join(job_dir, job_id + '.cancel')):
+        raise JobCancelled(job_id)
+    _write_status(job_dir, job_id, 'running', progress, message)
+
+
+# Entry point of a job inside a worker process
+def _execute(job_dir, job_id, fn, args, kwargs):
+    _current_job.job = (job_dir, job_id)
+    try:
+        report_progress(0.0, 'Started')
+        result = fn(*args, **kwargs)
+        # Do not store results that nobody is waiting for anymore
+        report_progress(1.0, 'Storing the result')
+        # Store the result on disk rather than sending it back through the pool's pipe
+        with open(os.path.join(job_dir, job_id + '.pkl'), 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        _write_status(job_dir, job_id, 'done', 1.0, 'Finished')
+    except JobCancelled:
+        _write_status(job_dir, job_id, 'cancelled')
+        os.remove(os.path.join(job_dir, job_id + '.cancel'))
+    except Exception as e:
+        # Record the failure, so that the job is no longer shown as running, and raise it in the waiting thread
+        _write_status(job_dir, job_id, 'failed', message=str(e))
+        raise
+    finally:
+        _current_job.job = None
+
+
+# Prepare a freshly started worker process
+def _init_worker(initializer):
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    if initializer is not None:
+        initializer()
+
+
+class JobRunner:
+
+    def __init__(self, max_workers=DEFAULT_WORKERS, job_dir=DEFAULT_JOB_DIR, poll_interval=0.05, initializer=None, max_age=3600):
+        self.max_workers = max_workers
+        # Function called once in every worker process before it runs any jobs (e.g. to import libraries)
+        self.initializer = initializer
+        self.job_dir = job_dir
+        self.poll_interval = poll_interval
+        # Number of seconds after which the files of abandoned jobs are removed
+        self.max_age = max_age
+        self.executor = None
+        # Most recent job of every slot (e.g. a session's outlier stage), used to cancel superseded jobs
+        self.slots = {}
+        # Futures and cancellation events of all unfinished jobs
+        self.futures = {}
+        self.cancel_events = {}
+        self.lock = threading.Lock()
+
+    # Start the worker processes on first use
+    def get_executor(self):
+        if self.executor is None:
+            # Spawned workers do not inherit the locks held by other threads of the web server
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn'), initializer=_init_worker, initargs=(self.initializer,))
+        return self.executor
+
+    # Submit fn(*args, **kwargs) as a new job of the given slot, cancelling the slot's previous job, and return its ID
+    # without waiting for it (without worker processes, the job has already finished when its ID is returned)
+    def submit(self, slot, fn, *args, **kwargs):
+        os.makedirs(self.job_dir, exist_ok=True)
+        self.prune()
+        job_id = uuid.uuid4().hex
+        with self.lock:
+            previous = self.slots.get(slot)
+            if previous is not None:
+                self.cancel(previous)
+            self.slots[slot] = job_id
+            self.cancel_events[job_id] = threading.Event()
+            _write_status(self.job_dir, job_id, 'queued')
+            if self.max_workers == 0:
+                future = Future()
+            else:
+                try:
+                    future = self.get_executor().submit(_execute, self.job_dir, job_id, fn, args, kwargs)
+                except BrokenProcessPool:
+                    # Replace a pool whose workers died (e.g. after running out of memory)
+                    self.executor = None
+                    future = self.get_executor().submit(_execute, self.job_dir, job_id, fn, args, kwargs)
+            self.futures[job_id] = future
+        if self.max_workers == 0:
+            # Run the job in the calling thread, recording its outcome in the job's future
+            try:
+                future.set_result(_execute(self.job_dir, job_id, fn, args, kwargs))
+            except Exception as e:
+                future.set_exception(e)
+        return job_id
+
+    # Check whether a job has finished (successfully or not), without waiting for it
+    def done(self, job_id):
+        future = self.futures.get(job_id)
+        return future is None or future.done()
+
+    # Cancel a job: queued jobs never start, running jobs stop at their next progress report
+    def cancel(self, job_id):
+        future = self.futures.get(job_id)
+        if future is not None and not future.cancel() and not future.done():
+            open(os.path.join(self.job_dir, job_id + '.cancel'), 'w').close()
+        event = self.cancel_events.get(job_id)
+        if event is not None:
+            event.set()
+        _write_status(self.job_dir, job_id, 'cancelled')
+
+    # Return the status of a job, or None if it is unknown
+    def status(self, job_id):
+        try:
+            with open(os.path.join(self.job_dir, job_id + '.json')) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    # Return the status of the most recent job of a slot
+    def slot_status(self, slot):
+        job_id = self.slots.get(slot)
+        if job_id is None:
+            return None
+        return self.status(job_id)
+
+    # Wait for a job to finish and return its result (callbacks of the web server only ask for the results of
+    # finished jobs, see done(), so that they never wait for a computation)
+    def result(self, job_id, timeout=None):
+        future = self.futures[job_id]
+        event = self.cancel_events[job_id]
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            # Wait in short intervals, so that a cancelled job releases the waiting thread immediately
+            while not future.done():
+                if event.is_set():
+                    raise JobCancelled(job_id)
+                if deadline is not None and time.monotonic() > deadline:
+                    self.cancel(job_id)
+                    raise TimeoutError('Job ' + job_id + ' did not finish in time')
+                event.wait(self.poll_interval)
+            if event.is_set() or future.cancelled():
+                raise JobCancelled(job_id)
+            # Re-raise any exception of the job itself
+            try:
+                future.result()
+            except BrokenProcessPool as e:
+                # The worker died (e.g. after running out of memory) before it could record the failure
+                _write_status(self.job_dir, job_id, 'failed', message=str(e))
+                raise
+            status = self.status(job_id)
+            if status is None or status['state'] != 'done':
+                raise JobCancelled(job_id)
+            with open(os.path.join(self.job_dir, job_id + '.pkl'), 'rb') as f:
+                return pickle.load(f)
+        finally:
+            self.cleanup(job_id)
+
+    # Remove the result and bookkeeping of a job (its status is kept for progress displays)
+    def cleanup(self, job_id):
+        with self.lock:
+            self.futures.pop(job_id, None)
+            self.cancel_events.pop(job_id, None)
+        path = os.path.join(self.job_dir, job_id + '.pkl')
+        if os.path.exists(path):
+            os.remove(path)
+
+    # Remove the files of jobs that have not been updated for longer than max_age seconds
+    def prune(self):
+        now = time.time()
+        for name in os.listdir(self.job_dir):
+            path = os.path.join(self.job_dir, name)
+            try:
+                if now - os.path.getmtime(path) > self.max_age:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    # Stop the worker processes
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,106 @@
+#######################################################################
+### This class keeps the missing values of a DataFrame as a        ###
+### bit-packed matrix (one bit per cell), from which the patterns  ###
+### of missing values and the co-missingness of columns are        ###
+### counted with popcounts                                         ###
+#######################################################################
+
+import numpy as np
+import pandas as pd
+
+
+class MissingPatternMatrix:
+
+    def __init__(self, columns, bits, n_rows):
+        self.columns = list(columns)
+        # Bit r % 64 of word r // 64 of a column is set if the value of row r is missing
+        self.bits = bits
+        self.n_rows = n_rows
+        # Positions of the columns with at least one missing value (the only columns patterns can differ in)
+        self.null_columns = np.flatnonzero(np.bitwise_count(bits).sum(axis=1))
+
+    # Pack a boolean array into 64-bit words
+    @staticmethod
+    def pack(mask, n_words):
+        packed = np.zeros(n_words * 8, dtype=np.uint8)
+        packed[:(len(mask) + 7) // 8] = np.packbits(mask, bitorder='little')
+        return packed.view(np.uint64)
+
+    # Build the matrix by scanning a DataFrame one column at a time
+    @classmethod
+    def from_frame(cls, df):
+        n_words = (len(df) + 63) // 64
+        bits = np.zeros((df.shape[1], n_words), dtype=np.uint64)
+        for i, col in enumerate(df.columns):
+            bits[i] = cls.pack(df.iloc[:, i].isna().to_numpy(), n_words)
+        return cls(df.columns, bits, len(df))
+
+    # Build the matrix from a MissingValueIndex, without scanning the DataFrame again
+    @classmethod
+    def from_index(cls, index, n_rows):
+        n_words = (n_rows + 63) // 64
+        bits = np.zeros((len(index.columns), n_words), dtype=np.uint64)
+        mask = np.zeros(n_rows, dtype=bool)
+        for i, col in enumerate(index.columns):
+            positions = index.null_positions[col]
+            if len(positions):
+                mask[positions] = True
+                bits[i] = cls.pack(mask, n_words)
+                mask[positions] = False
+        return cls(index.columns, bits, n_rows)
+
+    # Number of bytes held by the bits
+    @property
+    def nbytes(self):
+        return self.bits.nbytes
+
+    # Number of missing values in every column
+    def column_counts(self):
+        return pd.Series(np.bitwise_count(self.bits).sum(axis=1, dtype=np.int64), index=self.columns)
+
+    # Number of rows in which both columns of every pair of columns with missing values are missing
+    def co_missingness(self):
+        nulls = self.null_columns
+        counts = np.zeros((len(nulls), len(nulls)), dtype=np.int64)
+        for i, col in enumerate(nulls):
+            counts[i] = np.bitwise_count(self.bits[col] & self.bits[nulls]).sum(axis=1)
+        names = [self.columns[col] for col in nulls]
+        return pd.DataFrame(counts, index=names, columns=names)
+
+    # Number of rows missing exactly the given columns (and no other column)
+    def pattern_count(self, columns):
+        missing = set(columns)
+        if not missing <= {self.columns[col] for col in self.null_columns}:
+            return 0
+        # Bits beyond the last row are padding, not rows
+        words = self.pack(np.ones(self.n_rows, dtype=bool), self.bits.shape[1])
+        for col in self.null_columns:
+            words &= self.bits[col] if self.columns[col] in missing else ~self.bits[col]
+        return int(np.bitwise_count(words).sum())
+
+    # Return the most frequent patterns of missing values (as tuples of column names) with their number of rows,
+    # including the pattern without missing values
+    def top_patterns(self, k=10):
+        nulls = self.null_columns
+        # Only the rows with a missing value need a key, the others all share the empty pattern
+        any_null = np.bitwise_or.reduce(self.bits[nulls], axis=0) if len(nulls) else np.zeros(self.bits.shape[1], dtype=np.uint64)
+        rows = np.flatnonzero(np.unpackbits(any_null.view(np.uint8), bitorder='little')[:self.n_rows])
+        words, offsets = rows >> 6, (rows & 63).astype(np.uint64)
+        # Every row is keyed by the bits of the columns with missing values, 64 columns per key word
+        keys = np.zeros((len(rows), (len(nulls) + 63) // 64), dtype=np.uint64)
+        for i, col in enumerate(nulls):
+            keys[:, i // 64] |= ((self.bits[col][words] >> offsets) & np.uint64(1)) << np.uint64(i % 64)
+        if keys.shape[1] == 1:
+            patterns, counts = np.unique(keys[:, 0], return_counts=True)
+            patterns = patterns[:, None]
+        else:
+            patterns, counts = np.unique(keys, axis=0, return_counts=True)
+        # Add the pattern of the complete rows
+        patterns = np.vstack([np.zeros((1, keys.shape[1]), dtype=np.uint64), patterns])
+        counts = np.concatenate([[self.n_rows - len(rows)], counts])
+        top = [i for i in np.argsort(-counts, kind='stable')[:k] if counts[i] > 0]
+        result = []
+        for pattern, count in zip(patterns[top], counts[top]):
+            missing = [self.columns[col] for i, col in enumerate(nulls) if (int(pattern[i // 64]) >> (i % 64)) & 1]
+            result.append((tuple(missing), int(count)))
+        return result
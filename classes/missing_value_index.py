@@ -0,0 +1,70 @@
+#######################################################################
+### This class indexes the missing values of a DataFrame by column ###
+### and by row, and keeps the index up to date when rows are       ###
+### deleted or missing values are imputed, without re-scanning     ###
+### the whole DataFrame                                            ###
+#######################################################################
+
+import numpy as np
+import pandas as pd
+
+
+class MissingValueIndex:
+
+    def __init__(self, columns, null_positions, row_counts):
+        self.columns = list(columns)
+        # Row positions of the missing values of every column
+        self.null_positions = null_positions
+        # Number of missing values in every row
+        self.row_counts = row_counts
+
+    # Build the index by scanning a DataFrame once
+    @classmethod
+    def from_frame(cls, df):
+        null_mask = df.isnull().to_numpy()
+        null_positions = {col: np.flatnonzero(null_mask[:, i]) for i, col in enumerate(df.columns)}
+        row_counts = null_mask.sum(axis=1, dtype=np.int32)
+        return cls(df.columns, null_positions, row_counts)
+
+    # Number of missing values in every column
+    def column_counts(self):
+        return pd.Series({col: len(self.null_positions[col]) for col in self.columns}, index=self.columns, dtype=np.int64)
+
+    # Total number of missing values
+    def total(self):
+        return int(sum(len(positions) for positions in self.null_positions.values()))
+
+    # Boolean mask of the rows with at least one missing value
+    def any_null_mask(self):
+        return self.row_counts > 0
+
+    # Table of the number of missing values per column, as displayed on the GUI
+    def summary(self):
+        return pd.DataFrame(self.column_counts()).T
+
+    # Return the index after keeping only the rows of the given boolean mask
+    def drop_rows(self, keep_mask):
+        # New position of every kept row
+        new_positions = np.cumsum(keep_mask) - 1
+        null_positions = {}
+        for col, positions in self.null_positions.items():
+            kept = positions[keep_mask[positions]]
+            null_positions[col] = new_positions[kept]
+        return MissingValueIndex(self.columns, null_positions, self.row_counts[keep_mask])
+
+    # Return the index after missing values were (partially) filled in, e.g. by imputation
+    # Only the cells that were missing before are checked, as filling in values cannot create new missing values
+    def fill(self, df):
+        null_positions = dict(self.null_positions)
+        row_counts = self.row_counts
+        for col, positions in self.null_positions.items():
+            if len(positions) == 0:
+                continue
+            still_null = df[col].iloc[positions].isnull().to_numpy()
+            if still_null.all():
+                continue
+            if row_counts is self.row_counts:
+                row_counts = row_counts.copy()
+            row_counts[positions[~still_null]] -= 1
+            null_positions[col] = positions[still_null]
+        return MissingValueIndex(self.columns, null_positions, row_counts)
@@ -0,0 +1,54 @@
+#######################################################################
+### This class keeps the anomaly scores of a fitted outlier model  ###
+### for one version of a dataset, so that a different             ###
+### contamination only re-thresholds the scores without retraining ###
+#######################################################################
+
+import numpy as np
+import pandas as pd
+
+# Contamination used when the requested one is out of range
+DEFAULT_CONTAMINATION = 0.2
+
+
+class OutlierScores:
+
+    def __init__(self, scores, model=None):
+        # Score of every row (lower scores are more anomalous), as returned by IsolationForest.score_samples
+        self.scores = np.asarray(scores, dtype=np.float64)
+        self.sorted_scores = np.sort(self.scores)
+        # The fitted model, kept for scoring further rows
+        self.model = model
+
+    # Return the score below which rows are outliers, i.e. the contamination-th percentile of the scores
+    # (the same linear interpolation as np.percentile, which IsolationForest uses for its offset)
+    def threshold(self, contamination):
+        position = contamination * (len(self.sorted_scores) - 1)
+        lower = int(np.floor(position))
+        upper = min(lower + 1, len(self.sorted_scores) - 1)
+        return self.sorted_scores[lower] + (self.sorted_scores[upper] - self.sorted_scores[lower]) * (position - lower)
+
+    # Number of outliers for a contamination, without touching the unsorted scores
+    def count(self, contamination):
+        if len(self.sorted_scores) == 0:
+            return 0
+        return int(np.searchsorted(self.sorted_scores, self.threshold(contamination), side='left'))
+
+    # Boolean mask of the outliers for a contamination
+    def flag(self, contamination):
+        if len(self.scores) == 0:
+            return np.zeros(0, dtype=bool)
+        return self.scores < self.threshold(contamination)
+
+    # Return a copy of the data with the outliers of a contamination flagged in its 'outlier' column, and their number
+    # (the same for every detector, as all of them score rows alike)
+    def flag_frame(self, data, contamination=DEFAULT_CONTAMINATION, intent=[]):
+        # Ensure valid contamination value
+        if contamination <= 0.0 or contamination > 0.5:
+            contamination = DEFAULT_CONTAMINATION
+        # Convert LuxDataFrame to Pandas DataFrame if necessary
+        data_original = pd.DataFrame(data).copy()
+        data_original['outlier'] = self.flag(contamination)
+        # Preserve intent if applicable
+        data_original.intent = intent
+        return data_original, self.count(contamination)
@@ -0,0 +1,124 @@
+#######################################################################
+### This class computes the Lux recommendations of a DataFrame     ###
+### once, so that several charts (e.g. the k-th recommendation, a  ###
+### chart enhanced by an attribute, or a fallback chart) can be    ###
+### selected from them without recommending again                  ###
+#######################################################################
+
+import pandas as pd
+from lux.vis.Vis import Vis as LuxVis
+from classes.job_runner import report_progress
+
+
+class RecommendationSession:
+
+    def __init__(self, df):
+        if 'id' in df.columns:
+            df = df.drop('id', axis=1)
+        self.df = self.infer_column_types(df)
+        # Recommendations for the intent of the DataFrame, and for no intent (which fallback charts are picked from)
+        self.intended = None
+        self.unintended = None
+
+    @staticmethod
+    def infer_column_types(df):
+        # Check if column is datetime column
+        for col in df.columns:
+            try:
+                parsed_col = pd.to_datetime(col, errors='coerce')
+                timestamp_ratio = parsed_col.notna().mean()  # Proportion of successfully converted values
+                if timestamp_ratio > 0.9:  # If most values convert successfully, treat it as a timestamp
+                    # Convert timestamp column to integer
+                    df[col] = parsed_col
+            except Exception:
+                continue
+        return df
+
+    # Lux recommendations of the DataFrame for its intent, grouped by action (e.g. Enhance, Correlation)
+    @property
+    def recommendations(self):
+        if self.intended is None:
+            report_progress(0.1, 'Generating recommendations')
+            self.intended = dict(self.df.recommendation)
+            if not self.df.intent:
+                self.unintended = self.intended
+        return self.intended
+
+    # Lux recommendations of the DataFrame without an intent, computed only when a fallback chart is required
+    # (the metadata of the DataFrame is re-used, only the recommendations are computed again)
+    @property
+    def fallback_recommendations(self):
+        if self.unintended is None:
+            self.recommendations
+        if self.unintended is None:
+            report_progress(0.7, 'Generating alternative recommendations')
+            intent = self.df.intent
+            self.df.clear_intent()
+            try:
+                self.unintended = dict(self.df.recommendation)
+            finally:
+                self.df.intent = intent
+        return self.unintended
+
+    # Pick the group of recommendations to select charts from: Enhance or Correlation if available,
+    # otherwise the group at the given position (or the first group)
+    @staticmethod
+    def group(recommendations, rec_group=0):
+        rec_options = [key for key in recommendations]
+        if not rec_options:
+            return None, []
+        if 'Enhance' in rec_options:
+            rec_type = 'Enhance'
+        elif 'Correlation' in rec_options:
+            rec_type = 'Correlation'
+        elif len(rec_options) > rec_group:
+            rec_type = rec_options[rec_group]
+        else:
+            rec_type = rec_options[0]
+        return rec_type, recommendations[rec_type]
+
+    # Select the chart enhanced by the given attribute, or else the num_rec-th chart (the first if there are fewer)
+    @staticmethod
+    def select(rec_type, charts, num_rec=0, enhance=None):
+        if not charts:
+            return None
+        if rec_type == 'Enhance' and enhance is not None:
+            for chart in charts:
+                color_column = chart.get_attr_by_channel('color')
+                if len(color_column) > 0 and color_column[0].attribute == enhance:
+                    return chart
+            return None
+        if len(charts) > num_rec:
+            return charts[num_rec]
+        return charts[0]
+
+    # Select a recommended chart for the intent of the DataFrame, returning the group it was picked from
+    def chart(self, rec_group=0, num_rec=0, enhance=None):
+        rec_type, charts = self.group(self.recommendations, rec_group)
+        return rec_type, charts, self.select(rec_type, charts, num_rec, enhance)
+
+    # Attributes on the axes of a chart
+    @staticmethod
+    def axis_attributes(chart):
+        attributes = []
+        for channel in ('x', 'y'):
+            for clause in chart.get_attr_by_channel(channel):
+                if clause.attribute != 'Record' and clause.attribute not in attributes:
+                    attributes.append(clause.attribute)
+        return attributes
+
+    # Build the chart of the given attributes coloured by another attribute directly, without recommending
+    def enhanced_chart(self, attributes, enhance):
+        return LuxVis(list(attributes) + [enhance], self.df)
+
+    # Select a chart to show when the chosen one cannot be displayed: the num_rec-th chart recommended without
+    # an intent, coloured by the attribute to enhance (if any)
+    def fallback_chart(self, num_rec=1, enhance=None):
+        rec_type, charts = self.group(self.fallback_recommendations)
+        chart = self.select(rec_type, charts, num_rec)
+        if chart is None or enhance is None:
+            return chart
+        attributes = self.axis_attributes(chart)
+        if not attributes or enhance in attributes or enhance not in self.df.columns:
+            return chart
+        return self.enhanced_chart(attributes, enhance)
@@ -0,0 +1,224 @@
+#######################################################################
+### This class renders visualisations in a pool of warm worker     ###
+### processes, which have Lux, Matplotlib and Plotly imported and  ###
+### keep recently used DataFrames in memory, so that the renders   ###
+### of all sessions run in parallel across cores                   ###
+###                                                                ###
+### DataFrames are passed to the workers by reference: they are    ###
+### stored once per version in an on-disk cache of Arrow files,     ###
+### which the workers memory-map, and only their key is sent       ###
+#######################################################################
+
+import os
+import time
+import queue
+import pickle
+import tempfile
+import threading
+import multiprocessing
+from collections import OrderedDict
+import pandas as pd
+from classes.dataset_cache import DatasetCache
+from classes.vis import build_vis
+
+# Default number of worker processes, which can be overridden with the VDW_RENDER_WORKERS environment variable
+# (0 renders every visualisation inline in the calling thread)
+DEFAULT_WORKERS = int(os.environ.get('VDW_RENDER_WORKERS', min(4, os.cpu_count() or 1)))
+# Default number of renders waiting for a free worker, which can be overridden with the VDW_RENDER_QUEUE environment variable
+DEFAULT_QUEUE = int(os.environ.get('VDW_RENDER_QUEUE', 16))
+# Default number of seconds a render may take (including waiting for a worker),
+# which can be overridden with the VDW_RENDER_TIMEOUT environment variable
+DEFAULT_TIMEOUT = float(os.environ.get('VDW_RENDER_TIMEOUT', 120))
+# Default location of the DataFrames shared with the workers, which can be overridden with the VDW_FRAME_DIR environment variable
+DEFAULT_FRAME_DIR = os.environ.get('VDW_FRAME_DIR', os.path.join(tempfile.gettempdir(), 'visual_data_wizard', 'frames'))
+# Number of DataFrames every worker keeps in memory
+WORKER_FRAMES = 4
+
+
+class RenderQueueFull(Exception):
+    pass
+
+
+class RenderTimeout(TimeoutError):
+    pass
+
+
+# Import the plotting libraries and render a small visualisation in a freshly started worker,
+# so that the first real render pays for neither
+def _warm_up():
+    import matplotlib
+    matplotlib.use('Agg')
+    import plotly.express
+    df = pd.DataFrame({'a': range(50), 'b': [i % 7 for i in range(50)], 'c': ['x', 'y'] * 25})
+    try:
+        build_vis(0, df)
+        build_vis(0, df, machine_view=True)
+    except Exception as e:
+        print('EXCEPTION: ', e)
+
+
+# Return a DataFrame sent to a worker: either the DataFrame itself, or its key in the frame store
+# (None if it is no longer stored); every render gets its own copy, as rendering may change the DataFrame
+def _load_frame(frame, frame_store, frames):
+    if not isinstance(frame, str):
+        return frame
+    df = frames.get(frame)
+    if df is None:
+        df = frame_store.get(frame)
+        if df is None:
+            return None
+        frames[frame] = df
+        if len(frames) > WORKER_FRAMES:
+            frames.popitem(last=False)
+    frames.move_to_end(frame)
+    return df.copy()
+
+
+# Main loop of a worker process: render the visualisations received through the connection until it is closed
+def _serve(conn, frame_dir):
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    _warm_up()
+    frame_store = DatasetCache(frame_dir)
+    # Recently used DataFrames, which keep the Lux metadata computed for them
+    frames = OrderedDict()
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        frame, intent, id, kwargs = task
+        try:
+            df = _load_frame(frame, frame_store, frames)
+            if df is None:
+                result = ('missing', None)
+            else:
+                if intent:
+                    df.intent = intent
+                result = ('done', build_vis(id, df, **kwargs))
+        except Exception as e:
+            result = ('error', e)
+        try:
+            conn.send(result)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            # Exceptions that cannot be sent back are reported by their description
+            conn.send(('error', RuntimeError(repr(result[1]) if result[0] == 'error' else repr(e))))
+
+
+# A worker process and the connection that its tasks are sent through
+class _RenderWorker:
+
+    def __init__(self, context, frame_dir):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child_conn, frame_dir), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def stop(self, kill=False):
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+        self.process.join(timeout=5)
+        self.conn.close()
+
+
+class RenderPool:
+
+    def __init__(self, max_workers=DEFAULT_WORKERS, max_queue=DEFAULT_QUEUE, timeout=DEFAULT_TIMEOUT, frame_dir=DEFAULT_FRAME_DIR, max_frame_bytes=1024**3):
+        self.max_workers = max_workers
+        # Renders beyond the busy workers and this many waiting ones are rejected rather than queued
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.frame_dir = frame_dir
+        self.frame_store = DatasetCache(frame_dir, max_bytes=max_frame_bytes)
+        # Spawned workers do not inherit the locks held by other threads of the web server
+        self.context = multiprocessing.get_context('spawn')
+        # Workers waiting for a task, and the number of renders that are running or waiting
+        self.idle = queue.Queue()
+        self.workers = []
+        self.slots = threading.BoundedSemaphore(max_workers + max_queue) if max_workers > 0 else None
+        self.lock = threading.Lock()
+
+    # Start (and warm up) the worker processes, which otherwise happens on first use
+    def start(self):
+        with self.lock:
+            while len(self.workers) < self.max_workers:
+                worker = _RenderWorker(self.context, self.frame_dir)
+                self.workers.append(worker)
+                self.idle.put(worker)
+
+    # Replace a worker that timed out or died by a fresh one
+    def replace(self, worker):
+        worker.stop(kill=True)
+        with self.lock:
+            if worker in self.workers:
+                self.workers.remove(worker)
+            fresh = _RenderWorker(self.context, self.frame_dir)
+            self.workers.append(fresh)
+        self.idle.put(fresh)
+
+    # Store the given version of a DataFrame for the workers once, returning its key (or the DataFrame itself if it
+    # has no version or cannot be stored, in which case it is sent along with the task)
+    def publish(self, df, version=None):
+        if version is None:
+            return df
+        if os.path.exists(self.frame_store.path(version)) or self.frame_store.put(version, df):
+            return version
+        return df
+
+    # Send a task to the next free worker and wait for its result, within the given deadline
+    def execute(self, task, deadline):
+        try:
+            worker = self.idle.get(timeout=max(deadline - time.monotonic(), 0))
+        except queue.Empty:
+            raise RenderTimeout('No rendering worker became free in time')
+        try:
+            worker.conn.send(task)
+            finished = worker.conn.poll(max(deadline - time.monotonic(), 0))
+            if finished:
+                state, result = worker.conn.recv()
+        except (EOFError, OSError):
+            # The worker died (e.g. after running out of memory)
+            self.replace(worker)
+            raise RuntimeError('The rendering worker exited unexpectedly')
+        if not finished:
+            # The render is stopped by replacing its worker
+            self.replace(worker)
+            raise RenderTimeout('The visualisation was not rendered in time')
+        self.idle.put(worker)
+        if state == 'error':
+            raise result
+        return state, result
+
+    # Render the Vis of a DataFrame (with the keyword arguments of Vis) in a worker process and return it,
+    # passing the key of the version of the DataFrame (see VersionedDataset) if it has one
+    def render(self, id, df, timeout=None, version=None, **kwargs):
+        if self.max_workers == 0:
+            return build_vis(id, df, **kwargs)
+        if not self.slots.acquire(blocking=False):
+            raise RenderQueueFull('Too many visualisations are waiting to be rendered')
+        try:
+            if len(self.workers) < self.max_workers:
+                self.start()
+            deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+            intent = list(getattr(df, 'intent', None) or [])
+            state, vis = self.execute((self.publish(df, version), intent, id, kwargs), deadline)
+            if state == 'missing':
+                # The stored DataFrame was evicted in the meantime, so it is sent along with the task
+                state, vis = self.execute((df, intent, id, kwargs), deadline)
+            return vis
+        finally:
+            self.slots.release()
+
+    # Stop the worker processes
+    def shutdown(self):
+        with self.lock:
+            workers, self.workers = self.workers, []
+        for worker in workers:
+            worker.stop()
+        self.idle = queue.Queue()
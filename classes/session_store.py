@@ -0,0 +1,233 @@
+#######################################################################
+### This class keeps the state of each user session separate, so   ###
+### that one process can serve many concurrent users                ###
+#######################################################################
+
+import copy
+import threading
+import weakref
+from collections import OrderedDict
+import pandas as pd
+from classes.versioned_dataset import VersionedDataset
+from classes.missing_value_index import MissingValueIndex
+from classes.missing_pattern_matrix import MissingPatternMatrix
+from classes.duplicate_index import DuplicateIndex
+from classes.cleaning_plan import CleaningPlan
+
+# Identifier of the session used when a callback is called without a session ID (e.g. in tests)
+DEFAULT_SESSION_ID = 'default'
+# Attributes that SessionState.restore() keeps: the background jobs of a session and its measured footprint
+UNRESTORED_ATTRIBUTES = ('job_slot', 'pending_call', 'footprint', 'measured_df')
+
+
+class SessionState:
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        # Variables to keep track of progress
+        self.stage = 'data-loading'
+        self.step = 0
+        self.action_log = []
+        self.download_completion = [0, 0]
+        # Default colours and display values
+        self.load_colour, self.miss_colour, self.dup_colour, self.out_colour, self.down_colour = 'red', 'red', 'red', 'red', 'red'
+        self.missing_style, self.dup_style, self.out_style, self.info_style, self.download_style, self.down_info_style, self.completion_style = {'display': 'none'}, {'display': 'none'}, {'display': 'none'}, {'display': 'none'}, {'display': 'none'}, {'display': 'none'}, {'display': 'none'}
+
+        # The current state of the data, and its history of versions over the uploaded DataFrame
+        self.current_df = None
+        self.dataset = None
+        # Indices derived from current_df (e.g. of its missing values), each with the DataFrame it describes,
+        # and the indices of the checkpoint
+        self.indexes = {}
+        self.checkpoint_indexes = {}
+
+        # The name of the file currently being used
+        self.file_name = None
+
+        # Vis objects, including the indices corresponding to the figures they are displayed in
+        self.vis_objects = []
+
+        # Components of the various sections of the pipeline
+        self.dups_count = 0
+        self.missing_count = 0
+        self.outlier_count = 0
+        self.outlier_contamination_history = []
+        # Name of the outlier detector of the current outlier handling stage (picked by the size of the data)
+        self.outlier_detector = None
+        # Whether exact duplicates or near-duplicates are detected, and the similarity threshold of the latter
+        self.duplicate_mode = 'exact'
+        self.near_duplicate_threshold = 0.8
+
+        # Slot of the most recent background job, whose progress is shown on the GUI
+        self.job_slot = None
+        # Call of a callback waiting for its background job, which is called again once the job finished
+        self.pending_call = None
+
+        # Declarative plan of the cleaning actions taken, which can be downloaded and replayed on the full data
+        self.plan = CleaningPlan()
+
+        # Estimated memory footprint in bytes, refreshed by the SessionStore whenever the current data changed,
+        # and a weak reference to the DataFrame it was measured for
+        self.footprint = 0
+        self.measured_df = None
+
+    # Start a new history of versions from the given (uploaded) DataFrame, identified by the given content key
+    def load(self, df, key=None):
+        self.dataset = VersionedDataset(df, key)
+        self.current_df = self.dataset.current
+        return self.current_df
+
+    # Record a new state of the data, storing only its differences to the previous state
+    # Indices of the new state can be passed by name if they were updated incrementally
+    def commit(self, df, **indexes):
+        if self.dataset is None or self.dataset.current is not self.current_df:
+            # The current data was replaced directly (e.g. in tests), so start a new history from it
+            self.load(self.current_df if self.current_df is not None else df)
+        self.current_df = self.dataset.commit(df)
+        for name, index in indexes.items():
+            self.indexes[name] = (index, self.current_df)
+        return self.current_df
+
+    # Return the key of the current version of the data, or None if the current data is not part of the history
+    def data_version(self):
+        if self.dataset is None or self.dataset.current is not self.current_df:
+            return None
+        return self.dataset.version.key
+
+    # Return an index of the current data, building it only if it is out of date
+    def get_index(self, name, build):
+        index, df = self.indexes.get(name, (None, None))
+        if index is None or df is not self.current_df:
+            index = build(self.current_df)
+            self.indexes[name] = (index, self.current_df)
+            # An index built for the checkpoint's data can also be restored by undo
+            if self.dataset is not None and self.dataset.current is self.current_df and self.dataset.pointer == self.dataset.checkpoint_pointer:
+                self.checkpoint_indexes[name] = index
+        return index
+
+    def get_missing_index(self):
+        return self.get_index('missing', MissingValueIndex.from_frame)
+
+    # The bit-packed patterns of missing values are derived from the index of missing values, without a scan of the data
+    def get_missing_patterns(self):
+        return self.get_index('missing_patterns', lambda df: MissingPatternMatrix.from_index(self.get_missing_index(), len(df)))
+
+    def get_duplicate_index(self):
+        return self.get_index('duplicates', DuplicateIndex.from_frame)
+
+    # Remember the current state of the data as the state to return to when undoing
+    def checkpoint(self):
+        if self.current_df is None:
+            return
+        if self.dataset is None or self.dataset.current is not self.current_df:
+            self.load(self.current_df)
+        self.dataset.checkpoint()
+        self.plan.checkpoint()
+        self.checkpoint_indexes = {name: index for name, (index, df) in self.indexes.items() if df is self.current_df}
+
+    # Revert the data back to the last checkpoint
+    def undo(self):
+        if self.dataset is not None:
+            self.current_df = self.dataset.undo()
+            self.plan.undo()
+            # Indices are never modified in place, so the indices of the checkpoint are still valid
+            self.indexes = {name: (index, self.current_df) for name, index in self.checkpoint_indexes.items()}
+        return self.current_df
+
+    # Return a copy of the state of this session, from which restore() reverts the changes made since (DataFrames
+    # and indices are never modified in place, so they are shared rather than copied)
+    def snapshot(self):
+        state = {name: copy.copy(value) if isinstance(value, (list, dict)) else value for name, value in self.__dict__.items() if name not in UNRESTORED_ATTRIBUTES}
+        if self.dataset is not None:
+            state['dataset'] = copy.copy(self.dataset)
+            state['dataset'].versions = list(self.dataset.versions)
+        state['plan'] = copy.copy(self.plan)
+        state['plan'].steps = list(self.plan.steps)
+        return state
+
+    def restore(self, state):
+        self.__dict__.update(state)
+
+    # Return the memory footprint, measuring it again only if the current data changed since it was last measured
+    # (i.e. once per load, commit or undo rather than on every request)
+    def refresh_footprint(self):
+        measured = self.measured_df() if self.measured_df is not None else None
+        if measured is not self.current_df or measured is None:
+            self.footprint = self.memory_footprint()
+            self.measured_df = weakref.ref(self.current_df) if isinstance(self.current_df, pd.DataFrame) else None
+        return self.footprint
+
+    # Estimate the number of bytes held by the DataFrames of this session
+    def memory_footprint(self):
+        if self.dataset is None:
+            if isinstance(self.current_df, pd.DataFrame):
+                return int(self.current_df.memory_usage(index=True, deep=True).sum())
+            return 0
+        total = self.dataset.memory_usage()
+        # Unless it is the unchanged base, the current state is a separate materialised DataFrame
+        if self.dataset.pointer != 0 and isinstance(self.current_df, pd.DataFrame):
+            total += int(self.current_df.memory_usage(index=True, deep=True).sum())
+        return total
+
+
+class SessionStore:
+
+    def __init__(self, max_sessions=32, session_budget=512 * 1024**2):
+        # Maximum number of sessions kept in memory at the same time
+        self.max_sessions = max_sessions
+        # Memory budget (in bytes) granted to every session
+        self.session_budget = session_budget
+        # Sessions ordered from least to most recently used
+        self.sessions = OrderedDict()
+        # The default session is used when no session ID is available and is never evicted
+        self.default_session = SessionState(DEFAULT_SESSION_ID)
+        self.lock = threading.Lock()
+
+    # Return the state of the given session, creating it if required
+    def get(self, session_id):
+        if session_id is None or session_id == DEFAULT_SESSION_ID:
+            return self.default_session
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                session = SessionState(session_id)
+                self.sessions[session_id] = session
+            else:
+                # Mark the session as most recently used
+                self.sessions.move_to_end(session_id)
+            self.evict(keep=session_id)
+            return session
+
+    # Return the state of an existing session without creating it or changing its recency
+    def peek(self, session_id):
+        if session_id is None or session_id == DEFAULT_SESSION_ID:
+            return self.default_session
+        return self.sessions.get(session_id)
+
+    # Remove a session and release its data
+    def discard(self, session_id):
+        with self.lock:
+            self.sessions.pop(session_id, None)
+
+    # Total number of bytes currently held by all stored sessions
+    def total_footprint(self):
+        return sum(session.footprint for session in self.sessions.values())
+
+    # Evict the sessions exceeding their own memory budget (other than the session being served), then the least
+    # recently used sessions until both the session count and the overall memory budget are respected
+    def evict(self, keep=None):
+        # Refresh the footprints left behind by the sessions' previous requests (only changed data is measured again)
+        for session in self.sessions.values():
+            session.refresh_footprint()
+        for sid in [sid for sid, session in self.sessions.items() if sid != keep and session.footprint > self.session_budget]:
+            del self.sessions[sid]
+        total_budget = self.max_sessions * self.session_budget
+        while len(self.sessions) > 1 and (len(self.sessions) > self.max_sessions or self.total_footprint() > total_budget):
+            candidates = [sid for sid in self.sessions if sid != keep]
+            del self.sessions[candidates[0]]
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def __contains__(self, session_id):
+        return session_id in self.sessions
@@ -0,0 +1,136 @@
+#######################################################################
+### This class parses (uploaded) CSV content in chunks, decoding   ###
+### base64 uploads incrementally, so that large files are never    ###
+### held in memory in several representations at the same time    ###
+#######################################################################
+
+import io
+import os
+import base64
+import pandas as pd
+
+# Default number of rows parsed per chunk, which can be overridden with the VDW_CHUNK_ROWS environment variable
+DEFAULT_CHUNK_ROWS = int(os.environ.get('VDW_CHUNK_ROWS', 100000))
+
+# Number of leading rows from which the column types are inferred
+DEFAULT_SAMPLE_ROWS = 10000
+
+# Size (in bytes) of the blocks in which raw content is read
+BLOCK_SIZE = 1024**2
+
+
+class Base64Stream(io.RawIOBase):
+
+    def __init__(self, text, start=0, block_size=BLOCK_SIZE):
+        # Base64 encoded text (e.g. the contents of a Dash upload) and the position its payload starts at
+        self.text = text
+        self.position = start
+        # Number of characters decoded at once (a multiple of 4, so that every block decodes on its own)
+        self.block_chars = block_size // 3 * 4
+        # Decoded bytes that have not been read yet
+        self.pending = bytearray()
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = len(buffer)
+        while len(self.pending) < size and self.position < len(self.text):
+            end = min(self.position + self.block_chars, len(self.text))
+            self.pending += base64.b64decode(self.text[self.position:end])
+            self.position = end
+        size = min(size, len(self.pending))
+        buffer[:size] = self.pending[:size]
+        del self.pending[:size]
+        return size
+
+
+class StreamingCsvReader:
+
+    def __init__(self, open_stream, chunk_rows=DEFAULT_CHUNK_ROWS, sample_rows=DEFAULT_SAMPLE_ROWS, max_rows=None):
+        # Function returning a new binary stream of the content, so that the content can be read more than once
+        self.open_stream = open_stream
+        self.chunk_rows = chunk_rows
+        self.sample_rows = sample_rows
+        # Maximum number of rows to parse (e.g. to preview the first rows of a large file), or None for all rows
+        self.max_rows = max_rows
+
+    # Create a reader for base64 encoded upload contents of the form 'data:<type>;base64,<payload>'
+    @classmethod
+    def from_upload(cls, contents, **kwargs):
+        # Locate the payload instead of splitting, which would copy the whole string
+        start = contents.index(',') + 1
+        return cls(lambda: io.BufferedReader(Base64Stream(contents, start), BLOCK_SIZE), **kwargs)
+
+    # Create a reader for a file on disk
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        return cls(lambda: open(path, 'rb'), **kwargs)
+
+    # Make a column name consistent and free of special characters (as every loaded dataset's columns are named)
+    @staticmethod
+    def normalise_column_name(name):
+        # Convert the name to lowercase and replace spaces with underscores
+        name = name.lower().replace(' ', '_').replace('-', '_')
+        # Remove all special characters
+        return name.replace(':', '').replace('$', '').replace('(', '').replace(')', '')
+
+    # Yield the raw content block by block (e.g. to hash it without holding it in memory)
+    def blocks(self):
+        with self.open_stream() as stream:
+            while True:
+                block = stream.read(BLOCK_SIZE)
+                if not block:
+                    break
+                yield block
+
+    # Infer the column types from the leading rows of the content
+    def infer_dtypes(self):
+        nrows = self.sample_rows if self.max_rows is None else min(self.sample_rows, self.max_rows)
+        with self.open_stream() as stream:
+            sample = pd.read_csv(stream, nrows=nrows)
+        # Only fix types that later rows cannot widen: integer and boolean columns may still turn
+        # into floats or objects once missing values occur, so they are inferred per chunk
+        dtypes = {}
+        for col, dtype in sample.dtypes.items():
+            if dtype == object or pd.api.types.is_float_dtype(dtype):
+                dtypes[col] = dtype
+        return dtypes
+
+    # Parse the content chunk by chunk using the given column types
+    def read_chunks(self, dtypes):
+        # Split every chunk into copies of its columns as soon as it is parsed, and join each column on its own
+        # at the end, so that no more than the final frame and one column's pieces are held at the same time
+        # (concatenating whole chunks would hold all of them next to the final frame)
+        pieces = {}
+        with self.open_stream() as stream:
+            reader = pd.read_csv(stream, chunksize=self.chunk_rows, nrows=self.max_rows, dtype=dtypes)
+            for chunk in reader:
+                for col in chunk.columns:
+                    pieces.setdefault(col, []).append(chunk[col].reset_index(drop=True).copy())
+                del chunk
+        if not pieces:
+            with self.open_stream() as stream:
+                return pd.read_csv(stream, nrows=0)
+        columns = {}
+        for col in list(pieces):
+            col_pieces = pieces.pop(col)
+            columns[col] = col_pieces[0] if len(col_pieces) == 1 else pd.concat(col_pieces, ignore_index=True, copy=False)
+            del col_pieces
+        return pd.DataFrame(columns, copy=False)
+
+    # Parse the content into a DataFrame
+    def read(self):
+        try:
+            dtypes = self.infer_dtypes()
+        except pd.errors.EmptyDataError:
+            return pd.DataFrame()
+        try:
+            return self.read_chunks(dtypes)
+        except (ValueError, TypeError) as e:
+            # A later row does not fit the type inferred from the sample (e.g. text in a numeric column), so infer
+            # the types from the whole content at once: chunks parsed without types could disagree on a column's
+            # type, which would turn it into an object column
+            print('EXCEPTION: ', e)
+            with self.open_stream() as stream:
+                return pd.read_csv(stream, nrows=self.max_rows, low_memory=False)
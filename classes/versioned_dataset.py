@@ -0,0 +1,206 @@
+#######################################################################
+### This class keeps the history of a dataset during the cleaning  ###
+### process as row masks and column-level deltas over a shared     ###
+### base DataFrame, so that undo does not require full copies      ###
+#######################################################################
+
+import uuid
+import numpy as np
+import pandas as pd
+
+
+# Check whether two equally long Series hold the same values (treating missing values as equal)
+def values_equal(left, right):
+    if left.dtype != right.dtype:
+        return False
+    a, b = left.to_numpy(), right.to_numpy()
+    if a.shape != b.shape:
+        return False
+    # Columns that still share their memory are equal without comparing any values
+    if a.dtype != object and a.__array_interface__['data'] == b.__array_interface__['data'] and a.strides == b.strides:
+        return True
+    same = a == b
+    if isinstance(same, np.ndarray) and same.all():
+        return True
+    return bool(np.all(same | (pd.isna(a) & pd.isna(b))))
+
+
+class Version:
+
+    def __init__(self, row_mask, columns, deltas, parent=None, key=None, base=None):
+        # DataFrame the version is stored over: the uploaded DataFrame, or a full snapshot for versions that
+        # cannot be derived from it (shared by all versions committed on top of the snapshot)
+        self.base = base
+        # Boolean mask over the rows of the base DataFrame, or None if all rows are kept
+        self.row_mask = row_mask
+        # Ordered column names of this version
+        self.columns = columns
+        # Changed or added columns: name -> (Series, row mask the Series is aligned to)
+        # Unchanged deltas are shared with the parent version rather than copied
+        self.deltas = deltas
+        self.parent = parent
+        # Identifier of the data of this version, which is never re-used for different data
+        self.key = key
+
+
+class VersionedDataset:
+
+    # The key identifies the content of the base (e.g. the content key of the uploaded file), so that the unchanged
+    # base of equal uploads shares one key; without a key the base is given a unique one
+    def __init__(self, base, key=None):
+        self.base = base
+        self.base_key = key if key is not None else uuid.uuid4().hex
+        # Base the positions of whose index were last looked up, and these positions
+        self.base_positions = (None, None)
+        # Every base (by its id) with the number of bytes it holds, measured on first use as bases never change
+        self.base_bytes = {}
+        self.versions = [Version(None, list(base.columns), {}, key=self.base_key, base=base)]
+        # Index of the current version in self.versions
+        self.pointer = 0
+        # Index of the version that undo() returns to
+        self.checkpoint_pointer = 0
+        # Materialised DataFrame of the current version
+        self.current = self.materialise(self.versions[0])
+
+    @property
+    def version(self):
+        return self.versions[self.pointer]
+
+    # Number of rows of a version
+    def row_count(self, version):
+        if version.row_mask is None:
+            return len(version.base)
+        return int(np.count_nonzero(version.row_mask))
+
+    # Return the values of a column of a version, aligned to the version's rows
+    def column_values(self, version, col):
+        if col in version.deltas:
+            values, delta_mask = version.deltas[col]
+            if delta_mask is version.row_mask:
+                return values
+            # The delta was recorded for a superset of the version's rows
+            if delta_mask is None:
+                return values.iloc[np.flatnonzero(version.row_mask)]
+            return values.iloc[np.flatnonzero(version.row_mask[delta_mask])]
+        if version.row_mask is None:
+            return version.base[col]
+        return version.base[col].iloc[np.flatnonzero(version.row_mask)]
+
+    # Build the DataFrame of a version
+    def materialise(self, version):
+        base = version.base
+        base_cols = [col for col in version.columns if col not in version.deltas]
+        if version.row_mask is None:
+            # A shallow copy shares the unchanged columns with the base
+            df = base[base_cols].copy(deep=False) if base_cols != list(base.columns) else base.copy(deep=False)
+        else:
+            # Select rows and columns in a single step, copying only the kept cells
+            df = base.iloc[np.flatnonzero(version.row_mask), base.columns.get_indexer(base_cols)]
+        for col in version.deltas:
+            if col in version.columns:
+                df[col] = self.column_values(version, col).array
+        return df[version.columns] if list(df.columns) != version.columns else df
+
+    # Compute the row mask of a DataFrame derived from the given base, or None if it cannot be expressed as one
+    def derive_row_mask(self, df, base):
+        if df.index.equals(base.index):
+            return None, True
+        if self.base_positions[0] is not base:
+            if not base.index.is_unique:
+                return None, False
+            self.base_positions = (base, base.index)
+        positions = self.base_positions[1].get_indexer(df.index)
+        # Rows must be a subset of the base rows in their original order
+        if (positions < 0).any() or not (np.diff(positions) > 0).all():
+            return None, False
+        mask = np.zeros(len(base), dtype=bool)
+        mask[positions] = True
+        return mask, True
+
+    # Record a DataFrame as the new current version and return it
+    def commit(self, df):
+        parent = self.version
+        row_mask, derived = self.derive_row_mask(df, parent.base)
+        if not derived:
+            # The DataFrame is not derived from the parent's base (e.g. re-ordered rows)
+            return self.commit_snapshot(df)
+        if row_mask is not None and parent.row_mask is not None and np.array_equal(row_mask, parent.row_mask):
+            # Share the mask with the parent so that its deltas stay aligned without re-indexing
+            row_mask = parent.row_mask
+        # Position of the new rows within the parent's rows
+        if row_mask is None or row_mask is parent.row_mask:
+            within_parent = None
+        elif parent.row_mask is None:
+            within_parent = np.flatnonzero(row_mask)
+        else:
+            if (row_mask & ~parent.row_mask).any():
+                # Rows were added back, which cannot be expressed relative to the parent
+                return self.commit_snapshot(df)
+            within_parent = np.flatnonzero(row_mask[parent.row_mask])
+
+        deltas = {}
+        for col in df.columns:
+            new_values = df[col]
+            if col in parent.columns:
+                old_values = self.column_values(parent, col)
+                if within_parent is not None:
+                    old_values = old_values.iloc[within_parent]
+                if values_equal(new_values, old_values):
+                    # Unchanged column: keep referring to the base or to the parent's delta
+                    if col in parent.deltas:
+                        deltas[col] = parent.deltas[col]
+                    continue
+            deltas[col] = (new_values.copy(), row_mask)
+
+        return self.append(Version(row_mask, list(df.columns), deltas, parent, base=parent.base), df)
+
+    # Record a DataFrame that cannot be stored over the parent's base as a full snapshot, which becomes the base
+    # of this version and of the versions committed on top of it (earlier versions and the checkpoint are kept)
+    def commit_snapshot(self, df):
+        base = df.copy()
+        return self.append(Version(None, list(base.columns), {}, self.version, base=base), df)
+
+    # Append a new version after the current one and make it current
+    def append(self, version, df):
+        # Discard versions that were undone, then append the new one
+        del self.versions[self.pointer + 1:]
+        # Committed data depends on the actions of a session, so every new version gets a unique key
+        version.key = self.base_key + '-' + uuid.uuid4().hex
+        self.versions.append(version)
+        self.pointer = len(self.versions) - 1
+        self.current = df
+        return df
+
+    # Remember the current version as the state that undo() returns to
+    def checkpoint(self):
+        self.checkpoint_pointer = self.pointer
+
+    # Move back to the last checkpoint and return its DataFrame
+    def undo(self):
+        self.pointer = self.checkpoint_pointer
+        self.current = self.materialise(self.version)
+        return self.current
+
+    # Number of bytes held by the bases and all deltas (shared bases and deltas are counted once)
+    def memory_usage(self):
+        total = 0
+        seen = set()
+        base_bytes = {}
+        for version in self.versions:
+            if id(version.base) not in seen:
+                seen.add(id(version.base))
+                base, size = self.base_bytes.get(id(version.base), (None, None))
+                if base is not version.base:
+                    size = int(version.base.memory_usage(index=True, deep=True).sum())
+                base_bytes[id(version.base)] = (version.base, size)
+                total += size
+            if version.row_mask is not None and id(version.row_mask) not in seen:
+                seen.add(id(version.row_mask))
+                total += version.row_mask.nbytes
+            for values, _ in version.deltas.values():
+                if id(values) not in seen:
+                    seen.add(id(values))
+                    total += int(values.memory_usage(index=False, deep=True))
+        # Forget the sizes of bases whose versions were discarded
+        self.base_bytes = base_bytes
+        return total
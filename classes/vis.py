@@ -3,17 +3,23 @@
 ### parallel coordinates plots and Lux recommended plots            ###
 #######################################################################
 
-from plotly.tools import mpl_to_plotly
-from matplotlib.cm import Set1
-from mpl_toolkits.axes_grid1 import make_axes_locatable
-from pandas import NaT
-
-
 from helper_functions import *
+from classes.job_runner import report_progress
+from classes.recommendation_session import RecommendationSession
+from backend_magic.machine_view_sampling import machine_view_sample
+from backend_magic.figure_payload import compact_figure, measure_payload, report_payload
+
+# Colourscale of categorical colours in the recommended plots, making them prominent and easily visible
+# (e.g. non-outliers in green and outliers in red)
+CATEGORICAL_COLOURSCALE = 'RdYlGn_r'
 
 class Vis:
 
-    def __init__(self, id, df, rec_group=0, num_rec=0, machine_view=False, enhance=None, temporary=False):
+    # With fallback set, another recommended chart (coloured by fallback_enhance, by default the attribute to enhance)
+    # is shown if the selected one cannot be displayed, and with alternative set that chart is shown straight away;
+    # recommendations that were already computed for the DataFrame can be passed as a RecommendationSession;
+    # for the machine view, df can be a sample drawn beforehand (with machine_view_sample) from data of the given rows
+    def __init__(self, id, df, rec_group=0, num_rec=0, machine_view=False, enhance=None, temporary=False, fallback=False, fallback_enhance=None, alternative=False, recommendations=None, rows=None):
         self.id = id
         self.columns = None
         self.output_type = None
@@ -22,131 +28,119 @@ class Vis:
         self.machine_view = machine_view
         self.enhance = enhance
         self.missing_value_flag = False
+        self.rec_type = None
+        self.selected_recommendations = None
+        # Whether the fallback chart is shown instead of the selected one
+        self.fallback_used = False
+        # Share of the rows drawn in the machine view
+        self.sampling_ratio = 1.0
+        # Figure as sent to the browser (with typed arrays), its size in bytes and the number of rows of the data
+        self.payload = None
+        self.payload_bytes = None
+        self.rows = len(df) if rows is None else rows
 
         if machine_view:
-            # Display a parallel coordinates plot
-            fig = px.parallel_coordinates(df)
+            # Display a parallel coordinates plot of a bounded sample of the rows
+            if rows is None:
+                sample, self.sampling_ratio = machine_view_sample(df)
+            else:
+                sample, self.sampling_ratio = df, len(df) / max(rows, 1)
+            fig = px.parallel_coordinates(sample)
             # Specify layout size
             fig.update_layout(
                 autosize=True,
                 height=400,  
-                width=600  
+                width=600,
+                meta={'sampling_ratio': self.sampling_ratio, 'rows': self.rows, 'sampled_rows': len(sample)}
             )
+            if self.sampling_ratio < 1.0:
+                # Tell the user that only a sample is shown
+                fig.add_annotation(
+                    text=f'Showing {len(sample):,} of {self.rows:,} rows ({self.sampling_ratio:.1%}), keeping outliers, duplicates and rows with missing values',
+                    xref='paper', yref='paper', x=0, y=-0.15, showarrow=False, xanchor='left', font={'size': 10}
+                )
             # Set attributes
             self.figure = fig
             self.output_type = 'plotly'
             self.columns = list(df.columns)
+            self.compact()
 
         else:
-            # Generate recommendations and store the resulting dictionary explicitly
-            if 'id' in df.columns:
-                df = df.drop('id', axis=1)
-            df = self.infer_column_types(df)
             try:
-                recommendations = df.recommendation
-                if recommendations:
-                    # Store the recommendation options (e.g., Occurrence, Correlation, Temporal)
-                    rec_options = [key for key in recommendations]
-                    if 'Enhance' in rec_options:
-                        self.rec_type = 'Enhance'
-                    elif 'Correlation' in rec_options:
-                        self.rec_type = 'Correlation'
-                    else:
-                        if len(rec_options) > rec_group:
-                            # Access chosen recommendation group
-                            self.rec_type = rec_options[rec_group]
-                        else:
-                            # Access first recommendation group
-                            self.rec_type = rec_options[0]
-                    self.selected_recommendations = recommendations[self.rec_type]
+                # Generate the recommendations once, and select the chart (e.g. Occurrence, Correlation, Temporal) from them
+                if recommendations is None:
+                    recommendations = RecommendationSession(df)
+                if fallback_enhance is None:
+                    fallback_enhance = self.enhance
+                if alternative:
+                    self.show_fallback(recommendations, fallback_enhance, temporary)
+                    return
+                self.rec_type, self.selected_recommendations, self.lux_vis = recommendations.chart(rec_group, num_rec, self.enhance)
+                if self.selected_recommendations:
+                    # Get the relevant column names
+                    self.columns = extract_vis_columns(self.lux_vis)
+                    if not temporary:
+                        self.render()
+                        if fallback and (self.missing_value_flag or self.output_type == 'img'):
+                            self.show_fallback(recommendations, fallback_enhance, temporary)
+            except IndexError as e:
+                print('IndexError: ', e)
+                self.missing_value_flag = True
 
-                    # Plot figure
-                    if self.selected_recommendations:
-                        # If a specific attribute is chosen for plot enhancement, ensure it is used
-                        if self.rec_type == 'Enhance' and self.enhance is not None:
-                            # Search self.selected_recommendations for the color attribute stored in self.enhance
-                            for rec in self.selected_recommendations:
-                                # Get the color column
-                                color_column = rec.get_attr_by_channel('color')
-                                # Get the column name
-                                if len(color_column) > 0:
-                                    color_attribute = color_column[0].attribute
-                                    if color_attribute == self.enhance:
-                                        self.lux_vis = rec
-                                        break                        
-                        elif len(self.selected_recommendations) > num_rec:
-                            self.lux_vis = self.selected_recommendations[num_rec]
-                        else:
-                            self.lux_vis = self.selected_recommendations[0]
-                        # Get the relevant column names
-                        self.columns = extract_vis_columns(self.lux_vis)
+    # Select the chart shown instead of the recommended one (second recommendation - num_rec=1 - rather than the first
+    # as usual), from the recommendations that were already computed
+    def show_fallback(self, recommendations, enhance, temporary=False):
+        self.missing_value_flag = False
+        self.output_type = None
+        self.figure = None
+        self.payload = None
+        self.payload_bytes = None
+        self.fallback_used = True
+        self.lux_vis = recommendations.fallback_chart(num_rec=1, enhance=enhance)
+        self.columns = extract_vis_columns(self.lux_vis)
+        if not temporary:
+            self.render()
 
-                        if not temporary:                    
-                            # Initialise variables that will be specified in the fig_code 
-                            fig, ax = plt.subplots()
-                            tab20c = plt.get_cmap('tab20c')
-                            # Render the visualisation using Lux
-                            try:
-                                # The below print is very useful for debugging
-                                # print("**********self.lux_vis: ", self.lux_vis, "****************")
-                                fig_code = self.lux_vis.to_matplotlib()
-                            # Catch errors if applicable
-                            except (ValueError, AttributeError) as e:
-                                print('Error in to_matplotlib()')
-                                fig_code = ''
-                                self.missing_value_flag = True
-                            fixed_fig_code = fix_lux_code(fig_code)
-                            # Use easily visible colours
-                            fixed_fig_code = update_colours(fixed_fig_code)
-                            try:
-                                exec(fixed_fig_code)
-                            except ValueError as e:
-                                print(e)
-                                self.missing_value_flag = True
+    # Render the selected Lux visualisation as a Plotly figure
+    def render(self):
+        report_progress(0.6, 'Rendering the visualisation')
+        # Build the Plotly figure directly from the data of the Lux visualisation
+        try:
+            # The below print is very useful for debugging
+            # print("**********self.lux_vis: ", self.lux_vis, "****************")
+            fig = self.lux_vis.to_plotly(colorscale=CATEGORICAL_COLOURSCALE)
+        # Catch errors if applicable
+        except (ValueError, AttributeError, KeyError, TypeError) as e:
+            print('Error in to_plotly(): ', e)
+            fig = None
+            self.missing_value_flag = True
 
-                            # Capture the current Matplotlib figure
-                            fig = plt.gcf()
-                            if fig is None:
-                                pass
-                            plt.draw()
+        if fig is not None:
+            # Specify layout size
+            fig['layout'].update(
+                autosize=True,
+                height=400,
+                width=600
+            )
+            self.figure = fig
+            self.output_type = 'plotly'
+            self.compact()
+        else:
+            # Marks without a Plotly chart (e.g. maps) are not displayed, a warning message is shown instead
+            self.output_type = 'img'
 
-                            # Adjust layout to prevent legend cutoff
-                            plt.tight_layout()
-                            # Manually adjust legend if needed
-                            fig.subplots_adjust(right=0.8)
+    # Encode the large numeric arrays of the figure as typed arrays for the browser, and measure (or, unless the
+    # payloads are reported, estimate) the size of the result
+    def compact(self):
+        self.payload = compact_figure(self.figure)
+        self.payload_bytes = measure_payload(self.payload)
+        report_payload(self.id, self.payload_bytes, self.rows)
 
-                            # Try to convert Matplotlib figure to Plotly
-                            try:
-                                fig = mpl_to_plotly(fig)
-                                # Specify layout size
-                                fig.update_layout(
-                                    autosize=True,
-                                    height=400,  
-                                    width=600  
-                                )
-                                self.figure = fig
-                                self.output_type = 'plotly'
-                            except Exception as e:
-                                # If an error occurs, create a static Matplotlib image instead
-                                # In the current implementation, this is not displayed but instead a warning message is shown
-                                fallback_fig = create_styled_matplotlib_figure(fig)
-                                # Convert Matplotlib figure to base64 image
-                                self.figure = fig_to_base64(fallback_fig)
-                                self.output_type = 'img'   
-            except IndexError as e:
-                print('IndexError: ', e)
-                self.missing_value_flag = True
-            
 
-    def infer_column_types(self, df):
-        # Check if column is datetime column
-        for col in df.columns:
-            try:
-                parsed_col = pd.to_datetime(col, errors='coerce')
-                timestamp_ratio = parsed_col.notna().mean()  # Proportion of successfully converted values
-                if timestamp_ratio > 0.9:  # If most values convert successfully, treat it as a timestamp
-                    # Convert timestamp column to integer
-                    df[col] = parsed_col
-            except Exception:
-                continue
-        return df
+# Function to build a Vis object (e.g. inside a worker process of the job runner),
+# dropping its references to the Lux recommendations and the underlying data before it is returned
+def build_vis(id, df, **kwargs):
+    vis = Vis(id, df, **kwargs)
+    vis.lux_vis = None
+    vis.selected_recommendations = None
+    return vis
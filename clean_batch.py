@@ -0,0 +1,256 @@
+#############################################################################
+### This is the command-line entry point of the Visual Data Wizard for    ###
+### cleaning many CSV files in batch, without the Dash UI                 ###
+###                                                                       ###
+### Files are cleaned in parallel by a pool of worker processes, each     ###
+### with a memory limit, either by the default pipeline (missing values,  ###
+### duplicates, outliers) or by replaying a downloaded cleaning plan.     ###
+### The cleaned files are written to the output directory together with   ###
+### a report of the timing and statistics of every file                   ###
+###                                                                       ###
+### Only the backend is imported (no Dash or plotting libraries), so that ###
+### workers start quickly and stay small                                  ###
+###                                                                       ###
+### Usage: python clean_batch.py <files or directories> -o <output dir>   ###
+###        [--plan plan.json] [--workers N] [--memory-limit MB] ...       ###
+#############################################################################
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import warnings
+import contextlib
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    # Memory limits and peak memory measurements are only available on Unix
+    import resource
+except ImportError:
+    resource = None
+
+from classes.streaming_csv_reader import StreamingCsvReader
+from classes.datetime_detector import DatetimeDetector
+from classes.cleaning_plan import CleaningPlan
+from backend_magic.missing_value_detection import detect_missing_values, impute_missing_values, remove_missing_values
+from backend_magic.duplicate_detection import detect_duplicates
+from backend_magic.outlier_detectors import detect_outliers
+from backend_magic.plan_replay import replay_plan, INDEX_COLUMN
+
+# Default number of worker processes, which can be overridden with the VDW_BATCH_WORKERS environment variable
+DEFAULT_WORKERS = int(os.environ.get('VDW_BATCH_WORKERS', min(4, os.cpu_count() or 1)))
+# Default memory limit of every worker in megabytes (0 for no limit),
+# which can be overridden with the VDW_BATCH_MEMORY_MB environment variable
+DEFAULT_MEMORY_MB = int(os.environ.get('VDW_BATCH_MEMORY_MB', 0))
+# Default contamination of the outlier detection, as for the first detection on the GUI
+DEFAULT_CONTAMINATION = 0.15
+# Workers are replaced after every file where supported (Python 3.11+), so that every file starts from a fresh heap
+RECYCLE_WORKERS = {'max_tasks_per_child': 1} if sys.version_info >= (3, 11) else {}
+# Environment variables keeping every worker to a single thread, as the files are already cleaned in parallel
+SINGLE_THREADED = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'VDW_OUTLIER_JOBS', 'VDW_IMPUTATION_JOBS')
+
+# The outlier detection keeps the intent of the GUI's visualisations as an attribute, which is irrelevant here
+warnings.filterwarnings('ignore', message="Pandas doesn't allow columns to be created via a new attribute name")
+
+#########################
+### Cleaning one file ###
+
+# Measure the duration of a stage of the cleaning of a file
+@contextlib.contextmanager
+def timed(stats, stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats['seconds'][stage] = round(time.perf_counter() - start, 4)
+
+
+# Load a CSV file as the GUI does: normalised column names and parsed datetime columns
+def load_file(path):
+    df = StreamingCsvReader.from_file(path).read()
+    df = df.rename(columns=StreamingCsvReader.normalise_column_name)
+    if INDEX_COLUMN in df.columns:
+        df = df.drop(columns=INDEX_COLUMN)
+    return DatetimeDetector().parse(df)[0]
+
+
+# Clean a DataFrame with the default pipeline, recording the statistics of every stage
+def clean_frame(df, options, stats):
+    with timed(stats, 'missing_values'):
+        _, stats['missing_values'] = detect_missing_values(df)
+        if stats['missing_values'] > 0:
+            if options['missing'] == 'delete':
+                df = remove_missing_values(df)
+            elif options['missing'].startswith('impute-'):
+                df = impute_missing_values(df, options['missing'].split('-')[1])
+    with timed(stats, 'duplicates'):
+        df, stats['duplicates'] = detect_duplicates(df)
+        if options['duplicates'] == 'delete':
+            df = df[df['duplicate'] != True]
+        df = df.drop(columns='duplicate')
+    with timed(stats, 'outliers'):
+        stats['outliers'] = None
+        # The outlier models cannot handle missing numbers, so outliers are only removed from complete data
+        if options['contamination'] > 0 and len(df) > 1 and not df.select_dtypes(include=['number', 'datetime']).isna().any().any():
+            df, stats['outliers'] = detect_outliers(df, contamination=options['contamination'])
+            df = df[df['outlier'] != True].drop(columns='outlier')
+    return df
+
+
+# Clean one file into the given output file and return its statistics (failures are reported, not raised)
+def clean_file(path, output, options):
+    stats = {'file': path, 'output': output, 'status': 'ok', 'seconds': {}}
+    start = time.perf_counter()
+    try:
+        if options.get('plan') is not None:
+            # Replay the plan in chunks, streaming the file instead of loading it at once
+            with timed(stats, 'replay'):
+                report = replay_plan(CleaningPlan.from_dict(options['plan']), StreamingCsvReader.from_file(path), output)
+            stats.update(report)
+        else:
+            with timed(stats, 'load'):
+                df = load_file(path)
+            stats['rows_read'] = len(df)
+            df = clean_frame(df, options, stats)
+            with timed(stats, 'write'):
+                df.to_csv(output, index=False)
+            stats['rows_written'] = len(df)
+    except MemoryError:
+        stats['status'] = 'out of memory'
+    except Exception as e:
+        stats['status'] = 'failed'
+        stats['error'] = repr(e)
+    stats['seconds']['total'] = round(time.perf_counter() - start, 4)
+    if resource is not None:
+        # Peak resident memory of this worker in megabytes (workers are recycled per file where supported)
+        stats['peak_memory_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return stats
+
+
+########################################
+### Cleaning many files in parallel ###
+
+# Name the cleaned file of every input after the input's file name. Inputs of the same name (in different
+# directories) are named after their path relative to the directory shared by all inputs instead,
+# e.g. a/data.csv and b/data.csv become a_data_clean.csv and b_data_clean.csv
+def output_names(paths):
+    names = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+    counts = Counter(names)
+    if len(counts) < len(names):
+        root = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in paths])
+        names = [name if counts[name] == 1 else os.path.splitext(os.path.relpath(os.path.abspath(path), root))[0].replace(os.sep, '_')
+                 for name, path in zip(names, paths)]
+    # Names that still clash (e.g. with a file named like such a path) are numbered
+    seen = Counter()
+    unique = []
+    for name in names:
+        seen[name] += 1
+        unique.append(name if seen[name] == 1 else '%s_%d' % (name, seen[name]))
+    return [name + '_clean.csv' for name in unique]
+
+
+# Limit the address space of a freshly started worker process
+def init_batch_worker(memory_mb):
+    if memory_mb and resource is not None:
+        limit = memory_mb * 1024**2
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+# Clean the files in a pool of worker processes (or inline without workers), returning their statistics in input order
+def run_batch(paths, output_dir, options, workers=DEFAULT_WORKERS, memory_mb=DEFAULT_MEMORY_MB):
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = {path: os.path.join(output_dir, name) for path, name in zip(paths, output_names(paths))}
+    if workers == 0:
+        return [clean_file(path, outputs[path], options) for path in paths]
+    for variable in SINGLE_THREADED:
+        # Spawned workers read these when importing the libraries
+        os.environ.setdefault(variable, '1')
+    results = {}
+    pending = list(paths)
+    retrying = False
+    while pending:
+        executor = ProcessPoolExecutor(max_workers=1 if retrying else workers, mp_context=multiprocessing.get_context('spawn'),
+                                       initializer=init_batch_worker, initargs=(memory_mb,), **RECYCLE_WORKERS)
+        futures = {executor.submit(clean_file, path, outputs[path], options): path for path in pending}
+        broken = []
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                results[path] = future.result()
+                print('%s: %s (%.2f s)' % (path, results[path]['status'], results[path]['seconds']['total']))
+            except BrokenProcessPool:
+                if retrying:
+                    results[path] = {'file': path, 'status': 'crashed', 'seconds': {}}
+                    print('%s: crashed' % path)
+                else:
+                    broken.append(path)
+        executor.shutdown()
+        # A worker killed (e.g. by the operating system for its memory) takes down the files running beside it,
+        # so these are retried one at a time to find the file that caused it
+        pending, retrying = broken, True
+    return [results[path] for path in paths]
+
+
+# Expand the given files and directories into the CSV files to clean (every file is cleaned once,
+# even if it is given several times)
+def find_files(inputs):
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(sorted(glob.glob(os.path.join(item, '*.csv'))))
+        else:
+            paths.append(item)
+    seen = set()
+    unique = []
+    for path in paths:
+        if os.path.abspath(path) not in seen:
+            seen.add(os.path.abspath(path))
+            unique.append(path)
+    return unique
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description='Clean many CSV files in parallel, without the user interface.')
+    parser.add_argument('inputs', nargs='+', help='CSV files, or directories whose CSV files are cleaned')
+    parser.add_argument('-o', '--output-dir', required=True, help='directory the cleaned files and the report are written to')
+    parser.add_argument('--plan', help='cleaning plan (downloaded from the GUI) to replay instead of the default pipeline')
+    parser.add_argument('--missing', default='impute-simple', choices=['impute-simple', 'impute-KNN', 'delete', 'keep'], help='handling of missing values')
+    parser.add_argument('--duplicates', default='delete', choices=['delete', 'keep'], help='handling of duplicated rows')
+    parser.add_argument('--contamination', type=float, default=DEFAULT_CONTAMINATION, help='share of rows removed as outliers (0 keeps all rows)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='number of worker processes (0 cleans the files inline)')
+    parser.add_argument('--memory-limit', type=int, default=DEFAULT_MEMORY_MB, help='memory limit of every worker in megabytes (0 for no limit)')
+    parser.add_argument('--report', help='path of the report (default: report.json in the output directory)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    options = {'missing': args.missing, 'duplicates': args.duplicates, 'contamination': args.contamination, 'plan': None}
+    if args.plan:
+        with open(args.plan) as f:
+            # Check the plan once before handing it to the workers
+            options['plan'] = CleaningPlan.from_json(f.read()).to_dict()
+    start = time.perf_counter()
+    results = run_batch(find_files(args.inputs), args.output_dir, options, args.workers, args.memory_limit)
+    report = {
+        'options': options,
+        'workers': args.workers,
+        'memory_limit_mb': args.memory_limit,
+        'seconds': round(time.perf_counter() - start, 4),
+        'files': results
+    }
+    report_path = args.report or os.path.join(args.output_dir, 'report.json')
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    failed = [result for result in results if result['status'] != 'ok']
+    print('Cleaned %d of %d files in %.2f s, report written to %s' % (len(results) - len(failed), len(results), report['seconds'], report_path))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,7 +6,6 @@
 #################################################################
 
 import pandas as pd
-import matplotlib.pyplot as plt
 import sys
 import os
 import re
@@ -22,118 +21,74 @@ from dash import dcc, html
 sys.path.insert(0, os.path.abspath('./lux'))
 import lux
 from lux.vis.Vis import Vis
+from classes.dataset_cache import DatasetCache
+from classes.streaming_csv_reader import StreamingCsvReader
+from classes.datetime_detector import DatetimeDetector
 
 
-# Function to parse uploaded data
-def parse_contents(contents, filename):
-    content_type, content_string = contents.split(',')
+# Cache of parsed datasets, keyed by a hash of their raw content
+dataset_cache = DatasetCache()
+
+# Detector of datetime columns, which remembers the format inferred for every column of a dataset
+datetime_detector = DatetimeDetector()
+
+# Maximum number of rows loaded from a file (to preview the first rows of large files), which can be
+# set with the VDW_MAX_ROWS environment variable (0 loads all rows)
+MAX_ROWS = int(os.environ.get('VDW_MAX_ROWS', 0)) or None
 
-    decoded = base64.b64decode(content_string)
-    if filename.endswith('.csv'):
-        df = pd.read_csv(io.StringIO(decoded.decode('utf-8')))
-        # Convert all column names to lowercase and replace spaces with underscores
-        df.rename(columns=lambda x: x.lower().replace(' ', '_').replace('-', '_'), inplace=True)
-        # Remove all special characters from column names
-        df.rename(columns=lambda x: x.lower().replace(':', '').replace('$', '').replace('(', '').replace(')', ''), inplace=True)
-        # Detect and convert any datetime columns
-        df = parse_datetime_cols(df)
 
-        return df
-    return None
+# Function to parse uploaded data, returning the DataFrame, the formats of its datetime columns and its content key
+def parse_contents(contents, filename, max_rows=MAX_ROWS):
+    if filename.endswith('.csv'):
+        # Decode and parse the upload in chunks rather than decoding all of it at once
+        return load_csv(StreamingCsvReader.from_upload(contents, max_rows=max_rows))
+    return None, {}, None
 
 
 # Function to prepare preloaded data
-def prepare_contents(filename):
+def prepare_contents(filename, max_rows=MAX_ROWS):
     access_string = 'assets/' + filename
-    df = pd.read_csv(access_string)
-    # Convert all column names to lowercase and replace spaces with underscores
-    df.rename(columns=lambda x: x.lower().replace(' ', '_').replace('-', '_'), inplace=True)
-    # Remove all special characters from column names
-    df.rename(columns=lambda x: x.lower().replace(':', '').replace('$', '').replace('(', '').replace(')', ''), inplace=True)
-    # Detect and convert any datetime columns
-    df = parse_datetime_cols(df)
+    return load_csv(StreamingCsvReader.from_file(access_string, max_rows=max_rows))
+
+
+# Function to parse CSV content, re-using the cached result if the same content was loaded before
+# Returns the DataFrame, the format every datetime column was parsed with and the content key, which identifies
+# the data (e.g. to share the figures of equal uploads)
+def load_csv(reader):
+    key = dataset_cache.content_key(reader.blocks(), reader.max_rows)
+    df, metadata = dataset_cache.get_entry(key)
+    if df is not None:
+        return df, metadata.get('datetime_formats', {}), key
+    df = reader.read()
+    df = normalise_column_names(df)
+    # Detect and convert any datetime columns, caching their formats for this content only
+    df, formats = parse_datetime_cols(df, dataset=key)
+    dataset_cache.put(key, df, {'datetime_formats': formats})
+    return df, formats, key
+
+
+# Function to prepare a worker process of the job runner for computations on Lux DataFrames
+def init_worker():
+    # Instantiating a DataFrame initialises Lux's executor, which unpickled Lux DataFrames rely on
+    pd.DataFrame()
+
+
+# Function to make column names consistent and free of special characters
+def normalise_column_names(df):
+    df.rename(columns=StreamingCsvReader.normalise_column_name, inplace=True)
     return df
 
 
-# Function to parse object columns that represent datetime objects into suitable objects
-def parse_datetime_cols(df):
+# Function to parse object columns that represent datetime objects into suitable objects,
+# returning the DataFrame and the format every datetime column was parsed with
+def parse_datetime_cols(df, dataset=None):
     # Make a copy of the data to retain original
     data_original = df.copy()
     # Convert LuxDataFrame to Pandas DataFrame if necessary
     if not isinstance(data_original, pd.DataFrame):
         data_original = pd.DataFrame(data_original)
-    # Find the object columns
-    object_cols = data_original.select_dtypes(include=['object']).columns
-
-    # Check if column is datetime column
-    for col in object_cols:
-        try:
-            parsed_col = pd.to_datetime(df[col].str.strip(), errors='coerce')
-            timestamp_ratio = parsed_col.notna().mean()  # Proportion of successfully converted values
-            if timestamp_ratio > 0.9:  # If most values convert successfully, treat it as a timestamp
-                data_original[col] = parsed_col
-        except Exception as e:
-            print('EXCEPTION: ', e)
-            # Treat it as a non-datetime column
-            data_original[col] = data_original[col]
-    return data_original
-
-# Function to apply Plotly-like styling to an existing Matplotlib figure
-def create_styled_matplotlib_figure(fig):
-    # Set the figure background to white (to match Plotly)
-    fig.patch.set_facecolor('white')
-
-    # Get the main axis
-    ax = fig.axes[0] if fig.axes else fig.add_subplot(111)
-    ax.set_facecolor('#E5ECF6')  # Light blue background only for the plotting area
-
-    # Update bar colours if applicable
-    for patch in ax.patches:
-        patch.set_facecolor('#4C59C2')
-        # Make bars slimmer
-        if isinstance(patch, plt.Rectangle):
-            if patch.get_width() > patch.get_height():
-                patch.set_height(patch.get_height() * 0.3)
-            else:  # Vertical bars
-                patch.set_width(patch.get_width() * 0.3)
-
-    # Style the labels
-    ax.set_xlabel(ax.get_xlabel(), fontsize=10, labelpad=12, 
-                  bbox=dict(facecolor='white', edgecolor='none'))
-    ax.set_ylabel(ax.get_ylabel(), fontsize=10, labelpad=12, 
-                  bbox=dict(facecolor='white', edgecolor='none'))
-
-    # Style the tick labels
-    ax.tick_params(axis='both', labelsize=7)
-
-    # Remove unnecessary spines (top & right)
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    # Update spine colours (bottom & left)
-    ax.spines['bottom'].set_color('#AAB8C2')
-    ax.spines['left'].set_color('#AAB8C2')
-    return fig
-
-
-# Function to convert a Matplotlib figure to a base64-encoded PNG
-def fig_to_base64(fig):
-    buf = io.BytesIO()
-    fig.savefig(buf, format='png', bbox_inches='tight')
-    buf.seek(0)
-    encoded_img = base64.b64encode(buf.read()).decode('utf-8')
-    buf.close()
-    return f'data:image/png;base64,{encoded_img}'
-
-
-# Function to correct matplotlib code that was automatically generated by Lux
-def fix_lux_code(lux_code):
-    # Pattern to identify the ax.barh() function call
-    pattern = r'(ax\.barh\()(.*?dtype:.*?dtype:.*?)\)'
-    # Replacement that ensures bars and measurements are properly formatted
-    replacement = r'ax.barh(bars.values, measurements.values, align="center")'
-    # Apply the substitution to the code to fix the barh() call
-    fixed_code = re.sub(pattern, replacement, lux_code, flags=re.DOTALL)
-    return fixed_code
+    # Detect datetime columns from a sample, then convert them with one explicit format each
+    return datetime_detector.parse(data_original, dataset)
 
 
 # Function to extract the names of the columns included in a Lux visualisation
@@ -248,17 +203,6 @@ def determine_filename(og_filename):
     return og_filename
 
 
-# Function to update the colours of automatically generated visualisations, making them more prominent and easily visible
-def update_colours(code_str):
-    # Find the colourmap specification block
-    pattern = re.compile(r"(cmap=Set1)", re.DOTALL)
-    # Replacement colourmap specification
-    new_colors = "cmap='RdYlGn_r'"
-    # Replace the found colourmap block with the new one
-    updated_code = re.sub(pattern, new_colors, code_str)
-    return updated_code
-
-
 # Function to ensure the progress bar styling is responsive and always shows the correct colours
 def style_progress(ctx, changed_id, click_out, download_completion, drop_dup, drop_out, load_colour, miss_colour, dup_colour, out_colour, down_colour, missing_style, dup_style, out_style, info_style, download_style, down_info_style, completion_style):
     log_msg = ['', '']
@@ -12,7 +12,8 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 import pandas as pd
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import lux
 import importlib.util
 
@@ -130,8 +131,11 @@ def like_geo(val):
 
 
 def matplotlib_setup(w, h):
-    plt.ioff()
-    fig, ax = plt.subplots(figsize=(w, h))
+    # The figure is created without pyplot, so that it is not registered in (or drawn on through) pyplot's
+    # global state, and charts can be rendered concurrently in several threads
+    fig = Figure(figsize=(w, h))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
     ax.set_axisbelow(True)
     ax.grid(color="#dddddd")
     ax.spines["right"].set_color("#dddddd")
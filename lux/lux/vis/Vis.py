@@ -294,6 +294,26 @@ class Vis:
         self._code = renderer.create_vis(self)
         return self._code
 
+    def to_plotly(self, colorscale=None) -> dict:
+        """
+        Generate a Plotly figure to visualize the Vis, built directly from its data
+
+        Parameters
+        ----------
+        colorscale : str, optional
+            name of a Plotly colorscale sampled for categorical colors, by default the qualitative Set1 colors
+
+        Returns
+        -------
+        dict
+                Plotly figure dictionary (with 'data' and 'layout'), or None if the mark cannot be drawn with Plotly
+        """
+        from lux.vislib.plotly.PlotlyRenderer import PlotlyRenderer
+
+        renderer = PlotlyRenderer(output_type="plotly", colorscale=colorscale)
+        self._code = renderer.create_vis(self)
+        return self._code
+
     def to_vegalite(self, prettyOutput=True) -> Union[dict, str]:
         """
         Generate minimal Vega-Lite code to visualize the Vis
@@ -338,6 +358,8 @@ class Vis:
             return self.to_matplotlib()
         elif language == "matplotlib_svg":
             return self._to_matplotlib_svg()
+        elif language == "plotly":
+            return self.to_plotly(**kwargs)
         elif language == "python":
             lux.config.tracer.start_tracing()
             lux.config.executor.execute(lux.vis.VisList.VisList(input_lst=[self]), self._source)
@@ -17,7 +17,6 @@ from lux.utils.utils import get_agg_title
 import pandas as pd
 import numpy as np
 import math
-import matplotlib.pyplot as plt
 from lux.utils.utils import matplotlib_setup
 from matplotlib.cm import ScalarMappable
 from lux.utils.date_utils import compute_date_granularity
@@ -128,7 +127,7 @@ class BarChart(MatplotlibChart):
 
         self.ax.set_xlabel(x_attr_abv)
         self.ax.set_ylabel(y_attr_abv)
-        plt.gca().invert_yaxis()
+        self.ax.invert_yaxis()
 
         self.code += "import numpy as np\n"
         self.code += "from math import nan\n"
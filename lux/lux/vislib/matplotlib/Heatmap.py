@@ -15,7 +15,6 @@
 from lux.vislib.matplotlib.MatplotlibChart import MatplotlibChart
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from lux.utils.utils import matplotlib_setup
 
 
@@ -75,13 +74,13 @@ class Heatmap(MatplotlibChart):
             plot_code += f"df = df.apply(lambda x: np.log(x), axis=1)\n"
         df = df.values
 
-        plt.imshow(df, cmap=color_map)
+        image = self.ax.imshow(df, cmap=color_map)
         self.ax.set_aspect("auto")
-        plt.gca().invert_yaxis()
+        self.ax.invert_yaxis()
 
         colorbar_code = ""
         if len(color_attr) == 1:
-            cbar = plt.colorbar(label=color_attr_name)
+            cbar = self.fig.colorbar(image, ax=self.ax, label=color_attr_name)
             cbar.outline.set_linewidth(0)
             colorbar_code += f"cbar = plt.colorbar(label='{color_attr_name}')\n"
             colorbar_code += f"cbar.outline.set_linewidth(0)\n"
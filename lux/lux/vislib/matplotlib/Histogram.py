@@ -15,7 +15,6 @@
 from lux.vislib.matplotlib.MatplotlibChart import MatplotlibChart
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 
 
 class Histogram(MatplotlibChart):
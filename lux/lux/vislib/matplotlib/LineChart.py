@@ -15,7 +15,6 @@
 from lux.vislib.matplotlib.MatplotlibChart import MatplotlibChart
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from lux.utils.utils import get_agg_title
 import altair as alt
 from lux.utils.utils import matplotlib_setup
@@ -21,7 +21,6 @@ from lux.vislib.matplotlib.LineChart import LineChart
 from lux.vislib.matplotlib.Histogram import Histogram
 from lux.vislib.matplotlib.Heatmap import Heatmap
 from lux.vislib.altair.AltairRenderer import AltairRenderer
-import matplotlib.pyplot as plt
 from lux.utils.utils import matplotlib_setup
 
 import base64
@@ -88,18 +87,17 @@ class MatplotlibRenderer:
             chart = None
             return chart
         if chart:
-            plt.tight_layout()
+            # Only the figure of this chart is laid out and saved (it is not known to pyplot, so nothing needs to be closed)
+            chart.fig.tight_layout()
             if lux.config.plotting_style and (
                 lux.config.plotting_backend == "matplotlib"
                 or lux.config.plotting_backend == "matplotlib_svg"
             ):
                 chart.ax = lux.config.plotting_style(chart.fig, chart.ax)
-            plt.tight_layout()
+            chart.fig.tight_layout()
             tmpfile = BytesIO()
             chart.fig.savefig(tmpfile, format="png")
             chart.chart = base64.b64encode(tmpfile.getvalue()).decode("utf-8")
-            plt.clf()
-            plt.close("all")
             if self.output_type == "matplotlib_svg":
                 return {"config": chart.chart, "vislib": "matplotlib"}
             if self.output_type == "matplotlib":
@@ -15,9 +15,10 @@
 from lux.vislib.matplotlib.MatplotlibChart import MatplotlibChart
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+import matplotlib
 from lux.utils.utils import matplotlib_setup
 from matplotlib.cm import ScalarMappable
+from matplotlib.colors import Normalize
 
 
 class ScatterChart(MatplotlibChart):
@@ -69,12 +70,12 @@ class ScatterChart(MatplotlibChart):
                 set_fig_code = "fig, ax = plt.subplots(figsize=(7, 5))\n"
                 self.ax.scatter(x_pts, y_pts, c=vals, cmap="Blues", alpha=0.5)
                 plot_code += f"ax.scatter(x_pts, y_pts, c={vals}, cmap='Blues', alpha=0.5)\n"
-                my_cmap = plt.cm.get_cmap("Blues")
+                my_cmap = matplotlib.colormaps["Blues"]
                 max_color = max(colors)
-                sm = ScalarMappable(cmap=my_cmap, norm=plt.Normalize(0, max_color))
+                sm = ScalarMappable(cmap=my_cmap, norm=Normalize(0, max_color))
                 sm.set_array([])
 
-                cbar = plt.colorbar(sm, label=color_attr_name)
+                cbar = self.fig.colorbar(sm, ax=self.ax, label=color_attr_name)
                 cbar.outline.set_linewidth(0)
                 plot_code += f"my_cmap = plt.cm.get_cmap('Blues')\n"
                 plot_code += f"""sm = ScalarMappable(
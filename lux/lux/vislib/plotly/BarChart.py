@@ -0,0 +1,119 @@
+#  Copyright 2019-2020 The Lux Authors.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from lux.vislib.plotly.PlotlyChart import PlotlyChart
+from lux.utils.utils import get_agg_title
+import math
+import lux
+
+
+class BarChart(PlotlyChart):
+    """
+    BarChart is a subclass of PlotlyChart that render as a bar charts.
+    All rendering properties for bar charts are set here.
+
+    See Also
+    --------
+    https://plotly.com/python/bar-charts/
+    """
+
+    def __init__(self, dobj, colorscale=None):
+        super().__init__(dobj, colorscale)
+
+    def __repr__(self):
+        return f"Bar Chart <{str(self.vis)}>"
+
+    def initialize_chart(self):
+        x_attr = self.vis.get_attr_by_channel("x")[0]
+        y_attr = self.vis.get_attr_by_channel("y")[0]
+
+        # Deal with overlong string axes labels
+        x_attr_abv = str(x_attr.attribute)
+        y_attr_abv = str(y_attr.attribute)
+        label_len = lux.config.label_len
+        prefix_len = math.ceil(3.0 * label_len / 5.0)
+        suffix_len = label_len - prefix_len
+        if len(x_attr_abv) > label_len:
+            x_attr_abv = self.abbreviate(x_attr.attribute, label_len, prefix_len, suffix_len)
+        if len(y_attr_abv) > label_len:
+            y_attr_abv = self.abbreviate(y_attr.attribute, label_len, prefix_len, suffix_len)
+
+        if x_attr.data_model == "measure":
+            measure_attr = x_attr.attribute
+            bar_attr = y_attr.attribute
+        else:
+            measure_attr = y_attr.attribute
+            bar_attr = x_attr.attribute
+
+        k = lux.config.number_of_bars
+        n_bars = len(self.data.iloc[:, 0].unique())
+        if n_bars > k:  # Truncating to only top k
+            remaining_bars = n_bars - k
+            self.data = self.data.nlargest(k, measure_attr)
+            self.figure["layout"]["annotations"] = [
+                {
+                    "text": f"<b>+ {remaining_bars} more ...</b>",
+                    "xref": "paper",
+                    "yref": "paper",
+                    "x": 0.95,
+                    "y": 0.01,
+                    "xanchor": "right",
+                    "yanchor": "bottom",
+                    "showarrow": False,
+                    "font": {"size": 11, "color": "#ff8e04"},
+                }
+            ]
+
+        df = self.data
+        bars = df[bar_attr].apply(lambda x: str(x))
+
+        color_attr = self.vis.get_attr_by_channel("color")
+        if len(color_attr) == 1:
+            color_attr_name = color_attr[0].attribute
+            groups = self.groups(df.assign(**{bar_attr: bars}), color_attr_name)
+            colors = self.categorical_colors(len(groups)) if self.colorscale is not None else [None] * len(groups)
+            for (value, group), color in zip(groups, colors):
+                trace = {
+                    "type": "bar",
+                    "orientation": "h",
+                    "x": self.values(group[measure_attr]),
+                    "y": self.values(group[bar_attr]),
+                    "name": str(value),
+                }
+                if color is not None:
+                    trace["marker"] = {"color": color}
+                self.figure["data"].append(trace)
+            self.figure["layout"]["barmode"] = "stack"
+            self.set_legend_title(color_attr_name)
+        else:
+            self.figure["data"].append(
+                {
+                    "type": "bar",
+                    "orientation": "h",
+                    "x": self.values(df[measure_attr]),
+                    "y": self.values(bars),
+                    "showlegend": False,
+                }
+            )
+
+        bar_labels = list(dict.fromkeys(bars))
+        self.figure["layout"]["yaxis"] = {
+            # Bars from top to bottom in the order of the data, as in the other renderers
+            "autorange": "reversed",
+            "type": "category",
+            "tickmode": "array",
+            "tickvals": bar_labels,
+            "ticktext": [label[:10] + "..." if len(label) > 10 else label for label in bar_labels],
+        }
+        self.set_axis_labels(x_attr_abv, y_attr_abv)
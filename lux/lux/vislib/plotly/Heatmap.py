@@ -0,0 +1,69 @@
+#  Copyright 2019-2020 The Lux Authors.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from lux.vislib.plotly.PlotlyChart import PlotlyChart
+import pandas as pd
+import numpy as np
+
+
+class Heatmap(PlotlyChart):
+    """
+    Heatmap is a subclass of PlotlyChart that render as a heatmap.
+    All rendering properties for heatmap are set here.
+
+    See Also
+    --------
+    https://plotly.com/python/heatmaps/
+    """
+
+    def __init__(self, vis, colorscale=None):
+        super().__init__(vis, colorscale)
+
+    def __repr__(self):
+        return f"Heatmap <{str(self.vis)}>"
+
+    def initialize_chart(self):
+        x_attr = self.vis.get_attr_by_channel("x")[0]
+        y_attr = self.vis.get_attr_by_channel("y")[0]
+
+        x_attr_abv = self.abbreviate(x_attr.attribute)
+        y_attr_abv = self.abbreviate(y_attr.attribute)
+
+        df = self.data
+
+        color_attr = self.vis.get_attr_by_channel("color")
+        if len(color_attr) == 1:
+            color_attr_name = color_attr[0].attribute
+            df = pd.pivot_table(data=df, index="yBinStart", values=color_attr_name, columns="xBinStart")
+            colorbar = {"title": {"text": str(color_attr_name)}, "outlinewidth": 0}
+            trace = {"colorscale": "Viridis", "colorbar": colorbar}
+        else:
+            df = pd.pivot_table(data=df, index="yBinStart", values="count", columns="xBinStart")
+            df = np.log(df)
+            trace = {"colorscale": "Blues", "showscale": False}
+
+        # Empty bins are gaps (null) in the figure
+        z = df.to_numpy(dtype=float)
+        trace.update(
+            {
+                "type": "heatmap",
+                "x": self.values(df.columns.to_series()),
+                "y": self.values(df.index.to_series()),
+                "z": [[None if np.isnan(value) else value for value in row] for row in z.tolist()],
+            }
+        )
+        self.figure["data"].append(trace)
+        self.figure["layout"]["xaxis"] = {"showgrid": False}
+        self.figure["layout"]["yaxis"] = {"showgrid": False}
+        self.set_axis_labels(x_attr_abv, y_attr_abv)
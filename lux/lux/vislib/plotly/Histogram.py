@@ -0,0 +1,63 @@
+#  Copyright 2019-2020 The Lux Authors.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from lux.vislib.plotly.PlotlyChart import PlotlyChart
+
+
+class Histogram(PlotlyChart):
+    """
+    Histogram is a subclass of PlotlyChart that render as a histograms.
+    All rendering properties for histograms are set here.
+
+    See Also
+    --------
+    https://plotly.com/python/bar-charts/
+    """
+
+    def __init__(self, vis, colorscale=None):
+        super().__init__(vis, colorscale)
+
+    def __repr__(self):
+        return f"Histogram <{str(self.vis)}>"
+
+    def initialize_chart(self):
+        measure = self.vis.get_attr_by_data_model("measure", exclude_record=True)[0]
+        msr_attr = self.vis.get_attr_by_channel(measure.channel)[0]
+
+        msr_attr_abv = self.abbreviate(msr_attr.attribute, 17, 10, 7)
+
+        x_min = self.vis.min_max[msr_attr.attribute][0]
+        x_max = self.vis.min_max[msr_attr.attribute][1]
+
+        markbar = abs(x_max - x_min) / 12
+
+        df = self.data
+
+        bars = self.values(df[msr_attr.attribute])
+        measurements = self.values(df["Number of Records"])
+
+        axis_title = f"{msr_attr_abv} (binned)"
+        if msr_attr_abv == " ":
+            axis_title = "Series (binned)"
+        # The binned measure lies along the channel of the measure, with the counts along the other axis
+        if measure.channel == "y":
+            trace = {"type": "bar", "orientation": "h", "x": measurements, "y": bars, "width": markbar}
+            self.figure["layout"]["yaxis"] = {"range": [float(x_min), float(x_max)]}
+            self.set_axis_labels("Number of Records", axis_title)
+        else:
+            trace = {"type": "bar", "x": bars, "y": measurements, "width": markbar}
+            self.figure["layout"]["xaxis"] = {"range": [float(x_min), float(x_max)]}
+            self.set_axis_labels(axis_title, "Number of Records")
+        trace["showlegend"] = False
+        self.figure["data"].append(trace)
@@ -0,0 +1,77 @@
+#  Copyright 2019-2020 The Lux Authors.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from lux.vislib.plotly.PlotlyChart import PlotlyChart
+from lux.utils.utils import get_agg_title
+
+
+class LineChart(PlotlyChart):
+    """
+    LineChart is a subclass of PlotlyChart that render as a line charts.
+    All rendering properties for line charts are set here.
+
+    See Also
+    --------
+    https://plotly.com/python/line-charts/
+    """
+
+    def __init__(self, dobj, colorscale=None):
+        super().__init__(dobj, colorscale)
+
+    def __repr__(self):
+        return f"Line Chart <{str(self.vis)}>"
+
+    def initialize_chart(self):
+        x_attr = self.vis.get_attr_by_channel("x")[0]
+        y_attr = self.vis.get_attr_by_channel("y")[0]
+
+        x_attr_abv = self.abbreviate(x_attr.attribute)
+        y_attr_abv = self.abbreviate(y_attr.attribute)
+
+        self.data = self.data.dropna(subset=[x_attr.attribute, y_attr.attribute])
+
+        df = self.data
+
+        color_attr = self.vis.get_attr_by_channel("color")
+        if len(color_attr) == 1:
+            color_attr_name = color_attr[0].attribute
+            groups = self.groups(df, color_attr_name)
+            colors = self.categorical_colors(len(groups)) if self.colorscale is not None else [None] * len(groups)
+            for (value, group), color in zip(groups, colors):
+                trace = {
+                    "type": "scatter",
+                    "mode": "lines",
+                    "x": self.values(group[x_attr.attribute]),
+                    "y": self.values(group[y_attr.attribute]),
+                    "name": str(value),
+                }
+                if color is not None:
+                    trace["line"] = {"color": color}
+                self.figure["data"].append(trace)
+            self.set_legend_title(color_attr_name)
+        else:
+            self.figure["data"].append(
+                {
+                    "type": "scatter",
+                    "mode": "lines",
+                    "x": self.values(df[x_attr.attribute]),
+                    "y": self.values(df[y_attr.attribute]),
+                    "showlegend": False,
+                }
+            )
+
+        if y_attr.data_model == "measure":
+            self.set_axis_labels(x_attr_abv, get_agg_title(y_attr))
+        else:
+            self.set_axis_labels(get_agg_title(x_attr), y_attr_abv)
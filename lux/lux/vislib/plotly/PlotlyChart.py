@@ -0,0 +1,92 @@
+#  Copyright 2019-2020 The Lux Authors.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import pandas as pd
+from plotly.colors import qualitative, sample_colorscale
+
+
+class PlotlyChart:
+    """
+    PlotlyChart is a representation of a chart as a Plotly figure dictionary.
+    Common utilities for charts that is independent of chart types should go here.
+    The figure is built directly from the data of the Vis, without generating code.
+
+    See Also
+    --------
+    https://plotly.com/python/
+    """
+
+    def __init__(self, vis, colorscale=None):
+        self.vis = vis
+        self.data = vis.data
+        # Name of a Plotly colorscale sampled for categorical colors (qualitative colors by default)
+        self.colorscale = colorscale
+        self.figure = {"data": [], "layout": {"legend": {"itemsizing": "constant"}}}
+        self.initialize_chart()
+        self.add_title()
+
+    def __repr__(self):
+        return f"PlotlyChart <{str(self.vis)}>"
+
+    def add_title(self):
+        chart_title = self.vis.title
+        if chart_title:
+            if len(chart_title) > 25:
+                chart_title = chart_title[:15] + "..." + chart_title[-10:]
+            self.figure["layout"]["title"] = {"text": chart_title}
+
+    def set_axis_labels(self, x_label, y_label):
+        self.figure["layout"]["xaxis"] = dict(self.figure["layout"].get("xaxis", {}), title={"text": x_label})
+        self.figure["layout"]["yaxis"] = dict(self.figure["layout"].get("yaxis", {}), title={"text": y_label})
+
+    def set_legend_title(self, title):
+        self.figure["layout"]["legend"]["title"] = {"text": str(title)}
+
+    def categorical_colors(self, n):
+        """
+        Colors of n categories, either sampled evenly from the colorscale of the chart
+        (as Matplotlib maps category codes onto a colormap) or cycled from the qualitative Set1 colors
+        """
+        if n == 0:
+            return []
+        if self.colorscale is not None:
+            return sample_colorscale(self.colorscale, n) if n > 1 else sample_colorscale(self.colorscale, [0.0])
+        colors = qualitative.Set1 if n <= 9 else qualitative.Light24
+        return [colors[i % len(colors)] for i in range(n)]
+
+    @staticmethod
+    def abbreviate(label, length=25, prefix=15, suffix=10):
+        label = str(label)
+        if len(label) > length:
+            return label[:prefix] + "..." + label[-suffix:]
+        return label
+
+    @staticmethod
+    def groups(df, attribute):
+        """
+        Split the data by the distinct values of an attribute, in sorted order where the values can be sorted
+        """
+        values = pd.unique(df[attribute].dropna())
+        try:
+            values = sorted(values)
+        except TypeError:
+            values = list(values)
+        return [(value, df[df[attribute] == value]) for value in values]
+
+    @staticmethod
+    def values(series):
+        return series.tolist()
+
+    def initialize_chart(self):
+        return NotImplemented
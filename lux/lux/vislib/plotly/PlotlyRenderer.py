@@ -0,0 +1,82 @@
+#  Copyright 2019-2020 The Lux Authors.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import pandas as pd
+from lux.executor.PandasExecutor import PandasExecutor
+from lux.vislib.plotly.BarChart import BarChart
+from lux.vislib.plotly.ScatterChart import ScatterChart
+from lux.vislib.plotly.LineChart import LineChart
+from lux.vislib.plotly.Histogram import Histogram
+from lux.vislib.plotly.Heatmap import Heatmap
+
+
+class PlotlyRenderer:
+    """
+    Renderer for Charts based on Plotly (https://plotly.com/python/),
+    building figure dictionaries directly from the data of a Vis (without generating code)
+    """
+
+    def __init__(self, output_type="plotly", colorscale=None):
+        self.output_type = output_type
+        # Name of a Plotly colorscale for categorical colors (qualitative colors by default)
+        self.colorscale = colorscale
+
+    def __repr__(self):
+        return f"PlotlyRenderer"
+
+    def create_vis(self, vis):
+        """
+        Input Vis object and return a Plotly figure
+
+        Parameters
+        ----------
+        vis: lux.vis.Vis
+                Input Vis (with data)
+        Returns
+        -------
+        figure : dict
+                Plotly figure dictionary (with 'data' and 'layout'), or None for unsupported marks
+        """
+        # Lazy Evaluation for 2D Binning
+        if vis.mark == "scatter" and vis._postbin:
+            vis._mark = "heatmap"
+
+            PandasExecutor.execute_2D_binning(vis)
+        # If a column has a Period dtype, or contains Period objects, convert it back to Datetime
+        if vis.data is not None:
+            for attr in list(vis.data.columns):
+                if len(vis.data) == 0:
+                    break
+                if isinstance(vis.data.dtypes[attr], pd.PeriodDtype) or isinstance(
+                    vis.data[attr].iloc[0], pd.Period
+                ):
+                    dateColumn = vis.data[attr]
+                    vis.data[attr] = pd.PeriodIndex(dateColumn.values).to_timestamp()
+                if isinstance(vis.data.dtypes[attr], pd.IntervalDtype) or isinstance(
+                    vis.data[attr].iloc[0], pd.Interval
+                ):
+                    vis.data[attr] = vis.data[attr].astype(str)
+        if vis.mark == "histogram":
+            chart = Histogram(vis, self.colorscale)
+        elif vis.mark == "bar":
+            chart = BarChart(vis, self.colorscale)
+        elif vis.mark == "scatter":
+            chart = ScatterChart(vis, self.colorscale)
+        elif vis.mark == "line":
+            chart = LineChart(vis, self.colorscale)
+        elif vis.mark == "heatmap":
+            chart = Heatmap(vis, self.colorscale)
+        else:
+            return None
+        return chart.figure
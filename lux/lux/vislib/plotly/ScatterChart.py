@@ -0,0 +1,93 @@
+#  Copyright 2019-2020 The Lux Authors.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from lux.vislib.plotly.PlotlyChart import PlotlyChart
+
+
+class ScatterChart(PlotlyChart):
+    """
+    ScatterChart is a subclass of PlotlyChart that render as a scatter charts.
+    All rendering properties for scatter charts are set here.
+
+    See Also
+    --------
+    https://plotly.com/python/line-and-scatter/
+    """
+
+    def __init__(self, vis, colorscale=None):
+        super().__init__(vis, colorscale)
+
+    def __repr__(self):
+        return f"ScatterChart <{str(self.vis)}>"
+
+    def initialize_chart(self):
+        x_attr = self.vis.get_attr_by_channel("x")[0]
+        y_attr = self.vis.get_attr_by_channel("y")[0]
+
+        x_attr_abv = self.abbreviate(x_attr.attribute)
+        y_attr_abv = self.abbreviate(y_attr.attribute)
+
+        df = self.data.dropna()
+
+        color_attr = self.vis.get_attr_by_channel("color")
+        if len(color_attr) == 1:
+            color_attr_name = color_attr[0].attribute
+            color_attr_type = color_attr[0].data_type
+            if color_attr_type == "quantitative":
+                self.figure["data"].append(
+                    {
+                        "type": "scatter",
+                        "mode": "markers",
+                        "x": self.values(df[x_attr.attribute]),
+                        "y": self.values(df[y_attr.attribute]),
+                        "marker": {
+                            "color": self.values(df[color_attr_name]),
+                            "colorscale": "Blues",
+                            "showscale": True,
+                            "colorbar": {"title": {"text": str(color_attr_name)}, "outlinewidth": 0},
+                        },
+                        "opacity": 0.5,
+                        "showlegend": False,
+                    }
+                )
+            else:
+                groups = self.groups(df, color_attr_name)
+                colors = self.categorical_colors(len(groups))
+                for i, ((value, group), color) in enumerate(zip(groups, colors)):
+                    self.figure["data"].append(
+                        {
+                            "type": "scatter",
+                            "mode": "markers",
+                            "x": self.values(group[x_attr.attribute]),
+                            "y": self.values(group[y_attr.attribute]),
+                            "name": str(value)[:26] + "..." if len(str(value)) > 26 else str(value),
+                            "marker": {"color": color},
+                            "opacity": 0.5,
+                            # Only the first 16 categories are listed in the legend
+                            "showlegend": i < 16,
+                        }
+                    )
+                self.set_legend_title(color_attr_name)
+        else:
+            self.figure["data"].append(
+                {
+                    "type": "scatter",
+                    "mode": "markers",
+                    "x": self.values(df[x_attr.attribute]),
+                    "y": self.values(df[y_attr.attribute]),
+                    "opacity": 0.5,
+                    "showlegend": False,
+                }
+            )
+        self.set_axis_labels(x_attr_abv, y_attr_abv)
@@ -14,12 +14,15 @@ import pytest
 import pandas as pd
 import sys
 import os
+from unittest.mock import patch
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from backend_magic.duplicate_detection import *
+from backend_magic.near_duplicate_detection import *
 from backend_magic.missing_value_detection import *
 from backend_magic.outlier_isolation_forest import *
+from backend_magic.outlier_detectors import *
 
 
 ################################
@@ -80,6 +83,70 @@ def test_detect_no_duplicates(missing_df):
     assert output_df.shape[0] == 4
 
 
+def test_detect_duplicates_keeps_input(duplicate_df):
+    # Test that the detection does not add its column to the caller's DataFrame
+    detect_duplicates(duplicate_df)
+    assert 'duplicate' not in duplicate_df.columns
+
+
+def test_duplicate_index_hash_collisions():
+    # Test that rows sharing a row hash without being identical are not treated as duplicates
+    # (text columns are hashed by their string representation, so 1 and '1' share a hash)
+    collision_df = pd.DataFrame({'val': [1, '1', 1, '1', 2, np.nan, np.nan], 'flt': [1.0, 1.0, 1.0, 1.0, 2.0, np.nan, np.nan]})
+    index = DuplicateIndex.from_frame(collision_df)
+    assert index.duplicated(keep=False).tolist() == collision_df.duplicated(keep=False).tolist()
+    assert index.duplicated().tolist() == collision_df.duplicated().tolist()
+    output_df, dups_count = detect_duplicates(collision_df)
+    assert dups_count == 3
+
+
+def test_highlight_duplicates(duplicate_df):
+    # Test that all members of a cluster of duplicates are shown together
+    highlight_df = highlight_duplicates(duplicate_df)
+    assert highlight_df['id'].tolist() == [1, 3]
+    assert highlight_df['duplicate'].all()
+
+
+def test_duplicate_index_after_deletion(duplicate_df):
+    # Test that the index updated after deleting rows matches a newly built index
+    index = DuplicateIndex.from_frame(duplicate_df)
+    assert index.cluster_ids().tolist() == [-1, 1, -1, 1]
+    keep_mask = ~index.duplicated()
+    updated = index.drop_rows(keep_mask)
+    output_df, dups_count = detect_duplicates(duplicate_df[keep_mask], index=updated)
+    assert dups_count == 0
+    assert updated.duplicated(keep=False).tolist() == DuplicateIndex.from_frame(duplicate_df[keep_mask]).duplicated(keep=False).tolist()
+
+
+def test_detect_near_duplicates(duplicate_df):
+    # Test that rows differing in casing, whitespace or by tiny numeric deviations are detected
+    near_df = duplicate_df.copy()
+    near_df.loc[3, 'str'] = ' BANANA  '
+    near_df.loc[3, 'flt'] = 2.5001
+    output_df, dups_count = detect_duplicates(near_df.copy())
+    assert dups_count == 0
+    output_df, dups_count = detect_near_duplicates(near_df)
+    assert dups_count == 1
+    assert output_df['duplicate'].tolist() == [False, False, False, True]
+    # The caller's DataFrame is left unchanged
+    assert 'duplicate' not in near_df.columns
+
+    # Test that a larger numeric deviation is only accepted with a lower similarity threshold
+    near_df.loc[3, 'flt'] = 3.0
+    output_df, dups_count = detect_near_duplicates(near_df)
+    assert dups_count == 0
+    output_df, dups_count = detect_near_duplicates(near_df, threshold=0.5)
+    assert dups_count == 1
+
+
+
+def test_candidate_pairs_within_buckets():
+    # Test that rows sharing a bucket are paired even if a dissimilar row of the bucket lies between them
+    keys = np.array([[5, 1], [9, 2], [5, 3], [5, 4], [9, 5]], dtype=np.uint64)
+    pairs = candidate_pairs(keys).tolist()
+    assert [0, 3] in pairs
+    assert pairs == [[0, 2], [0, 3], [1, 4], [2, 3]]
+
 #############################################
 ### Test the missing value handling stage ###
 
@@ -136,6 +203,44 @@ def test_knn_imputation(missing_df):
     assert output_df['int'].mean() == 200
 
 
+def test_knn_imputation_engine():
+    # Test that the neighbours found directly and through the trees match sklearn's KNNImputer on standardised data
+    from sklearn.impute import KNNImputer
+    from backend_magic import knn_imputation
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=(600, 4)) * [1, 10, 100, 1000]
+    values[rng.random(values.shape) < 0.15] = np.nan
+    scaled = knn_imputation.standardise(values)
+    expected = KNNImputer(n_neighbors=3).fit_transform(scaled)
+    assert np.allclose(knn_imputation.knn_impute(scaled, n_neighbors=3), expected)
+    with patch.object(knn_imputation, 'DIRECT_PAIRS', 1000), patch.object(knn_imputation, 'MIN_TREE_ROWS', 10):
+        assert np.allclose(knn_imputation.knn_impute(scaled, n_neighbors=3, batch_rows=7), expected)
+
+
+def test_stratified_imputation_sample():
+    # Test that the sample keeps the proportion of rows with missing values, and every pattern of missing values
+    from backend_magic.imputation_preview import stratified_sample, preview_imputation
+    rng = np.random.default_rng(0)
+    large_df = pd.DataFrame({'a': rng.normal(size=10000), 'b': rng.normal(size=10000)})
+    large_df.loc[rng.choice(10000, 2000, replace=False), 'a'] = np.nan
+    large_df.loc[7, 'b'] = np.nan
+    sample = stratified_sample(large_df, 1000)
+    assert 990 <= len(sample) <= 1000
+    assert abs(sample['a'].isna().mean() - 0.2) < 0.01
+    assert sample['b'].isna().sum() == 1
+
+    # Test that the preview uses the statistics of the full data
+    sample, imputed_sample, statistics = preview_imputation(large_df, 'simple', max_rows=2000)
+    assert len(sample) <= 2000
+    assert imputed_sample['a'].isna().sum() == 0
+    assert statistics['means'][0] == large_df['a'].mean()
+
+    # Test that the sample of wide, sparse data with more patterns of missing values than rows stays bounded
+    sparse_df = pd.DataFrame(rng.normal(size=(5000, 40)))
+    sparse_df = sparse_df.mask(rng.random(sparse_df.shape) < 0.2)
+    assert len(stratified_sample(sparse_df, 1000)) == 1000
+
+
 #######################################
 ### Test the outlier handling stage ###
 
@@ -166,3 +271,66 @@ def test_outlier_contamination(outlier_df):
     output_df, out_count = train_isolation_forest(outlier_df, contamination=0.6)
     assert out_count == 2
     assert output_df['outlier'].tolist()[1] == False
+
+
+def test_outlier_rethresholding(outlier_df):
+    # Test that a contamination change re-uses the scores of the fitted model instead of retraining
+    scores = fit_outlier_scores(outlier_df)
+    with patch.object(IsolationForest, 'fit') as fit_mock:
+        output_df, out_count = train_isolation_forest(outlier_df, contamination=0.5, scores=scores)
+        fit_mock.assert_not_called()
+    assert out_count == 3 == output_df['outlier'].sum()
+    # The outliers of a lower contamination are a subset of those of a higher contamination
+    fewer_df, out_count = train_isolation_forest(output_df, contamination=0.1, scores=scores)
+    assert out_count == 1 == fewer_df['outlier'].sum()
+    assert (output_df['outlier'] | ~fewer_df['outlier']).all()
+
+
+def test_outlier_chunked_scoring(outlier_df):
+    # Test that scoring in chunks over several threads yields the scores of scoring all rows at once
+    scores = fit_outlier_scores(outlier_df, n_jobs=2, chunk_rows=3, random_state=0)
+    assert np.array_equal(scores.scores, scores.model.score_samples(encode_features(outlier_df)))
+
+    # Test that large data is trained on a bounded subsample, and that all rows are still scored
+    with patch.object(IsolationForest, 'fit', autospec=True, side_effect=IsolationForest.fit) as fit_mock:
+        scores = fit_outlier_scores(outlier_df, max_train_rows=5, random_state=0)
+        assert len(fit_mock.call_args[0][1]) == 5
+    output_df, out_count = train_isolation_forest(outlier_df, contamination=0.2, scores=scores)
+    assert out_count == output_df['outlier'].sum() == 2
+
+
+@pytest.mark.parametrize('method', ['robust_z', 'iqr', 'ecdf', 'lof'])
+def test_outlier_detectors(method):
+    # Test that every registered detector flags the extreme row with the common interface
+    rng = np.random.default_rng(0)
+    extreme_df = pd.DataFrame({
+        'str': rng.choice(['apple', 'banana', 'cherry'], 50),
+        'flt': rng.normal(3, 1, 50),
+        'int': rng.integers(100, 300, 50)
+    })
+    extreme_df.loc[4, ['flt', 'int']] = [30.0, 100000]
+    output_df, out_count = detect_outliers(extreme_df, method=method, contamination=0.02)
+    assert out_count == output_df['outlier'].sum() == 1
+    assert output_df['outlier'].tolist()[4] == True
+
+    # Test that the detectors tolerate missing values
+    extreme_df.loc[0, 'flt'] = np.nan
+    output_df, out_count = detect_outliers(extreme_df, method=method, contamination=0.02)
+    assert output_df['outlier'].tolist()[4] == True
+
+
+def test_numeric_features_skip_categories(outlier_df):
+    # Test that the vectorised detectors only encode the numeric columns, without factorising the categorical ones
+    with patch.object(FeatureEncoder, 'category_codes') as codes_mock:
+        features = numeric_features(outlier_df)
+        codes_mock.assert_not_called()
+    assert np.array_equal(features, outlier_df[['id', 'flt', 'int']].to_numpy(dtype=np.float32))
+
+
+def test_choose_outlier_detector(outlier_df):
+    # Test that small data is handled by the IsolationForest, and huge data by a vectorised detector
+    assert choose_outlier_detector(outlier_df) == 'isolation_forest'
+    with patch('backend_magic.outlier_detectors.VECTORISED_CELLS', 10):
+        assert choose_outlier_detector(outlier_df) == 'robust_z'
+    with pytest.raises(ValueError):
+        outlier_scores(outlier_df, 'unknown')
@@ -9,6 +9,7 @@ import pandas as pd
 import numpy as np
 import sys
 import os
+import time
 from unittest.mock import patch
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -36,6 +37,13 @@ mock_duplicate_df = pd.DataFrame({
 })
 
 
+# Jobs run in the calling thread, so that every callback returns its output rather than waiting for a worker
+@pytest.fixture(autouse=True)
+def inline_jobs(tmp_path):
+    with patch('app.job_runner', JobRunner(max_workers=0, job_dir=str(tmp_path))):
+        yield
+
+
 ####################################################################
 ### Helper functions for the testing of text rendered on the GUI ###
 
@@ -55,7 +63,7 @@ def extract_text_from_dash_component(component):
 
 def test_render_missing_values():
     # Test normal behaviour of the first render within the missing value handling stage
-    with patch('app.current_df', mock_current_df):
+    with patch.object(session_store.default_session, 'current_df', mock_current_df):
         output_div = render_missing_values(1)
         missing_df, missing_val = detect_missing_values(mock_current_df)
         assert output_div is not None
@@ -66,7 +74,7 @@ def test_render_missing_values():
 
 def test_update_missing_values():
     # Test subsequent renders of the missing value handling stage
-    with patch('app.current_df', mock_current_df):
+    with patch.object(session_store.default_session, 'current_df', mock_current_df):
         output_div = update_missing_values(['highlight'], 1)
         assert output_div is not None
         # Verify output text
@@ -74,7 +82,7 @@ def test_update_missing_values():
         assert 'Selected action: Show rows with missing values' in output_text
     
     # Test output after missing value imputation
-    with patch('app.current_df', mock_current_df):
+    with patch.object(session_store.default_session, 'current_df', mock_current_df):
         output_div = update_missing_values(['impute-simple'], 1)
         assert output_div is not None
         output_text = extract_text_from_dash_component(output_div)
@@ -82,6 +90,118 @@ def test_update_missing_values():
         assert '0 missing values were detected' in output_text
 
 
+def test_imputation_preview():
+    # Test that large data is imputed on a sample first, and in full only once confirmed
+    with patch('app.PREVIEW_MIN_ROWS', 2):
+        with patch.object(session_store.default_session, 'current_df', mock_current_df):
+            output_div = update_missing_values(['impute-KNN'], 1)
+            output_text = extract_text_from_dash_component(output_div)
+            assert 'Selected action: Preview - Impute missing values using the k nearest neighbours' in output_text
+            assert 'Preview on a sample of 4 of 4 rows' in output_text
+            # The data is unchanged by the preview
+            assert session_store.default_session.current_df.isna().sum().sum() == 2
+
+            # The statistics fitted for the preview are reused for the full imputation
+            with patch('app.fit_imputation', side_effect=AssertionError('refitted')):
+                output_div = update_missing_values(['impute-KNN', 'confirm-KNN'], 1)
+            output_text = extract_text_from_dash_component(output_div)
+            assert 'Selected action: Impute missing values using the k nearest neighbours' in output_text
+            assert '0 missing values were detected' in output_text
+
+
+def test_cleaning_plan_recording():
+    # Test that the actions taken are recorded in the cleaning plan, and undone with the data
+    with patch.object(session_store.default_session, 'current_df', mock_current_df):
+        session = session_store.default_session
+        session.checkpoint()
+        steps = len(session.plan.steps)
+        update_missing_values(['delete'], 1)
+        assert session.plan.steps[-1] == {'step': 'drop_missing'}
+        update_missing_values(['delete', 'undo'], 1)
+        assert len(session.plan.steps) == steps
+
+
+@pytest.mark.filterwarnings('ignore::DeprecationWarning')
+def test_callback_resumed_after_job(tmp_path):
+    # Test that a callback returns without waiting for its job, leaving the session unchanged until the job finished,
+    # and that it is called again with the job's result once the job finished
+    runner = JobRunner(max_workers=1, job_dir=str(tmp_path), initializer=init_worker)
+    session = session_store.get('pending-job')
+    session.load(mock_current_df)
+    step = session.step
+    try:
+        with patch('app.job_runner', runner):
+            with pytest.raises(dash.exceptions.PreventUpdate):
+                update_missing_values(['impute-KNN'], 1, 'pending-job')
+            assert session.step == step and session.current_df.isna().sum().sum() == 2
+            job_id = session.pending_call.job_id
+            while not runner.done(job_id):
+                time.sleep(0.1)
+            assert finish_pending_call(1, 'pending-job') == job_id
+            output_text = extract_text_from_dash_component(update_missing_values.resume(job_id, 'pending-job'))
+            assert 'Selected action: Impute missing values using the k nearest neighbours' in output_text
+            assert '0 missing values were detected' in output_text
+            assert session.pending_call is None and session.step == step + 1
+
+            # A newer choice of the user supersedes the computation of the previous one
+            session.load(mock_current_df)
+            with pytest.raises(dash.exceptions.PreventUpdate):
+                update_missing_values(['impute-KNN'], 1, 'pending-job')
+            job_id = session.pending_call.job_id
+            output_text = extract_text_from_dash_component(update_missing_values(['impute-KNN', 'highlight'], 1, 'pending-job'))
+            assert 'Selected action: Show rows with missing values' in output_text
+            assert session.pending_call is None
+            assert runner.status(job_id)['state'] == 'cancelled'
+            with pytest.raises(dash.exceptions.PreventUpdate):
+                update_missing_values.resume(job_id, 'pending-job')
+    finally:
+        runner.shutdown()
+        session_store.discard('pending-job')
+
+
+def test_missing_value_patterns():
+    # Test that the patterns of missing values are shown with a recommended action
+    with patch.object(session_store.default_session, 'current_df', mock_current_df):
+        output_div = update_missing_values(['patterns'], 1)
+        output_text = extract_text_from_dash_component(output_div)
+        assert 'Selected action: Show patterns of missing values' in output_text
+        assert 'Most frequent patterns of missing values' in output_text
+        assert 'Recommendation: Impute missing values using the univariate mean' in output_text
+
+
+def test_figure_cache():
+    # Test that rendering the same visualisation of the same version of the data again (e.g. after undo)
+    # re-uses the cached figure, while other data is rendered again
+    session = session_store.get('figure-cache')
+    session.load(mock_duplicate_df.drop(columns='id'))
+    session.checkpoint()
+    first = render_vis(session, 'test', 0, session.current_df, num_rec=1)
+    session.commit(session.current_df[session.current_df.int > 0])
+    hits = figure_cache.hits
+    render_vis(session, 'test', 1, session.current_df, num_rec=1)
+    assert figure_cache.hits == hits
+    session.undo()
+    with patch('app.run_job') as run_job_mock:
+        second = render_vis(session, 'test', 2, session.current_df, num_rec=1)
+        run_job_mock.assert_not_called()
+    assert figure_cache.hits == hits + 1
+    assert second.id == 2 and second.figure is first.figure
+    session_store.discard('figure-cache')
+
+
+def test_render_worker_failure():
+    # Test that visualisations are rendered inline if their rendering worker fails
+    session = session_store.get('worker-failure')
+    session.load(mock_duplicate_df.drop(columns='id'))
+    with patch.object(render_pool, 'render', side_effect=RuntimeError('The rendering worker exited unexpectedly')):
+        vis = render_vis(session, 'test', 0, session.current_df.copy(), num_rec=1)
+        vis_objects, graph_components = render_machine_view(session, [], session.current_df.copy(), [])
+    assert vis.output_type == 'plotly'
+    assert vis_objects[0].machine_view and vis_objects[0].rows == len(session.current_df)
+    assert len(graph_components) == 1
+    session_store.discard('worker-failure')
+
+
 ####################################################################
 ### Test the rendering and updating of duplicated rows on the UI ###
 
@@ -89,7 +209,7 @@ def test_update_missing_values():
 @pytest.mark.filterwarnings('ignore::DeprecationWarning')
 def test_render_duplicates():
     # Test normal behaviour of the initial render within the duplicate detection stage
-    with patch('app.current_df', mock_duplicate_df):
+    with patch.object(session_store.default_session, 'current_df', mock_duplicate_df):
         output_div = render_duplicates(1)
         df, dups_count = detect_duplicates(mock_duplicate_df)
         assert output_div is not None
@@ -103,7 +223,7 @@ def test_render_duplicates():
 def test_update_duplicates():
     # Test behaviour of subsequent renders during the duplicate detection stage
     df, dups_count = detect_duplicates(mock_duplicate_df)
-    with patch('app.current_df', df):
+    with patch.object(session_store.default_session, 'current_df', df):
         output_div = update_duplicates(['delete'], 1)
         assert output_div is not None
         # Verify output text correctness
@@ -119,7 +239,7 @@ def test_update_duplicates():
 @pytest.mark.filterwarnings('ignore::UserWarning')
 def test_render_outliers():
     # Test normal behaviour of the initial render within the outlier handling stage
-    with patch('app.current_df', mock_duplicate_df):
+    with patch.object(session_store.default_session, 'current_df', mock_duplicate_df):
         output_div, n_clicks = render_outliers(1, None)
         df, out_count = train_isolation_forest(mock_duplicate_df)
         assert out_count == 2
@@ -138,7 +258,7 @@ def test_update_outliers():
     df, out_count = train_isolation_forest(mock_duplicate_df)
     assert 'outlier' in df.columns
     assert out_count == 2
-    with patch('app.current_df', df):
+    with patch.object(session_store.default_session, 'current_df', df):
         output_div = update_outliers(['accept-0'], 1)
         assert output_div is not None
         # Verify output text
@@ -154,7 +274,7 @@ def test_update_outliers_more():
     df, out_count = train_isolation_forest(mock_duplicate_df)
     assert 'outlier' in df.columns
     assert out_count > 0
-    with patch('app.current_df', df):
+    with patch.object(session_store.default_session, 'current_df', df):
         # Simulate user input
         output_div = update_outliers(['more'], 1)
         assert output_div is not None
@@ -170,7 +290,7 @@ def test_update_outliers_less():
     df, out_count = train_isolation_forest(mock_duplicate_df)
     assert 'outlier' in df.columns
     assert out_count > 0
-    with patch('app.current_df', df):
+    with patch.object(session_store.default_session, 'current_df', df):
         # Simulate user input
         output_div = update_outliers(['less'], 1)
         assert output_div is not None
@@ -186,8 +306,8 @@ def test_update_outliers_2():
     df, out_count = train_isolation_forest(mock_duplicate_df)
     assert 'outlier' in df.columns
     assert out_count == 2
-    with patch('app.current_df', df):
-        with patch('app.stage', 'outlier-handling-2'):
+    with patch.object(session_store.default_session, 'current_df', df):
+        with patch.object(session_store.default_session, 'stage', 'outlier-handling-2'):
             # Simulate history of user interactions
             output_div = update_outliers_2(['less', 'accept'], 1)
             assert output_div is not None
@@ -204,8 +324,8 @@ def test_update_outliers_2_more():
     df, out_count = train_isolation_forest(mock_duplicate_df)
     assert 'outlier' in df.columns
     assert out_count > 0
-    with patch('app.current_df', df):
-        with patch('app.stage', 'outlier-handling-2'):
+    with patch.object(session_store.default_session, 'current_df', df):
+        with patch.object(session_store.default_session, 'stage', 'outlier-handling-2'):
             # Simulate history of user interactions
             output_div = update_outliers_2(['more', 'more-2'], 1)
             assert output_div is not None
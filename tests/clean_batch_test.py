@@ -0,0 +1,87 @@
+######################################################################
+### This file tests the batch-cleaning command-line entry point,   ###
+### including:                                                     ###
+### - Verifying the cleaned files and the report of every file     ###
+### - Ensuring that failing files do not stop the other files      ###
+### - Ensuring that neither Dash nor plotting libraries are loaded ###
+######################################################################
+
+import pytest
+import numpy as np
+import pandas as pd
+import json
+import subprocess
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from clean_batch import *
+
+
+################################
+### Specify testing fixtures ###
+
+@pytest.fixture
+def input_dir(tmp_path):
+    rng = np.random.default_rng(0)
+    length, width, species = rng.normal(5, 1, 40).round(2), rng.normal(3, 1, 40).round(2), rng.choice(['a', 'b'], 40)
+    length[[1, 7]] = np.nan
+    # Row 30 duplicates row 20
+    length[30], width[30], species[30] = length[20], width[20], species[20]
+    df = pd.DataFrame({'Length': length, 'Width': width, 'Species': species})
+    directory = tmp_path / 'inputs'
+    directory.mkdir()
+    df.to_csv(directory / 'first.csv', index=False)
+    df.head(20).to_csv(directory / 'second.csv', index=False)
+    (directory / 'empty.csv').write_text('')
+    return directory
+
+
+########################################
+### Test the batch cleaning of files ###
+
+def test_clean_inline(input_dir, tmp_path):
+    options = {'missing': 'impute-simple', 'duplicates': 'delete', 'contamination': 0.1, 'plan': None}
+    results = run_batch(find_files([str(input_dir), str(input_dir / 'missing.csv')]), str(tmp_path / 'out'), options, workers=0)
+    assert [os.path.basename(result['file']) for result in results] == ['empty.csv', 'first.csv', 'second.csv', 'missing.csv']
+    first = results[1]
+    assert first['status'] == 'ok'
+    assert (first['rows_read'], first['missing_values'], first['duplicates'], first['outliers']) == (40, 2, 1, 4)
+    assert set(first['seconds']) == {'load', 'missing_values', 'duplicates', 'outliers', 'write', 'total'}
+    cleaned = pd.read_csv(first['output'])
+    assert len(cleaned) == first['rows_written'] == 35
+    assert list(cleaned.columns) == ['length', 'width', 'species']
+    assert (results[0]['status'], results[0]['rows_written']) == ('ok', 0)
+    # A file that cannot be cleaned is reported instead of stopping the batch
+    assert results[3]['status'] == 'failed'
+    assert 'FileNotFoundError' in results[3]['error']
+
+
+def test_clean_in_worker_processes(input_dir, tmp_path):
+    output_dir = str(tmp_path / 'out')
+    status = main([str(input_dir / 'first.csv'), str(input_dir / 'second.csv'), '-o', output_dir, '--workers', '1', '--missing', 'delete', '--contamination', '0'])
+    assert status == 0
+    with open(os.path.join(output_dir, 'report.json')) as f:
+        report = json.load(f)
+    assert [result['rows_written'] for result in report['files']] == [37, 18]
+    assert all(result['outliers'] is None for result in report['files'])
+
+
+def test_output_names(input_dir, tmp_path):
+    # Test that inputs of the same name in different directories are written to different files
+    other_dir = tmp_path / 'other'
+    other_dir.mkdir()
+    pd.read_csv(input_dir / 'second.csv').head(5).to_csv(other_dir / 'second.csv', index=False)
+    options = {'missing': 'keep', 'duplicates': 'keep', 'contamination': 0, 'plan': None}
+    paths = find_files([str(input_dir / 'second.csv'), str(other_dir / 'second.csv'), str(input_dir / 'first.csv'), str(input_dir / 'first.csv')])
+    assert len(paths) == 3
+    results = run_batch(paths, str(tmp_path / 'out'), options, workers=0)
+    assert [os.path.basename(result['output']) for result in results] == ['inputs_second_clean.csv', 'other_second_clean.csv', 'first_clean.csv']
+    assert [len(pd.read_csv(result['output'])) for result in results] == [20, 5, 40]
+
+
+def test_no_user_interface_imports():
+    code = 'import sys, clean_batch; print(sorted({name.split(".")[0] for name in sys.modules} & {"dash", "matplotlib", "plotly", "lux", "altair"}))'
+    output = subprocess.run([sys.executable, '-c', code], cwd=os.path.join(os.path.dirname(__file__), '..'), capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == '[]'
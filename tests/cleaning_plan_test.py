@@ -0,0 +1,125 @@
+######################################################################
+### This file tests the recording and replay of cleaning plans,    ###
+### including:                                                     ###
+### - Verifying that undo forgets the steps since the checkpoint   ###
+###   and that plans survive serialisation                         ###
+### - Ensuring that a plan replayed on a file in chunks cleans it  ###
+###   like the interactive actions clean it in memory              ###
+######################################################################
+
+import pytest
+import numpy as np
+import pandas as pd
+import io
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from classes.cleaning_plan import *
+from classes.streaming_csv_reader import StreamingCsvReader
+from backend_magic.plan_replay import *
+from backend_magic.missing_value_detection import impute_missing_values, remove_missing_values
+from backend_magic.duplicate_detection import detect_duplicates
+
+
+################################
+### Specify testing fixtures ###
+
+@pytest.fixture
+def raw_df():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'ID': np.arange(60),
+        'Price ($)': rng.normal(10, 2, 60).round(1),
+        'Fuel-Type': rng.choice(['petrol', 'diesel'], 60),
+        'Doors': rng.choice([3, 5], 60)
+    })
+    df.loc[[3, 17, 41], 'Price ($)'] = np.nan
+    # Duplicates, some of which fall into different chunks than the rows they duplicate
+    df.loc[[10, 30, 55], ['Price ($)', 'Fuel-Type', 'Doors']] = df.loc[[2, 2, 20], ['Price ($)', 'Fuel-Type', 'Doors']].to_numpy()
+    return df
+
+
+# Return a reader of the CSV content of a DataFrame, parsing it in small chunks
+def csv_reader(df, chunk_rows=16):
+    content = df.to_csv(index=False).encode()
+    return StreamingCsvReader(lambda: io.BytesIO(content), chunk_rows=chunk_rows)
+
+
+# Load the data as the GUI does (normalised column names)
+def loaded(df):
+    return df.rename(columns=StreamingCsvReader.normalise_column_name)
+
+
+def replayed(plan, df, chunk_rows=16):
+    output = io.StringIO()
+    report = replay_plan(plan, csv_reader(df, chunk_rows), output)
+    output.seek(0)
+    return pd.read_csv(output), report
+
+
+######################################
+### Test the recording of the plan ###
+
+def test_record_and_undo(raw_df):
+    plan = CleaningPlan.from_frame(loaded(raw_df), 'cars.csv')
+    assert list(plan.columns) == ['id', 'price_', 'fuel_type', 'doors']
+    plan.record('drop_missing')
+    plan.checkpoint()
+    plan.record('drop_duplicates', mode='exact')
+    plan.record('remove_outliers', detector='isolation_forest', contamination=0.15)
+    plan.undo()
+    assert plan.steps == [{'step': 'drop_missing'}]
+    with pytest.raises(ValueError):
+        plan.record('sort')
+    with pytest.raises(ValueError):
+        plan.record('impute', method='simple', neighbours=3)
+
+
+def test_serialisation(raw_df):
+    plan = CleaningPlan.from_frame(loaded(raw_df), 'cars.csv')
+    plan.record('impute', method='KNN')
+    plan.record('drop_duplicates', mode='near', threshold=0.9)
+    restored = CleaningPlan.from_json(plan.to_json())
+    assert restored.to_dict() == plan.to_dict()
+
+
+####################################
+### Test the replay of the plan ###
+
+def test_replay_matches_interactive_cleaning(raw_df):
+    df = loaded(raw_df)
+    plan = CleaningPlan.from_frame(df)
+    plan.record('impute', method='simple')
+    plan.record('drop_duplicates', mode='exact')
+    # The same actions taken on the data in memory
+    expected, _ = detect_duplicates(impute_missing_values(df, 'simple'))
+    expected = expected[expected.duplicate != True].drop(columns='duplicate')
+
+    output, report = replayed(plan, raw_df)
+    pd.testing.assert_frame_equal(output, expected.reset_index(drop=True), check_dtype=False)
+    assert report['rows_read'] == 60
+    assert report['rows_written'] == len(expected)
+    assert report['steps'][1]['rows_removed'] == 60 - len(expected)
+    # Imputation is fitted in a pass of its own before the cleaned data is written
+    assert report['passes'] == 2
+
+
+def test_replay_drop_missing_and_outliers(raw_df):
+    plan = CleaningPlan.from_frame(loaded(raw_df))
+    plan.record('drop_missing')
+    plan.record('remove_outliers', detector='isolation_forest', contamination=0.1)
+    output, report = replayed(plan, raw_df)
+    assert len(remove_missing_values(loaded(raw_df))) == 57
+    assert report['steps'][0]['rows_removed'] == 3
+    # About a tenth of the remaining rows are removed as outliers
+    assert 3 <= report['steps'][1]['rows_removed'] <= 9
+    assert output.notna().all().all()
+
+
+def test_replay_rejects_other_schema(raw_df):
+    plan = CleaningPlan.from_frame(loaded(raw_df))
+    plan.record('drop_missing')
+    with pytest.raises(ValueError):
+        replayed(plan, raw_df.drop(columns='Doors'))
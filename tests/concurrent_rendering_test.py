@@ -0,0 +1,91 @@
+######################################################################
+### This file tests rendering visualisations concurrently, in      ###
+### several threads of one process, including:                    ###
+### - Verifying that recommended plots, parallel coordinates plots ###
+###   and Matplotlib charts rendered in a thread pool are          ###
+###   identical to the ones rendered one after another             ###
+### - Ensuring that no figures are left in pyplot's global state   ###
+######################################################################
+
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+import json
+import matplotlib.pyplot as plt
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from helper_functions import *
+from lux.vis.Vis import Vis as LuxVis
+from lux.vislib.matplotlib.MatplotlibRenderer import MatplotlibRenderer
+from classes.vis import build_vis
+
+# Number of threads rendering at the same time, and number of times every visualisation is rendered by them
+THREADS = 8
+REPEATS = 3
+
+
+################################
+### Specify testing fixtures ###
+
+@pytest.fixture
+def vis_df():
+    rng = np.random.default_rng(0)
+    n = 300
+    return pd.DataFrame({
+        'height': rng.normal(170, 10, n),
+        'weight': rng.normal(70, 5, n),
+        'age': rng.integers(18, 90, n),
+        'city': rng.choice(['Oslo', 'Rome', 'Lima'], n),
+        'date': pd.date_range('2021-01-01', periods=n, freq='D'),
+        'outlier': np.arange(n) % 10 == 0
+    })
+
+
+# Intents covering every chart type (histogram, bar, line, scatter with and without colour, heatmap)
+@pytest.fixture
+def intents():
+    return [['height'], ['city'], ['date', 'height'], ['height', 'weight'], ['height', 'weight', 'outlier'],
+            ['height', 'weight', 'age'], ['age', 'city']]
+
+
+# Render the same tasks one after another and in a thread pool, checking that the outputs are identical
+def check_concurrent(render, tasks):
+    serial = [render(task) for task in tasks]
+    plt.close('all')
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        concurrent = list(executor.map(render, tasks * REPEATS))
+    assert all(output is not None for output in serial)
+    assert concurrent == serial * REPEATS
+    # No figure was created through pyplot on the way
+    assert plt.get_fignums() == []
+
+
+##################################################
+### Test rendering visualisations concurrently ###
+
+def test_recommended_vis_concurrently(vis_df, intents):
+    def render(intent):
+        df = vis_df.copy()
+        df.intent = intent
+        vis = build_vis(0, df, enhance='outlier')
+        return vis.output_type, vis.columns, json.dumps(vis.payload, sort_keys=True, default=str)
+    check_concurrent(render, intents)
+
+
+def test_machine_view_concurrently(vis_df):
+    def render(columns):
+        vis = build_vis(0, vis_df[columns].copy(), machine_view=True)
+        return json.dumps(vis.payload, sort_keys=True, default=str)
+    check_concurrent(render, [['height', 'weight'], ['height', 'age', 'outlier'], ['weight', 'age']])
+
+
+def test_matplotlib_charts_concurrently(vis_df, intents):
+    def render(intent):
+        # The chart is drawn on its own figure and returned as a base64-encoded PNG
+        return MatplotlibRenderer(output_type='matplotlib_svg').create_vis(LuxVis(intent, vis_df.copy()))['config']
+    check_concurrent(render, intents)
+
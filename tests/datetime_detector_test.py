@@ -0,0 +1,72 @@
+######################################################################
+### This file tests the detection of datetime columns, including:  ###
+### - Verifying that datetime columns are converted with a format  ###
+###   inferred from a sample, and that the format is cached for    ###
+###   its dataset only                                             ###
+### - Ensuring that text columns are left unchanged                ###
+######################################################################
+
+import pytest
+import pandas as pd
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from classes.datetime_detector import *
+
+
+################################
+### Specify testing fixtures ###
+
+@pytest.fixture
+def mixed_df():
+    return pd.DataFrame({
+        'str': ['apple', 'banana', 'cherry', 'banana', 'date', 'elderberry'] * 50,
+        'reg': [' 2021-07-03 16:21:12', '2025-01-04 07:21:12', '2020-03-17 15:00:00', '2001-04-04 14:02:00', '2025-12-06 21:15:37', '2021-07-03 16:21:12'] * 50,
+        'flt': [1.0, 2.5, 3.8, 2.5, 5.9, 3.1] * 50
+    })
+
+
+####################################
+### Test the datetime detection ###
+
+def test_detect_and_convert(mixed_df):
+    detector = DatetimeDetector(sample_size=20)
+    output_df, formats = detector.parse(mixed_df.copy(), 'mixed.csv')
+    assert str(output_df['reg'].dtype).startswith('datetime64')
+    assert output_df['reg'].iloc[0] == pd.Timestamp('2021-07-03 16:21:12')
+    # Non-datetime columns are left unchanged
+    assert output_df['str'].equals(mixed_df['str'])
+    # The inferred format is returned, and cached for the column of the dataset
+    assert formats == {'reg': '%Y-%m-%d %H:%M:%S'}
+    assert detector.formats == {('mixed.csv', 'reg'): '%Y-%m-%d %H:%M:%S'}
+
+
+def test_formats_not_shared_between_datasets():
+    # Test that a column of the same name in another dataset does not re-use the cached format
+    detector = DatetimeDetector(sample_size=20)
+    day_first = pd.DataFrame({'date': ['13/01/2021', '02/03/2021', '25/12/2021', '07/08/2021'] * 10})
+    # Every value of the second dataset also parses day first, but with a different meaning
+    month_first = pd.DataFrame({'date': ['01/12/2021', '03/02/2021', '12/11/2021', '08/07/2021'] * 10})
+    _, formats = detector.parse(day_first.copy(), 'day_first.csv')
+    assert formats == {'date': '%d/%m/%Y'}
+    output_df, formats = detector.parse(month_first.copy(), 'month_first.csv')
+    assert formats == {'date': '%m/%d/%Y'}
+    assert output_df['date'].iloc[1] == pd.Timestamp('2021-03-02')
+
+
+def test_sample_decides_text_columns(mixed_df):
+    # Test that a text column is rejected based on its sample, without converting it in full
+    detector = DatetimeDetector(sample_size=20)
+    assert detector.detect('str', mixed_df['str']) is None
+    assert len(detector.sample(mixed_df['str'])) == 20
+
+
+def test_cached_formats_bounded():
+    # Test that the formats of the least recently used columns are evicted once too many are cached
+    detector = DatetimeDetector(sample_size=20, max_formats=2)
+    dates = pd.DataFrame({'date': ['2021-01-13', '2021-03-02', '2021-12-25', '2021-08-07'] * 10})
+    for dataset in ['first.csv', 'second.csv', 'third.csv']:
+        detector.parse(dates.copy(), dataset)
+    assert list(detector.formats) == [('second.csv', 'date'), ('third.csv', 'date')]
@@ -0,0 +1,73 @@
+######################################################################
+### This file tests the feature encoder used for model training,   ###
+### including:                                                     ###
+### - Verifying the encoding of numeric, datetime, boolean and     ###
+###   categorical columns into a single float32 matrix             ###
+### - Ensuring that encoders are compiled once per schema and      ###
+###   reused for every DataFrame of that schema                    ###
+######################################################################
+
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+from sklearn.preprocessing import LabelEncoder
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from classes.feature_encoder import *
+
+
+################################
+### Specify testing fixtures ###
+
+@pytest.fixture
+def mixed_df():
+    return pd.DataFrame({
+        'str': ['cherry', 'apple', 'banana', 'apple'],
+        'flt': [1.0, 2.5, np.nan, 0.5],
+        'int': [100, 200, 300, 200],
+        'date': pd.to_datetime(['2021-01-01', '2021-01-02', None, '1970-01-01']),
+        'flag': [True, False, True, True],
+        'outlier': [False, False, True, False]
+    })
+
+
+#############################
+### Test the encoded data ###
+
+def test_encode_mixed_types(mixed_df):
+    matrix = FeatureEncoder.for_frame(mixed_df).encode(mixed_df)
+    # The 'outlier' flags are not a feature
+    assert matrix.shape == (4, 5)
+    assert matrix.dtype == np.float32 and matrix.flags['C_CONTIGUOUS']
+    # Categories are numbered like LabelEncoder
+    assert matrix[:, 0].tolist() == LabelEncoder().fit_transform(mixed_df['str']).tolist()
+    assert np.array_equal(matrix[:, 1], mixed_df['flt'].to_numpy(dtype=np.float32), equal_nan=True)
+    assert matrix[:, 2].tolist() == [100, 200, 300, 200]
+    # Datetimes become epoch seconds, and missing timestamps become NaN
+    assert matrix[[0, 1, 3], 3].tolist() == [1609459200, 1609545600, 0]
+    assert np.isnan(matrix[2, 3])
+    assert matrix[:, 4].tolist() == [1, 0, 1, 1]
+
+
+def test_encode_unsortable_categories():
+    # Values of different types are still encoded
+    df = pd.DataFrame({'mixed': ['a', 1, 'b', 1]})
+    matrix = FeatureEncoder.for_frame(df).encode(df)
+    codes = matrix[:, 0].tolist()
+    assert codes[1] == codes[3] and len(set(codes)) == 3
+
+
+######################################
+### Test the cache of the encoders ###
+
+def test_encoder_reused_per_schema(mixed_df):
+    encoder = FeatureEncoder.for_frame(mixed_df)
+    # A different version of the data with the same schema reuses the compiled encoder
+    assert FeatureEncoder.for_frame(mixed_df.iloc[:2].drop('outlier', axis=1)) is encoder
+    # A change of a column type compiles a new encoder
+    changed_df = mixed_df.assign(int=mixed_df['int'].astype(str))
+    assert FeatureEncoder.for_frame(changed_df) is not encoder
+    assert FeatureEncoder.for_frame(changed_df).categorical == [(0, 'str'), (2, 'int')]
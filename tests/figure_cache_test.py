@@ -0,0 +1,118 @@
+######################################################################
+### This file tests the cache of rendered visualisations,          ###
+### including:                                                     ###
+### - Verifying that keys change with the version of the data, the ###
+###   intent and the parameters of a Vis                           ###
+### - Ensuring that cached figures are returned under new IDs and  ###
+###   that the least recently used ones are evicted                ###
+######################################################################
+
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from helper_functions import *
+from classes.figure_cache import *
+from classes.vis import Vis
+
+
+################################
+### Specify testing fixtures ###
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        'str': ['apple', 'banana', 'cherry', 'banana'],
+        'flt': [1.0, 2.5, np.nan, 2.5],
+        'int': [100, 200, 300, 200]
+    })
+
+
+# Stand-in for a rendered Vis with a figure of the given size
+class FakeVis:
+
+    def __init__(self, id, size=0):
+        self.id = id
+        self.figure = {'data': [{'x': list(range(size))}]}
+        self.payload_bytes = size
+
+
+######################
+### Test the keys ###
+
+def test_key_of_version(df):
+    assert FigureCache.key('v1', df, enhance='outlier') == FigureCache.key('v1', df.copy(), enhance='outlier')
+    assert FigureCache.key('v1', df) != FigureCache.key('v2', df)
+
+
+def test_key_of_vis_parameters(df):
+    assert FigureCache.key('v1', df) != FigureCache.key('v1', df, enhance='outlier')
+    assert FigureCache.key('v1', df, num_rec=1, temporary=True) == FigureCache.key('v1', df, temporary=True, num_rec=1)
+    with_intent = df.copy()
+    with_intent.intent = ['flt', 'int']
+    assert FigureCache.key('v1', df) != FigureCache.key('v1', with_intent)
+
+
+def test_key_without_version(df):
+    # Data that is not a version of a dataset (e.g. a preview sample) is not cached
+    assert FigureCache.key(None, df) is None
+    cache = FigureCache()
+    assert not cache.put(None, FakeVis(0))
+    assert cache.get(None, 0) is None
+
+
+################################
+### Test the cached figures ###
+
+def test_get_under_new_id(df):
+    cache = FigureCache()
+    key = FigureCache.key('v1', df)
+    assert cache.get(key, 0) is None
+    vis = FakeVis(0)
+    cache.put(key, vis)
+    cached = cache.get(key, 5)
+    assert cached.id == 5 and vis.id == 0
+    assert cached.figure is vis.figure
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_evict_least_recently_used():
+    cache = FigureCache(max_entries=2)
+    cache.put('a', FakeVis(0))
+    cache.put('b', FakeVis(1))
+    cache.get('a', 2)
+    cache.put('c', FakeVis(3))
+    assert cache.get('b', 4) is None
+    assert cache.get('a', 4) is not None and cache.get('c', 4) is not None
+
+
+def test_evict_by_size():
+    cache = FigureCache(max_bytes=20000)
+    cache.put('small', FakeVis(0, 10))
+    cache.put('large', FakeVis(1, 5000))
+    assert len(cache) == 2 and cache.total_bytes == FigureCache.size_of(FakeVis(0, 10)) + FigureCache.size_of(FakeVis(1, 5000))
+    cache.put('larger', FakeVis(2, 6000))
+    assert cache.get('small', 3) is None
+    assert cache.total_bytes <= 20000
+    # Figures exceeding the whole budget are not cached
+    assert not cache.put('huge', FakeVis(4, 100000))
+    cache.clear()
+    assert len(cache) == 0 and cache.total_bytes == 0
+
+
+def test_cached_vis():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'height': rng.normal(170, 10, 50), 'weight': rng.normal(70, 5, 50)})
+    cache = FigureCache()
+    key = FigureCache.key('v1', df)
+    vis = Vis(0, df.copy())
+    cache.put(key, vis)
+    assert cache.total_bytes == 2 * vis.payload_bytes + ENTRY_OVERHEAD_BYTES
+    cached = cache.get(FigureCache.key('v1', df.copy()), 1)
+    assert cached.output_type == vis.output_type == 'plotly'
+    assert cached.columns == vis.columns
+    assert cached.figure is vis.figure
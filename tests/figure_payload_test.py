@@ -0,0 +1,143 @@
+######################################################################
+### This file tests the compaction of the figures sent to the      ###
+### browser, including:                                            ###
+### - Verifying that large numeric arrays are encoded as typed     ###
+###   arrays which decode to the original values                   ###
+### - Ensuring that labels, dates and small arrays are kept as     ###
+###   lists, and that the payloads of visualisations shrink        ###
+### - Checking that payload sizes are only measured when reported  ###
+######################################################################
+
+import pytest
+import base64
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend_magic.figure_payload import *
+from classes.vis import Vis
+from classes.graph_component import Graph_component
+
+
+################################
+### Specify testing fixtures ###
+
+@pytest.fixture
+def vis_df():
+    rng = np.random.default_rng(0)
+    n = 2000
+    return pd.DataFrame({
+        'height': rng.normal(170, 10, n),
+        'weight': rng.normal(70, 5, n),
+        'age': rng.integers(18, 90, n),
+        'outlier': np.arange(n) % 10 == 0
+    })
+
+
+# Decode a typed array specification back into an array of numbers
+def decode(spec):
+    dtype = np.dtype(spec['dtype']).newbyteorder('<')
+    array = np.frombuffer(base64.b64decode(spec['bdata']), dtype=dtype)
+    if 'shape' in spec:
+        array = array.reshape([int(size) for size in spec['shape'].split(',')])
+    return array
+
+
+###############################
+### Test the typed arrays ###
+
+def test_typed_array_floats():
+    values = np.random.default_rng(1).normal(size=1000)
+    spec = typed_array(values.tolist())
+    assert spec['dtype'] == 'f8'
+    assert np.array_equal(decode(spec), values)
+
+
+def test_typed_array_integers():
+    # Integers are sent in the smallest type holding them, and 64-bit integers beyond 32 bits as floats
+    assert typed_array(list(range(200)))['dtype'] == 'u1'
+    assert typed_array([-1, 200])['dtype'] == 'i2'
+    assert typed_array(np.arange(70000, dtype=np.int64))['dtype'] == 'u4'
+    spec = typed_array([0, 2**40])
+    assert spec['dtype'] == 'f8'
+    assert decode(spec).tolist() == [0, 2**40]
+
+
+def test_typed_array_two_dimensional():
+    values = np.arange(12, dtype=float).reshape(3, 4)
+    spec = typed_array(values.tolist())
+    assert spec['shape'] == '3,4'
+    assert np.array_equal(decode(spec), values)
+
+
+def test_typed_array_not_numeric():
+    assert typed_array(['a', 'b']) is None
+    assert typed_array([1.0, None]) is None
+    assert typed_array(pd.date_range('2021-01-01', periods=3).to_numpy()) is None
+    assert typed_array([True, False]) is None
+    assert typed_array([[1, 2], [3]]) is None
+
+
+################################
+### Test the compact figures ###
+
+def test_compact_figure():
+    n = 500
+    figure = {
+        'data': [{'type': 'scatter', 'x': list(range(n)), 'y': np.linspace(0, 1, n).tolist(), 'text': list(range(n)),
+                  'marker': {'color': np.linspace(0, 1, n).tolist(), 'size': [3, 4]}}],
+        'layout': {'xaxis': {'tickvals': list(range(n))}}
+    }
+    compact = compact_figure(figure, min_length=100)
+    trace = compact['data'][0]
+    assert np.array_equal(decode(trace['x']), np.arange(n))
+    assert np.array_equal(decode(trace['marker']['color']), figure['data'][0]['marker']['color'])
+    # Labels, small arrays and the layout are kept as they are, and the original figure is not modified
+    assert trace['text'] == list(range(n))
+    assert trace['marker']['size'] == [3, 4]
+    assert compact['layout'] is figure['layout']
+    assert isinstance(figure['data'][0]['x'], list)
+
+
+def test_compact_parallel_coordinates(vis_df):
+    vis = Vis(0, vis_df, machine_view=True)
+    assert isinstance(vis.payload, dict)
+    for dimension, values in zip(vis.payload['data'][0]['dimensions'], vis.figure.data[0].dimensions):
+        assert np.array_equal(decode(dimension['values']), values['values'])
+    # The payload is smaller than the original figure
+    assert payload_size(vis.payload) < payload_size(vis.figure)
+    assert vis.rows == len(vis_df)
+
+
+def test_compact_recommended_vis(vis_df):
+    vis_df.intent = ['height', 'weight']
+    vis = Vis(0, vis_df)
+    assert vis.output_type == 'plotly'
+    assert payload_size(vis.payload) < payload_size(vis.figure)
+    # The graph on the GUI shows the compact figure
+    graph = Graph_component(vis)
+    assert graph.div.children[0].figure is vis.payload
+
+
+def test_estimated_payload_size(vis_df, monkeypatch):
+    # Unless the payloads are reported, their size is estimated without serialising the figure again
+    monkeypatch.setattr(sys.modules['backend_magic.figure_payload'], 'payload_size', None)
+    vis = Vis(0, vis_df, machine_view=True)
+    monkeypatch.undo()
+    exact = payload_size(vis.payload)
+    assert 0.75 * exact <= vis.payload_bytes <= exact
+
+
+def test_measured_payload_size(vis_df, monkeypatch):
+    monkeypatch.setattr(sys.modules['backend_magic.figure_payload'], 'REPORT_PAYLOADS', True)
+    vis = Vis(0, vis_df, machine_view=True)
+    assert vis.payload_bytes == payload_size(vis.payload)
+
+
+def test_report_payload(capsys, monkeypatch):
+    monkeypatch.setattr(sys.modules['backend_magic.figure_payload'], 'REPORT_PAYLOADS', True)
+    report_payload(3, 2000, 100)
+    assert capsys.readouterr().out.strip() == 'Figure 3: 2000 bytes for 100 rows (20.0 bytes per row)'
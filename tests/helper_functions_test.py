@@ -9,6 +9,7 @@ import pytest
 import pandas as pd
 import sys
 import os
+from unittest.mock import patch
 
 # Add the parent directory (ai-assistant/) to the path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -101,5 +102,22 @@ def test_extract_vis_columns():
 @pytest.mark.filterwarnings('ignore:Could not infer format, so each element will be parsed individually:UserWarning')
 def test_parse_datetime_cols(timestamp_df):
     # Test the automatic parsing of datetime columns to datetime objects
-    output_df = parse_datetime_cols(timestamp_df)
+    output_df, formats = parse_datetime_cols(timestamp_df)
     assert 'reg' in output_df.columns
+    assert str(output_df['reg'].dtype).startswith('datetime64')
+    assert formats == {'reg': '%Y-%m-%d %H:%M:%S.%f'}
+
+
+@pytest.mark.filterwarnings('ignore:Could not infer format, so each element will be parsed individually:UserWarning')
+def test_parse_contents_cached(timestamp_df, tmp_path):
+    # Test that uploading the same content twice re-uses the cached, already parsed DataFrame and datetime formats
+    contents = 'data:text/csv;base64,' + base64.b64encode(timestamp_df.to_csv(index=False).encode('utf-8')).decode('utf-8')
+    with patch.object(dataset_cache, 'cache_dir', str(tmp_path)):
+        first_df, first_formats, first_key = parse_contents(contents, 'timestamps.csv')
+        with patch('helper_functions.parse_datetime_cols') as parse_mock:
+            second_df, second_formats, second_key = parse_contents(contents, 'timestamps.csv')
+            parse_mock.assert_not_called()
+    assert str(second_df['reg'].dtype).startswith('datetime64')
+    pd.testing.assert_frame_equal(pd.DataFrame(first_df), pd.DataFrame(second_df))
+    assert first_formats == second_formats == {'reg': '%Y-%m-%d %H:%M:%S.%f'}
+    assert first_key == second_key
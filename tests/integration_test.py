@@ -30,6 +30,13 @@ mock_current_df = pd.DataFrame({
 })
 
 
+# Jobs run in the calling thread, so that every callback returns its output rather than waiting for a worker
+@pytest.fixture(autouse=True)
+def inline_jobs(tmp_path):
+    with patch('app.job_runner', JobRunner(max_workers=0, job_dir=str(tmp_path))):
+        yield
+
+
 ####################################################################
 ### Helper functions for the testing of text rendered on the GUI ###
 
@@ -51,7 +58,7 @@ def extract_text_from_dash_component(component):
 @pytest.mark.filterwarnings('ignore::DeprecationWarning')
 @pytest.mark.filterwarnings('ignore::UserWarning')
 def test_missing_value_stage():
-    with patch('app.current_df', mock_current_df):
+    with patch.object(session_store.default_session, 'current_df', mock_current_df):
         # Test initial render of missing values
         output_div = render_missing_values(1)
         missing_df, missing_val = detect_missing_values(mock_current_df)
@@ -76,7 +83,7 @@ def test_missing_value_stage():
 @pytest.mark.filterwarnings('ignore::DeprecationWarning')
 @pytest.mark.filterwarnings('ignore::UserWarning')
 def test_duplicate_removal_stage():
-    with patch('app.current_df', mock_current_df):
+    with patch.object(session_store.default_session, 'current_df', mock_current_df):
         # Test initial render of duplicated rows
         output_div = render_duplicates(1)
         df, dups_count = detect_duplicates(mock_current_df)
@@ -84,14 +91,14 @@ def test_duplicate_removal_stage():
         output_text = extract_text_from_dash_component(output_div)
         assert f'{dups_count} duplicated rows were detected' in output_text
 
-    with patch('app.current_df', df):
+    with patch.object(session_store.default_session, 'current_df', df):
         # Test displaying of duplicated rows
         output_div = update_duplicates(['highlight'], 1)
         assert output_div is not None
         output_text = extract_text_from_dash_component(output_div)
         assert 'Selected action: Highlight duplicated rows' in output_text
 
-    with patch('app.current_df', df):
+    with patch.object(session_store.default_session, 'current_df', df):
         # Test removal of duplicated rows
         output_div = update_duplicates(['delete'], 1)
         assert output_div is not None
@@ -103,7 +110,7 @@ def test_duplicate_removal_stage():
 @pytest.mark.filterwarnings('ignore::DeprecationWarning')
 @pytest.mark.filterwarnings('ignore::UserWarning')
 def test_outlier_handling_stage():
-    with patch('app.current_df', mock_current_df):
+    with patch.object(session_store.default_session, 'current_df', mock_current_df):
         # Test initial render of outlier values
         output_div, n_clicks = render_outliers(1, None)
         df, out_count = train_isolation_forest(mock_current_df)
@@ -121,7 +128,7 @@ def test_outlier_handling_stage():
         assert 'Selected action: Remove the detected outliers' in output_text
         assert '1 outlier values were detected' in output_text
 
-    with patch('app.current_df', df):
+    with patch.object(session_store.default_session, 'current_df', df):
         # Test detection a greater amount of outliers
         output_div = update_outliers(['more'], 1)
         assert output_div is not None
@@ -129,7 +136,7 @@ def test_outlier_handling_stage():
         assert 'Selected action: Find more outliers' in output_text
         assert '3 outlier values were detected' in output_text
 
-    with patch('app.current_df', df):
+    with patch.object(session_store.default_session, 'current_df', df):
         # Test detecting a smaller amount of outliers
         output_div = update_outliers(['less'], 1)
         assert output_div is not None
@@ -144,9 +151,9 @@ def test_outlier_handling_2_stage():
     df, out_count = train_isolation_forest(mock_current_df)
     assert 'outlier' in df.columns
     assert out_count == 2
-    with patch('app.current_df', df):
+    with patch.object(session_store.default_session, 'current_df', df):
         # Test removal of new potential outliers
-        with patch('app.stage', 'outlier-handling-2'):
+        with patch.object(session_store.default_session, 'stage', 'outlier-handling-2'):
             output_div = update_outliers_2(['less', 'accept'], 1)
             assert output_div is not None
             output_text = extract_text_from_dash_component(output_div)
@@ -0,0 +1,87 @@
+######################################################################
+### This file tests the background job runner, including:          ###
+### - Verifying that results are returned from worker processes    ###
+### - Ensuring that a newer job cancels a superseded job of the    ###
+###   same slot, and that failed jobs are no longer shown as       ###
+###   running                                                      ###
+######################################################################
+
+import pytest
+import time
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from classes.job_runner import *
+
+
+##############################################
+### Jobs executed in the worker processes ###
+
+def add(a, b):
+    report_progress(0.5, 'Adding')
+    return a + b
+
+
+def fail(message):
+    report_progress(0.5, 'Failing')
+    raise ValueError(message)
+
+
+def slow_count(steps):
+    for i in range(steps):
+        report_progress(i / steps, 'Counting')
+        time.sleep(0.05)
+    return steps
+
+
+################################
+### Specify testing fixtures ###
+
+@pytest.fixture
+def runner(tmp_path):
+    runner = JobRunner(max_workers=2, job_dir=str(tmp_path))
+    yield runner
+    runner.shutdown()
+
+
+###########################
+### Test the job runner ###
+
+def test_run_job(runner):
+    # Test normal behaviour of a job run in a worker process, which is submitted without waiting for it
+    job_id = runner.submit(('session', 'slot'), slow_count, 10)
+    assert not runner.done(job_id)
+    assert runner.result(job_id) == 10
+    assert runner.slot_status(('session', 'slot'))['state'] == 'done'
+
+
+def test_inline_run_job(tmp_path):
+    # Test that jobs run in the calling thread if no worker processes are configured
+    runner = JobRunner(max_workers=0, job_dir=str(tmp_path))
+    job_id = runner.submit(('session', 'slot'), add, 2, 3)
+    assert runner.done(job_id)
+    assert runner.result(job_id) == 5
+    assert runner.executor is None
+
+
+def test_superseded_job_is_cancelled(runner):
+    # Test that a newer job of the same slot cancels the previous one
+    first = runner.submit(('session', 'slot'), slow_count, 100)
+    time.sleep(0.5)
+    second = runner.submit(('session', 'slot'), add, 1, 1)
+    with pytest.raises(JobCancelled):
+        runner.result(first)
+    assert runner.result(second) == 2
+    assert runner.status(first)['state'] == 'cancelled'
+
+
+def test_failed_job(runner):
+    # Test that the error of a job is raised in the calling thread and recorded in the job's status
+    job_id = runner.submit(('session', 'slot'), fail, 'Broken data')
+    with pytest.raises(ValueError):
+        runner.result(job_id)
+    status = runner.slot_status(('session', 'slot'))
+    assert status['state'] == 'failed'
+    assert status['message'] == 'Broken data'
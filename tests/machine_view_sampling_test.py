@@ -0,0 +1,87 @@
+######################################################################
+### This file tests the sampling of the machine view, including:   ###
+### - Verifying that the sample is bounded and keeps the rows      ###
+###   flagged as outliers or duplicates, and missing values        ###
+### - Ensuring that the sampling ratio is recorded in the figure   ###
+######################################################################
+
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend_magic.machine_view_sampling import *
+
+
+################################
+### Specify testing fixtures ###
+
+@pytest.fixture
+def flagged_df():
+    rng = np.random.default_rng(0)
+    n = 10000
+    df = pd.DataFrame({'a': rng.normal(size=n), 'b': rng.normal(size=n)})
+    df.loc[df.index % 500 == 1, 'b'] = np.nan
+    df['outlier'] = df.index % 200 == 0
+    df['duplicate'] = df.index % 1000 == 3
+    return df
+
+
+#############################
+### Test the sampled rows ###
+
+def test_small_data_unchanged(flagged_df):
+    sample, ratio = machine_view_sample(flagged_df, max_rows=len(flagged_df))
+    assert sample is flagged_df
+    assert ratio == 1.0
+
+
+def test_sample_keeps_flagged_rows(flagged_df):
+    sample, ratio = machine_view_sample(flagged_df, max_rows=500)
+    assert len(sample) == 500
+    assert ratio == 500 / len(flagged_df)
+    # All outliers, duplicates and rows with missing values are kept
+    assert sample['outlier'].sum() == flagged_df['outlier'].sum()
+    assert sample['duplicate'].sum() == flagged_df['duplicate'].sum()
+    assert sample['b'].isna().sum() == flagged_df['b'].isna().sum()
+    # The rows keep their order
+    assert sample.index.is_monotonic_increasing
+
+
+def test_sample_of_flagged_rows(flagged_df):
+    # With more rows to keep than fit, these are sampled in proportion to their flags and missing values
+    sample, _ = machine_view_sample(flagged_df, max_rows=40)
+    assert len(sample) == 40
+    assert kept_rows(sample).all()
+    assert sample['outlier'].sum() > 0 and sample['duplicate'].sum() > 0 and sample['b'].isna().sum() > 0
+
+
+def test_sample_is_reproducible(flagged_df):
+    first, _ = machine_view_sample(flagged_df, max_rows=500)
+    second, _ = machine_view_sample(flagged_df, max_rows=500)
+    assert first.index.equals(second.index)
+
+
+def test_machine_view_figure(flagged_df):
+    from classes.vis import Vis
+    vis = Vis(0, flagged_df, machine_view=True)
+    meta = vis.figure.layout.meta
+    assert meta['rows'] == len(flagged_df)
+    assert meta['sampled_rows'] == min(len(flagged_df), MACHINE_VIEW_MAX_ROWS)
+    assert vis.sampling_ratio == meta['sampling_ratio']
+    assert len(vis.figure.data[0].dimensions[0].values) == meta['sampled_rows']
+    assert vis.columns == list(flagged_df.columns)
+
+
+def test_machine_view_of_sample(flagged_df):
+    # Test that a sample drawn beforehand is drawn as it is, reporting the rows of the data it was drawn from
+    from classes.vis import Vis
+    sample, ratio = machine_view_sample(flagged_df, max_rows=500)
+    vis = Vis(0, sample, machine_view=True, rows=len(flagged_df))
+    meta = vis.figure.layout.meta
+    assert meta['rows'] == vis.rows == len(flagged_df)
+    assert meta['sampled_rows'] == len(sample)
+    assert vis.sampling_ratio == ratio
@@ -0,0 +1,73 @@
+######################################################################
+### This file tests the bit-packed matrix of missing values,       ###
+### including:                                                     ###
+### - Verifying the patterns and co-missingness counted from bits  ###
+###   against the boolean masks of pandas                          ###
+### - Ensuring that the recommendation follows the patterns        ###
+######################################################################
+
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from classes.missing_pattern_matrix import *
+from classes.missing_value_index import MissingValueIndex
+from backend_magic.missing_value_patterns import *
+
+
+################################
+### Specify testing fixtures ###
+
+@pytest.fixture
+def missing_df():
+    # More than 64 rows, so that patterns span several words
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(150, 5)), columns=['a', 'b', 'c', 'd', 'e'])
+    df.loc[rng.random(150) < 0.3, 'a'] = np.nan
+    df.loc[df['a'].isna() & (rng.random(150) < 0.8), 'b'] = np.nan
+    df.loc[rng.random(150) < 0.1, 'c'] = np.nan
+    df['f'] = rng.choice(['x', None], size=150)
+    return df
+
+
+###########################################
+### Test the bit-packed missing values ###
+
+def test_patterns_match_pandas(missing_df):
+    matrix = MissingPatternMatrix.from_frame(missing_df)
+    mask = missing_df.isna()
+    assert matrix.column_counts().to_dict() == mask.sum().to_dict()
+    # Every pattern counted from the bits matches the rows of the boolean mask
+    expected = {tuple(col for col, missing in zip(mask.columns, key) if missing): count
+                for key, count in mask.value_counts().items()}
+    assert dict(matrix.top_patterns(k=len(expected))) == expected
+    for columns, count in expected.items():
+        assert matrix.pattern_count(columns) == count
+    assert matrix.pattern_count(['d']) == 0
+    # Columns without missing values are left out of the co-missingness
+    nulls = mask.loc[:, mask.any()].astype(int)
+    assert matrix.co_missingness().to_dict() == (nulls.T @ nulls).to_dict()
+
+
+def test_from_index(missing_df):
+    from_frame = MissingPatternMatrix.from_frame(missing_df)
+    from_index = MissingPatternMatrix.from_index(MissingValueIndex.from_frame(missing_df), len(missing_df))
+    assert np.array_equal(from_frame.bits, from_index.bits)
+    assert from_index.nbytes == 6 * 3 * 8
+
+
+def test_recommendation(missing_df):
+    matrix = MissingPatternMatrix.from_frame(missing_df)
+    # Columns a and b are mostly missing together
+    action, reason = recommend_missing_value_action(matrix)
+    assert action == 'impute-KNN'
+    assert co_missing_table(matrix, k=1)[['column', 'other column']].iloc[0].tolist() == ['a', 'b']
+    assert pattern_table(matrix)['rows'].sum() == (missing_df.isna().any(axis=1)).sum()
+    # Few incomplete rows are deleted, and complete data needs no action
+    sparse = pd.DataFrame({'a': [np.nan] + [1.0] * 99, 'b': [1.0] * 100})
+    assert recommend_missing_value_action(MissingPatternMatrix.from_frame(sparse))[0] == 'delete'
+    assert recommend_missing_value_action(MissingPatternMatrix.from_frame(sparse.fillna(0)))[0] is None
@@ -0,0 +1,68 @@
+######################################################################
+### This file tests the index of missing values, including:        ###
+### - Verifying the counts and masks derived from the index        ###
+### - Ensuring that incremental updates after row deletions and    ###
+###   imputations match an index rebuilt from scratch              ###
+######################################################################
+
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from classes.missing_value_index import *
+from backend_magic.missing_value_detection import *
+
+
+################################
+### Specify testing fixtures ###
+
+@pytest.fixture
+def missing_df():
+    return pd.DataFrame({
+        'id': [0, 1, 2, 3, 4, 5],
+        'str': ['apple', np.nan, 'cherry', 'banana', np.nan, 'fig'],
+        'flt': [1.0, np.nan, 3.8, np.nan, 5.9, 3.1],
+        'int': [100, 200, 300, 200, -2, 400]
+    })
+
+
+# Check that an incrementally updated index matches an index rebuilt from the data
+def assert_index_matches(index, df):
+    rebuilt = MissingValueIndex.from_frame(df)
+    pd.testing.assert_series_equal(index.column_counts(), rebuilt.column_counts())
+    assert np.array_equal(index.row_counts, rebuilt.row_counts)
+
+
+####################################
+### Test the missing value index ###
+
+def test_counts_match_detection(missing_df):
+    index = MissingValueIndex.from_frame(missing_df)
+    expected_df, expected_count = detect_missing_values(missing_df)
+    output_df, output_count = detect_missing_values(missing_df, index)
+    assert output_count == expected_count == 4
+    pd.testing.assert_frame_equal(output_df, expected_df)
+    assert index.any_null_mask().tolist() == [False, True, False, True, True, False]
+
+
+def test_drop_rows(missing_df):
+    index = MissingValueIndex.from_frame(missing_df)
+    keep_mask = ~index.any_null_mask()
+    updated = index.drop_rows(keep_mask)
+    assert updated.total() == 0
+    assert_index_matches(updated, remove_missing_values(missing_df, index))
+    # The original index is left unchanged, so that it can be restored on undo
+    assert index.total() == 4
+
+
+def test_fill_after_imputation(missing_df):
+    index = MissingValueIndex.from_frame(missing_df)
+    imputed_df = impute_missing_values(missing_df)
+    updated = index.fill(imputed_df)
+    # Only the numeric column was imputed
+    assert updated.column_counts().to_dict() == {'id': 0, 'str': 2, 'flt': 0, 'int': 0}
+    assert_index_matches(updated, imputed_df)
@@ -0,0 +1,147 @@
+######################################################################
+### This file tests the Plotly renderer of Lux visualisations,     ###
+### including:                                                     ###
+### - Verifying the figures of bar, line, histogram, scatter and   ###
+###   heatmap marks, built directly from the data of a Vis         ###
+### - Ensuring that the figures are valid Plotly figures and that  ###
+###   recommended plots are rendered without Matplotlib            ###
+######################################################################
+
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+import plotly.graph_objects as go
+import plotly.io as pio
+import matplotlib.pyplot as plt
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from helper_functions import *
+from lux.vis.Vis import Vis as LuxVis
+from classes.vis import Vis, CATEGORICAL_COLOURSCALE
+
+
+################################
+### Specify testing fixtures ###
+
+@pytest.fixture
+def vis_df():
+    rng = np.random.default_rng(0)
+    n = 200
+    return pd.DataFrame({
+        'height': rng.normal(170, 10, n),
+        'weight': rng.normal(70, 5, n),
+        'city': rng.choice(['Oslo', 'Rome', 'Lima'], n),
+        'date': pd.date_range('2021-01-01', periods=n, freq='D'),
+        'outlier': np.arange(n) % 10 == 0
+    })
+
+
+# Enough rows for Lux to bin scatter plots into heatmaps
+@pytest.fixture
+def large_df():
+    rng = np.random.default_rng(1)
+    n = 20000
+    return pd.DataFrame({
+        'height': rng.normal(170, 10, n),
+        'weight': rng.normal(70, 5, n),
+        'age': rng.integers(18, 90, n)
+    })
+
+
+def render(intent, df, colorscale=None):
+    figure = LuxVis(intent, df).to_plotly(colorscale=colorscale)
+    # Every figure must be a valid, serialisable Plotly figure
+    go.Figure(figure)
+    pio.to_json(figure)
+    return figure
+
+
+##########################
+### Test the chart types ###
+
+def test_histogram(vis_df):
+    figure = render(['height'], vis_df)
+    assert [trace['type'] for trace in figure['data']] == ['bar']
+    assert sum(figure['data'][0]['y']) == len(vis_df)
+    assert figure['layout']['xaxis']['title']['text'] == 'height (binned)'
+    assert figure['layout']['yaxis']['title']['text'] == 'Number of Records'
+
+
+def test_bar_chart(vis_df):
+    figure = render(['city'], vis_df)
+    bars = figure['data'][0]
+    assert bars['orientation'] == 'h'
+    assert sorted(bars['y']) == ['Lima', 'Oslo', 'Rome']
+    assert sum(bars['x']) == len(vis_df)
+    assert figure['layout']['yaxis']['autorange'] == 'reversed'
+
+
+def test_bar_chart_top_bars():
+    df = pd.DataFrame({'category': ['c' + str(i) for i in range(30) for _ in range(i + 1)]})
+    figure = render(['category'], df)
+    # Only the largest bars are drawn, with a note of the remaining ones
+    assert len(figure['data'][0]['y']) == lux.config.number_of_bars
+    assert 'c29' in figure['data'][0]['y']
+    assert str(30 - lux.config.number_of_bars) + ' more' in figure['layout']['annotations'][0]['text']
+
+
+def test_line_chart_with_colour(vis_df):
+    figure = render(['date', 'height', 'city'], vis_df)
+    assert [trace['name'] for trace in figure['data']] == ['Lima', 'Oslo', 'Rome']
+    assert all(trace['mode'] == 'lines' for trace in figure['data'])
+    assert figure['layout']['legend']['title']['text'] == 'city'
+    assert figure['layout']['yaxis']['title']['text'] == 'Mean of height'
+
+
+def test_scatter_chart_categorical_colour(vis_df):
+    figure = render(['height', 'weight', 'outlier'], vis_df, CATEGORICAL_COLOURSCALE)
+    inliers, outliers = figure['data']
+    assert (inliers['name'], outliers['name']) == ('False', 'True')
+    assert len(outliers['x']) == vis_df['outlier'].sum()
+    assert len(inliers['x']) + len(outliers['x']) == len(vis_df)
+    # Non-outliers are drawn in green and outliers in red
+    assert inliers['marker']['color'] == 'rgb(0, 104, 55)'
+    assert outliers['marker']['color'] == 'rgb(165, 0, 38)'
+
+
+def test_scatter_chart_quantitative_colour(vis_df):
+    vis_df['age'] = np.arange(len(vis_df))
+    figure = render(['height', 'weight', 'age'], vis_df)
+    scatter, = figure['data']
+    assert scatter['marker']['colorscale'] == 'Blues'
+    assert scatter['marker']['color'] == list(range(len(vis_df)))
+
+
+def test_heatmap(large_df):
+    figure = render(['height', 'weight'], large_df)
+    heatmap, = figure['data']
+    assert heatmap['type'] == 'heatmap'
+    # One row of bins per y value and one column per x value
+    assert len(heatmap['z']) == len(heatmap['y'])
+    assert all(len(row) == len(heatmap['x']) for row in heatmap['z'])
+    assert figure['layout']['xaxis']['title']['text'] == 'height'
+
+
+def test_heatmap_with_colour(large_df):
+    figure = render(['height', 'weight', 'age'], large_df)
+    heatmap, = figure['data']
+    assert heatmap['colorscale'] == 'Viridis'
+    assert heatmap['colorbar']['title']['text'] == 'age'
+
+
+###############################################
+### Test the rendering of recommended plots ###
+
+def test_recommended_vis_without_matplotlib(vis_df):
+    plt.close('all')
+    vis_df.intent = ['height', 'weight']
+    vis = Vis(0, vis_df, enhance='outlier')
+    assert vis.output_type == 'plotly'
+    assert not vis.missing_value_flag
+    assert vis.figure['layout']['width'] == 600 and vis.figure['layout']['height'] == 400
+    assert [trace['name'] for trace in vis.figure['data']] == ['False', 'True']
+    # No Matplotlib figure is created on the way
+    assert plt.get_fignums() == []
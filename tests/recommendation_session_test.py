@@ -0,0 +1,122 @@
+######################################################################
+### This file tests the recommendation session of a DataFrame,     ###
+### including:                                                     ###
+### - Verifying the selection of the k-th recommended chart and of ###
+###   the chart enhanced by an attribute                           ###
+### - Ensuring that the recommendations are computed once, also    ###
+###   when a fallback chart is shown instead of the selected one   ###
+######################################################################
+
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from helper_functions import *
+from lux.core.frame import LuxDataFrame
+from classes.recommendation_session import *
+from classes.vis import Vis
+
+
+################################
+### Specify testing fixtures ###
+
+@pytest.fixture
+def rec_df():
+    rng = np.random.default_rng(0)
+    n = 200
+    return pd.DataFrame({
+        'height': rng.normal(170, 10, n),
+        'weight': rng.normal(70, 5, n),
+        'age': rng.normal(40, 10, n),
+        'city': rng.choice(['Oslo', 'Rome', 'Lima'], n),
+        'outlier': np.arange(n) % 10 == 0
+    })
+
+
+@pytest.fixture
+def intended_df(rec_df):
+    rec_df.intent = ['height', 'weight']
+    return rec_df
+
+
+# Count the passes computing recommendations
+def count_passes():
+    return patch.object(LuxDataFrame, 'maintain_recs', autospec=True, side_effect=LuxDataFrame.maintain_recs)
+
+
+####################################
+### Test the selection of charts ###
+
+def test_select_kth_chart(rec_df):
+    session = RecommendationSession(rec_df)
+    with count_passes() as passes:
+        rec_type, charts, first = session.chart()
+        _, _, second = session.chart(num_rec=1)
+        _, _, last = session.chart(num_rec=100)
+    assert passes.call_count == 1
+    assert rec_type == 'Correlation'
+    assert first is charts[0] and second is charts[1]
+    # The first chart is selected if there are fewer charts
+    assert last is charts[0]
+
+
+def test_select_enhanced_chart(intended_df):
+    session = RecommendationSession(intended_df)
+    rec_type, _, chart = session.chart(enhance='city')
+    assert rec_type == 'Enhance'
+    assert chart.get_attr_by_channel('color')[0].attribute == 'city'
+    # Without a chart enhanced by the attribute, none is selected
+    assert session.chart(enhance='height')[2] is None
+
+
+def test_drop_id_column(rec_df):
+    rec_df['id'] = range(len(rec_df))
+    session = RecommendationSession(rec_df)
+    assert 'id' not in session.df.columns
+
+
+##################################
+### Test the fallback charts ###
+
+def test_fallback_chart(intended_df):
+    session = RecommendationSession(intended_df)
+    session.recommendations
+    chart = session.fallback_chart(num_rec=1, enhance='outlier')
+    # The second chart recommended without an intent, coloured by the attribute
+    second = session.fallback_recommendations['Correlation'][1]
+    assert sorted(RecommendationSession.axis_attributes(chart)) == sorted(RecommendationSession.axis_attributes(second))
+    assert chart.get_attr_by_channel('color')[0].attribute == 'outlier'
+    # The intent of the DataFrame is kept
+    assert [clause.attribute for clause in intended_df.intent] == ['height', 'weight']
+
+
+def test_fallback_chart_without_intent(rec_df):
+    session = RecommendationSession(rec_df)
+    with count_passes() as passes:
+        session.chart()
+        chart = session.fallback_chart(num_rec=1)
+    # Without an intent, the fallback chart is picked from the same recommendations
+    assert passes.call_count == 1
+    assert chart is session.recommendations['Correlation'][1]
+
+
+def test_vis_with_fallback(intended_df):
+    # A chart enhanced by an attribute that is not recommended cannot be displayed, so the fallback chart is shown
+    vis = Vis(0, intended_df, enhance='height', fallback=True, fallback_enhance='outlier')
+    assert vis.fallback_used and not vis.missing_value_flag
+    assert vis.output_type == 'plotly'
+    assert len(vis.columns) == 2 and 'outlier' not in vis.columns
+    assert [trace['name'] for trace in vis.figure['data']] == ['False', 'True']
+
+
+def test_vis_alternative(rec_df):
+    session = RecommendationSession(rec_df)
+    vis = Vis(0, rec_df, enhance='outlier', alternative=True, recommendations=session)
+    assert vis.fallback_used
+    assert sorted(vis.columns) == sorted(RecommendationSession.axis_attributes(session.recommendations['Correlation'][1]))
+    assert vis.lux_vis.get_attr_by_channel('color')[0].attribute == 'outlier'
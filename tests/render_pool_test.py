@@ -0,0 +1,127 @@
+######################################################################
+### This file tests the pool of warm rendering workers, including: ###
+### - Verifying that visualisations rendered in worker processes   ###
+###   are identical to the ones rendered inline                    ###
+### - Ensuring that DataFrames are passed by reference where       ###
+###   possible, and sent along with the task otherwise             ###
+### - Ensuring that renders time out, and that renders beyond the  ###
+###   bounded queue are rejected                                   ###
+######################################################################
+
+import pytest
+import json
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from helper_functions import *
+from classes.render_pool import *
+from classes.vis import build_vis
+
+
+################################
+### Specify testing fixtures ###
+
+# One pool for all tests, as every worker pays for importing and warming up the libraries once
+@pytest.fixture(scope='module')
+def pool(tmp_path_factory):
+    pool = RenderPool(max_workers=2, max_queue=1, frame_dir=str(tmp_path_factory.mktemp('frames')))
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def vis_df():
+    rng = np.random.default_rng(0)
+    n = 500
+    df = pd.DataFrame({
+        'height': rng.normal(170, 10, n),
+        'weight': rng.normal(70, 5, n),
+        'city': rng.choice(['Oslo', 'Rome', 'Lima'], n),
+        'outlier': np.arange(n) % 10 == 0
+    })
+    df.intent = ['height', 'weight']
+    return df
+
+
+def payload(vis):
+    return json.dumps(vis.payload, sort_keys=True, default=str)
+
+
+###############################
+### Test the rendering pool ###
+
+def test_render_in_worker(pool, vis_df):
+    # Test that the worker renders the same visualisation, for the intent of the DataFrame, as the calling thread
+    vis = pool.render(3, vis_df, enhance='outlier')
+    expected = build_vis(3, vis_df.copy(), enhance='outlier')
+    assert vis.id == 3 and vis.output_type == 'plotly'
+    assert vis.columns == expected.columns == ['height', 'weight']
+    assert payload(vis) == payload(expected)
+
+
+def test_frame_reference(pool, vis_df):
+    # Test that a version of a DataFrame is stored once for the workers, which receive only its key
+    key = pool.publish(vis_df, 'reference')
+    assert key == 'reference'
+    path = pool.frame_store.path(key)
+    modified = os.path.getmtime(path)
+    assert pool.publish(vis_df, 'reference') == key and os.path.getmtime(path) == modified
+    vis = pool.render(0, vis_df, version=key, machine_view=True)
+    assert vis.rows == len(vis_df)
+    # DataFrames without a version are sent along with the task rather than hashed
+    assert pool.publish(vis_df) is vis_df
+
+
+def test_unstorable_frame(pool, vis_df):
+    # Test that a DataFrame which cannot be stored as an Arrow file is sent along with the task
+    vis_df['mixed'] = pd.Categorical([1, 'a'] * (len(vis_df) // 2))
+    assert isinstance(pool.publish(vis_df, 'unstorable'), pd.DataFrame)
+    assert pool.render(0, vis_df, version='unstorable', enhance='outlier').output_type == 'plotly'
+
+
+def test_evicted_frame(pool, vis_df):
+    # Test that a DataFrame removed from the store after it was published is sent along with the task
+    key = pool.publish(vis_df, 'evicted')
+    os.remove(pool.frame_store.path(key))
+    assert pool.render(0, vis_df, version=key, enhance='outlier').output_type == 'plotly'
+
+
+def test_render_error(pool, vis_df):
+    # Test that errors of a render are raised in the calling thread, and the worker keeps serving
+    with pytest.raises(TypeError):
+        pool.render(0, vis_df, unknown_argument=True)
+    assert pool.render(0, vis_df).output_type == 'plotly'
+
+
+def test_render_timeout(pool, vis_df):
+    # Test that a render that takes too long is stopped by replacing its worker
+    processes = {worker.process.pid for worker in pool.workers}
+    with pytest.raises(RenderTimeout):
+        pool.render(0, vis_df, timeout=0.01, enhance='outlier')
+    assert len(pool.workers) == 2
+    assert len(processes & {worker.process.pid for worker in pool.workers}) == 1
+    assert pool.render(0, vis_df, enhance='outlier').output_type == 'plotly'
+
+
+def test_queue_full(pool, vis_df):
+    # Test that renders beyond the busy workers and the waiting ones are rejected
+    for _ in range(pool.max_workers + pool.max_queue):
+        pool.slots.acquire()
+    try:
+        with pytest.raises(RenderQueueFull):
+            pool.render(0, vis_df)
+    finally:
+        for _ in range(pool.max_workers + pool.max_queue):
+            pool.slots.release()
+
+
+def test_inline_render(tmp_path, vis_df):
+    # Test that visualisations are rendered in the calling thread if no worker processes are configured
+    pool = RenderPool(max_workers=0, frame_dir=str(tmp_path))
+    assert pool.render(0, vis_df).output_type == 'plotly'
+    assert pool.workers == []
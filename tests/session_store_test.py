@@ -0,0 +1,122 @@
+######################################################################
+### This file tests the per-session state store, including:        ###
+### - Verifying that sessions do not share their data              ###
+### - Ensuring that least recently used sessions are evicted when  ###
+###   the number of sessions or the memory budget is exceeded      ###
+######################################################################
+
+import pytest
+import pandas as pd
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from classes.session_store import *
+
+
+################################
+### Specify testing fixtures ###
+
+@pytest.fixture
+def small_df():
+    return pd.DataFrame({
+        'id': [0, 1, 2, 3],
+        'str': ['apple', 'banana', 'cherry', 'banana'],
+        'flt': [1.0, 2.5, 3.8, 2.5]
+    })
+
+
+##############################
+### Test the session store ###
+
+def test_sessions_are_isolated(small_df):
+    store = SessionStore()
+    session_a = store.get('a')
+    session_b = store.get('b')
+    session_a.current_df = small_df
+    session_a.step += 1
+    session_a.action_log.append('USER ACTION: Data uploaded')
+    # The second session must not see the state of the first session
+    assert session_b.current_df is None
+    assert session_b.step == 0
+    assert session_b.action_log == []
+    # Resolving the same session again returns the same state
+    assert store.get('a') is session_a
+
+
+def test_default_session():
+    store = SessionStore(max_sessions=1)
+    # Callbacks called without a session ID share the default session, which is never evicted
+    assert store.get(None) is store.get(DEFAULT_SESSION_ID)
+    assert len(store) == 0
+
+
+def test_lru_eviction_by_count():
+    store = SessionStore(max_sessions=2)
+    store.get('a')
+    store.get('b')
+    # Touch 'a' so that 'b' becomes the least recently used session
+    store.get('a')
+    store.get('c')
+    assert 'a' in store
+    assert 'b' not in store
+    assert 'c' in store
+
+
+def test_eviction_by_memory_budget(small_df):
+    budget = int(small_df.memory_usage(index=True, deep=True).sum())
+    store = SessionStore(max_sessions=2, session_budget=budget)
+    store.get('a').current_df = small_df
+    store.get('a')
+    store.get('b').load(small_df.copy())
+    # A changed version of the data is held next to the uploaded data
+    store.get('b').commit(store.get('b').current_df.assign(flt=small_df.flt * 2))
+    # Refreshing 'b' pushes the total above the overall budget, so the least recently used session is evicted
+    store.get('b')
+    assert 'a' not in store
+    assert 'b' in store
+
+
+def test_undo_restores_checkpoint_and_indexes(small_df):
+    session = SessionState('a')
+    session.load(small_df)
+    session.checkpoint()
+    missing_index = session.get_missing_index()
+    keep_mask = (small_df['id'] != 3).to_numpy()
+    session.commit(session.current_df[keep_mask], missing=missing_index.drop_rows(keep_mask))
+    assert len(session.current_df) == 3
+    # Undo returns to the uploaded data and re-uses the index of the checkpoint
+    session.undo()
+    pd.testing.assert_frame_equal(session.current_df, small_df)
+    assert session.get_missing_index() is missing_index
+
+
+def test_eviction_by_session_budget(small_df):
+    budget = int(small_df.memory_usage(index=True, deep=True).sum())
+    store = SessionStore(max_sessions=8, session_budget=budget)
+    store.get('a').load(small_df.copy())
+    store.get('a').commit(store.get('a').current_df.assign(flt=small_df.flt * 2))
+    # 'a' exceeds its own budget, even though all sessions together are far below the overall budget
+    store.get('b').current_df = small_df
+    store.get('c')
+    assert 'a' not in store
+    assert 'b' in store
+    assert store.total_footprint() < store.max_sessions * budget
+
+
+def test_footprint_measured_once_per_change(small_df, monkeypatch):
+    store = SessionStore()
+    session = store.get('a')
+    session.load(small_df.copy())
+    calls = []
+    measure = SessionState.memory_footprint
+    monkeypatch.setattr(SessionState, 'memory_footprint', lambda self: calls.append(1) or measure(self))
+    for _ in range(3):
+        store.get('a')
+    assert len(calls) == 1
+    # Committing a new state of the data requires measuring it again
+    session.commit(session.current_df.assign(flt=small_df.flt * 2))
+    store.get('a')
+    store.get('a')
+    assert len(calls) == 2
@@ -0,0 +1,56 @@
+######################################################################
+### This file tests the chunked CSV reader, including:             ###
+### - Verifying that chunked parsing matches parsing all at once   ###
+### - Ensuring that the row limit and type fallback are respected  ###
+######################################################################
+
+import pytest
+import base64
+import pandas as pd
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from classes.streaming_csv_reader import *
+
+
+################################
+### Specify testing fixtures ###
+
+@pytest.fixture
+def csv_upload():
+    content = open(os.path.join(os.path.dirname(__file__), '..', 'assets', 'corrupted_car.csv'), 'rb').read()
+    return 'data:text/csv;base64,' + base64.b64encode(content).decode('utf-8')
+
+
+#####################################
+### Test the streaming CSV reader ###
+
+def test_chunked_upload_matches_full_parse(csv_upload):
+    # Test that decoding and parsing in small chunks gives the same DataFrame as a single parse
+    expected = pd.read_csv(os.path.join(os.path.dirname(__file__), '..', 'assets', 'corrupted_car.csv'))
+    output_df = StreamingCsvReader.from_upload(csv_upload, chunk_rows=100, sample_rows=50).read()
+    pd.testing.assert_frame_equal(output_df, expected)
+
+
+def test_row_limit(csv_upload):
+    # Test that only the first rows are loaded for previews
+    output_df = StreamingCsvReader.from_upload(csv_upload, chunk_rows=7, max_rows=20).read()
+    assert len(output_df) == 20
+
+
+def test_type_fallback():
+    # Test that text appearing after the sampled rows of a numeric column does not fail the upload
+    content = ('value\n' + '1.5\n' * 30 + 'unknown\n').encode('utf-8')
+    output_df = StreamingCsvReader(lambda: io.BytesIO(content), chunk_rows=10, sample_rows=10).read()
+    assert len(output_df) == 31
+    assert output_df['value'].iloc[-1] == 'unknown'
+
+
+def test_type_fallback_matches_full_parse():
+    # Test that the fallback infers every column's type from all rows, rather than mixing the types of chunks
+    content = ('value,count\n' + '1.5,1\n' * 30 + 'unknown,many\n').encode('utf-8')
+    output_df = StreamingCsvReader(lambda: io.BytesIO(content), chunk_rows=10, sample_rows=10).read()
+    pd.testing.assert_frame_equal(output_df, pd.read_csv(io.BytesIO(content)))
+    assert output_df['count'].map(type).nunique() == 1
@@ -0,0 +1,90 @@
+######################################################################
+### This file tests the versioned dataset used for undo, including:###
+### - Verifying that every version is materialised unchanged       ###
+### - Ensuring that unchanged columns are shared rather than copied###
+### - Checking that undo returns to the last checkpoint            ###
+######################################################################
+
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from classes.versioned_dataset import *
+
+
+################################
+### Specify testing fixtures ###
+
+@pytest.fixture
+def base_df():
+    return pd.DataFrame({
+        'id': [0, 1, 2, 3, 4, 5],
+        'str': ['apple', 'banana', np.nan, 'banana', 'kiwi', 'apple'],
+        'flt': [1.0, 2.5, np.nan, 2.5, 4.2, 1.0]
+    })
+
+
+#################################
+### Test the versioned dataset ###
+
+def test_commit_and_materialise(base_df):
+    dataset = VersionedDataset(base_df)
+    # Impute, drop rows and add a flag column, as the cleaning stages do
+    imputed = dataset.commit(base_df.fillna({'flt': 0.0}))
+    dropped = dataset.commit(imputed[imputed.id != 3])
+    flagged = dataset.commit(dropped.assign(outlier=dropped.flt > 3))
+    for version, expected in zip(dataset.versions, [base_df, imputed, dropped, flagged]):
+        pd.testing.assert_frame_equal(dataset.materialise(version), expected)
+
+
+def test_unchanged_columns_are_shared(base_df):
+    dataset = VersionedDataset(base_df)
+    dataset.commit(base_df.fillna({'flt': 0.0}))
+    # Only the imputed column is stored as a delta
+    assert list(dataset.version.deltas) == ['flt']
+    assert dataset.version.row_mask is None
+
+
+def test_undo_to_checkpoint(base_df):
+    dataset = VersionedDataset(base_df)
+    dataset.checkpoint()
+    dataset.commit(base_df[base_df.flt.notnull()])
+    pd.testing.assert_frame_equal(dataset.undo(), base_df)
+    # Committing after undo discards the undone versions
+    dataset.commit(base_df.assign(duplicate=False))
+    assert len(dataset.versions) == 2
+
+
+def test_version_keys(base_df):
+    dataset = VersionedDataset(base_df, key='content')
+    assert dataset.version.key == 'content'
+    dataset.checkpoint()
+    dataset.commit(base_df[base_df.flt.notnull()])
+    first_key = dataset.version.key
+    assert first_key.startswith('content-')
+    # Undo returns to the key of the checkpoint, and versions committed afterwards never re-use an undone key
+    dataset.undo()
+    assert dataset.version.key == 'content'
+    dataset.commit(base_df.assign(duplicate=False))
+    assert dataset.version.key not in ('content', first_key)
+    # Without a content key every dataset gets its own
+    assert VersionedDataset(base_df).version.key != VersionedDataset(base_df).version.key
+
+
+def test_commit_reordered_rows(base_df):
+    dataset = VersionedDataset(base_df)
+    imputed = dataset.commit(base_df.fillna({'flt': 0.0}))
+    dataset.checkpoint()
+    # Re-ordered rows cannot be derived from the base, so they are stored as a full snapshot
+    reordered = dataset.commit(imputed.sort_values('flt'))
+    dropped = dataset.commit(reordered[reordered.id != 3])
+    assert len(dataset.versions) == 4
+    pd.testing.assert_frame_equal(dataset.materialise(dataset.versions[2]), reordered)
+    pd.testing.assert_frame_equal(dataset.materialise(dataset.version), dropped)
+    # The history before the snapshot and the checkpoint are kept
+    pd.testing.assert_frame_equal(dataset.undo(), imputed)
+    pd.testing.assert_frame_equal(dataset.materialise(dataset.versions[0]), base_df)